@@ -0,0 +1,25 @@
+from django.contrib import admin
+from .models import CategoryStats, DailyCategorySales, DailyProductSales
+
+
+@admin.register(CategoryStats)
+class CategoryStatsAdmin(admin.ModelAdmin):
+    list_display = ("category", "product_count", "price_total", "average_price", "refreshed_at")
+    search_fields = ("category__name",)
+    list_select_related = ("category",)
+
+
+@admin.register(DailyProductSales)
+class DailyProductSalesAdmin(admin.ModelAdmin):
+    list_display = ("date", "product", "order_count", "units", "revenue")
+    search_fields = ("product__name", "product__sku")
+    list_select_related = ("product",)
+    date_hierarchy = "date"
+
+
+@admin.register(DailyCategorySales)
+class DailyCategorySalesAdmin(admin.ModelAdmin):
+    list_display = ("date", "category", "order_count", "units", "revenue")
+    search_fields = ("category__name",)
+    list_select_related = ("category",)
+    date_hierarchy = "date"
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class AggregatesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'aggregates'
+
+    def ready(self):
+        import aggregates.signals
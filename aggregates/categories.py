@@ -0,0 +1,82 @@
+"""
+Per-category price rollups.
+
+Each ``CategoryStats`` row holds the total price of the active products
+anywhere in the category's subtree; ``Category.product_count`` holds their
+number. A product linked to several categories of one subtree is counted
+once. Rows are recomputed for the branch a change touches, in one SELECT
+and one upsert.
+"""
+from decimal import Decimal
+from typing import Iterable
+
+from django.db.models import DecimalField, Exists, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from products.models import Category, Product
+from .models import CategoryStats
+
+
+def _subtree_products():
+    """Active products linked to a category inside the outer category's MPTT range."""
+    links = Product.categories.through.objects.filter(
+        product_id=OuterRef('pk'),
+        category__tree_id=OuterRef(OuterRef('tree_id')),
+        category__lft__gte=OuterRef(OuterRef('lft')),
+        category__lft__lte=OuterRef(OuterRef('rght')),
+    )
+    # Grouping on the filtered is_active column yields a single aggregate row
+    return Product.objects.filter(Exists(links), is_active=True).order_by().values('is_active')
+
+
+def _annotate(categories):
+    products = _subtree_products()
+    return categories.annotate(
+        subtree_total=Coalesce(
+            Subquery(products.annotate(v=Sum('price')).values('v'), output_field=DecimalField()),
+            Value(Decimal('0.00')),
+            output_field=DecimalField(),
+        ),
+    )
+
+
+def _write(categories) -> int:
+    now = timezone.now()
+    rows = [
+        CategoryStats(
+            category_id=category['id'],
+            price_total=category['subtree_total'],
+            refreshed_at=now,
+        )
+        for category in _annotate(categories).values('id', 'subtree_total')
+    ]
+    CategoryStats.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['category'],
+        update_fields=['price_total', 'refreshed_at'],
+    )
+    return len(rows)
+
+
+def refresh_category_stats(category_ids: Iterable[int]) -> int:
+    """
+    Recompute the stats of the given categories and their ancestors.
+
+    Returns the number of rows written.
+    """
+    nodes = list(Category.objects.filter(id__in=set(category_ids)).values('tree_id', 'lft', 'rght'))
+    if not nodes:
+        return 0
+
+    branch = Q()
+    for node in nodes:
+        branch |= Q(tree_id=node['tree_id'], lft__lte=node['lft'], rght__gte=node['rght'])
+    return _write(Category.objects.filter(branch))
+
+
+def rebuild_category_stats() -> int:
+    """Recompute the stats of every category from scratch."""
+    CategoryStats.objects.all().delete()
+    return _write(Category.objects.all())
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from aggregates.categories import rebuild_category_stats
+from aggregates.sales import rebuild_sales
+
+
+class Command(BaseCommand):
+    help = "Recompute the category stats and daily sales rollups from scratch."
+
+    def handle(self, *args, **options):
+        categories = rebuild_category_stats()
+        days = rebuild_sales()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt stats for {categories} categories and {days} daily product sales rows"
+        ))
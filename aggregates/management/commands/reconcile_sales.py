@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from aggregates.sales import reconcile_sales
+
+
+class Command(BaseCommand):
+    help = "Apply orders whose sales rollup task was never queued or gave up."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None, help="Orders applied per batch.")
+        parser.add_argument("--loop", action="store_true", help="Keep sweeping instead of exiting.")
+        parser.add_argument("--interval", type=float, default=60.0, help="Seconds to sleep between sweeps with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            result = reconcile_sales(options["batch_size"])
+            if any(result.values()):
+                self.stdout.write(f"Added {result['added']} | Removed {result['removed']}")
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,117 @@
+from decimal import Decimal
+
+from django.db import models
+
+
+class CategoryStats(models.Model):
+    """
+    Total price of the active products in a category's subtree (the category
+    and its descendants). The matching count is ``Category.product_count``.
+
+    Maintained by ``products.signals`` as products and links change;
+    rebuild with ``rebuild_aggregates``.
+    """
+    category = models.OneToOneField(
+        'products.Category',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    price_total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'category_stats'
+        verbose_name = 'Category Stats'
+        verbose_name_plural = 'Category Stats'
+
+    def __str__(self):
+        return f"{self.category_id}: {self.price_total}"
+
+    @property
+    def product_count(self):
+        return self.category.product_count
+
+    @property
+    def average_price(self):
+        if not self.product_count:
+            return Decimal('0.00')
+        return (self.price_total / self.product_count).quantize(Decimal('0.01'))
+
+
+class CountedOrder(models.Model):
+    """
+    Ledger of the orders whose items are included in the daily sales rollups.
+
+    An order gains its row when its items are added to the rollups and
+    loses it when they are taken out again (cancelled or refunded), so every
+    order is applied at most once in each direction.
+    """
+    order = models.OneToOneField(
+        'orders.Order',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='sales_rollup'
+    )
+    counted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'counted_orders'
+        verbose_name = 'Counted Order'
+        verbose_name_plural = 'Counted Orders'
+
+    def __str__(self):
+        return f"{self.order_id} counted at {self.counted_at}"
+
+
+class DailySales(models.Model):
+    """Units, revenue and order count for one day, over the orders in ``CountedOrder``."""
+    date = models.DateField()
+    order_count = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        abstract = True
+
+
+class DailyProductSales(DailySales):
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.CASCADE,
+        related_name='daily_sales'
+    )
+
+    class Meta:
+        db_table = 'daily_product_sales'
+        verbose_name = 'Daily Product Sales'
+        verbose_name_plural = 'Daily Product Sales'
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'date'], name='unique_daily_product_sales'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} product {self.product_id}: {self.units} units"
+
+
+class DailyCategorySales(DailySales):
+    """Sales of every product in the category's subtree, each order item counted once."""
+    category = models.ForeignKey(
+        'products.Category',
+        on_delete=models.CASCADE,
+        related_name='daily_sales'
+    )
+
+    class Meta:
+        db_table = 'daily_category_sales'
+        verbose_name = 'Daily Category Sales'
+        verbose_name_plural = 'Daily Category Sales'
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'date'], name='unique_daily_category_sales'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} category {self.category_id}: {self.units} units"
@@ -0,0 +1,438 @@
+"""
+Daily sales rollups built from order items.
+
+The rollups cover the orders listed in ``CountedOrder``. When an order
+commits, or moves into one of ``Order.STOCK_RELEASE_STATUSES``, a task
+adds or removes its items as deltas. Each rollup row is adjusted in place
+with F expressions, at a fixed number of queries per batch of orders.
+
+Rarer changes recompute the affected ``(product, day)`` pairs from the
+ledger in deferred tasks: edited or deleted items, deleted orders,
+relinked products and reshaped category trees. Days are calendar days in
+the current time zone. ``reconcile_sales`` applies orders whose task was
+never queued or gave up.
+"""
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, Exists, F, IntegerField, OuterRef, Q, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from orders.models import Order, OrderItem
+from products.models import Category, Product
+from .models import CountedOrder, DailyCategorySales, DailyProductSales
+
+SalesKey = Tuple[int, datetime.date]  # (product_id, day)
+
+DEFAULT_RECONCILE_BATCH = 500
+DEFAULT_RECONCILE_GRACE = 60
+
+
+def sales_keys(order_ids: Iterable) -> Set[SalesKey]:
+    """The ``(product_id, day)`` pairs covered by the items of the given orders."""
+    return set(
+        OrderItem.objects.filter(order_id__in=list(order_ids))
+        .annotate(day=TruncDate('order__created_at'))
+        .values_list('product_id', 'day')
+        .distinct()
+    )
+
+
+def product_sales_keys(product_ids: Iterable[int]) -> Set[SalesKey]:
+    """The ``(product_id, day)`` pairs already rolled up for the given products."""
+    return set(DailyProductSales.objects.filter(product_id__in=list(product_ids)).values_list('product_id', 'date'))
+
+
+class _Delta:
+    """Orders, units and revenue a batch adds to (or takes from) one rollup row."""
+    __slots__ = ('orders', 'units', 'revenue')
+
+    def __init__(self):
+        self.orders, self.units, self.revenue = set(), 0, Decimal('0.00')
+
+    @property
+    def order_count(self):
+        return len(self.orders)
+
+
+def _product_categories(product_ids) -> Dict[int, Set[int]]:
+    """Every category containing each product, ancestors included, in two queries."""
+    links = list(
+        Product.categories.through.objects.filter(product_id__in=product_ids)
+        .values_list('product_id', 'category__tree_id', 'category__lft')
+    )
+    if not links:
+        return {}
+
+    branch = Q()
+    for _, tree_id, lft in links:
+        branch |= Q(tree_id=tree_id, lft__lte=lft, rght__gte=lft)
+    nodes = list(Category.objects.filter(branch).values_list('id', 'tree_id', 'lft', 'rght'))
+
+    containing = defaultdict(set)
+    for product_id, tree_id, lft in links:
+        containing[product_id].update(
+            category_id for category_id, node_tree, node_lft, node_rght in nodes
+            if node_tree == tree_id and node_lft <= lft <= node_rght
+        )
+    return containing
+
+
+def _order_deltas(order_ids):
+    """Per ``(product, day)`` and ``(category, day)`` totals of the given orders' items."""
+    items = list(
+        OrderItem.objects.filter(order_id__in=order_ids)
+        .annotate(day=TruncDate('order__created_at'))
+        .values_list('order_id', 'product_id', 'day', 'quantity', 'total_price')
+    )
+    categories = _product_categories({product_id for _, product_id, _, _, _ in items})
+
+    by_product, by_category = defaultdict(_Delta), defaultdict(_Delta)
+    for order_id, product_id, day, quantity, total in items:
+        # A product in several categories of one subtree still counts once there
+        for delta in [by_product[product_id, day]] + [by_category[c, day] for c in categories.get(product_id, ())]:
+            delta.orders.add(order_id)
+            delta.units += quantity
+            delta.revenue += total
+    return by_product, by_category
+
+
+def _apply_deltas(model, field, deltas, sign, now) -> None:
+    """
+    Add (``sign=1``) or subtract (``sign=-1``) ``deltas`` to the rollup rows.
+
+    Existing rows are adjusted by one UPDATE with per-row ``Case`` increments.
+    Missing rows are created, and rows left with no orders are deleted.
+    """
+    if not deltas:
+        return
+    key_q = {key: Q(**{field: key[0], 'date': key[1]}) for key in deltas}
+    touched = Q()
+    for q in key_q.values():
+        touched |= q
+
+    def increment(column, attr, output_field):
+        whens = [When(key_q[key], then=Value(sign * getattr(delta, attr))) for key, delta in deltas.items()]
+        return F(column) + Case(*whens, default=Value(0), output_field=output_field)
+
+    rows = model.objects.filter(touched)
+    existing = set(rows.values_list(field, 'date'))
+    if existing:
+        rows.update(
+            order_count=increment('order_count', 'order_count', IntegerField()),
+            units=increment('units', 'units', IntegerField()),
+            revenue=increment('revenue', 'revenue', DecimalField(max_digits=14, decimal_places=2)),
+            refreshed_at=now,
+        )
+    if sign > 0:
+        model.objects.bulk_create([
+            model(**{field: key[0]}, date=key[1], order_count=delta.order_count, units=delta.units,
+                  revenue=delta.revenue, refreshed_at=now)
+            for key, delta in deltas.items() if key not in existing
+        ])
+    else:
+        rows.filter(order_count__lte=0).delete()
+
+
+@transaction.atomic
+def apply_order_sales(order_ids: Iterable) -> Dict[str, int]:
+    """
+    Bring the rollups in line with the current status of the given orders.
+
+    Orders that count as sales but are not in the ledger yet are added, and
+    ledger orders that were cancelled or refunded since are subtracted.
+    Running it again for an order is a no-op. Ledger rows are locked, and
+    two concurrent first runs collide on the ledger's primary key, so the
+    second one rolls back.
+    The query count does not depend on how many orders or lines there are.
+    Returns ``{"added": n, "removed": n}``.
+    """
+    order_ids = list(order_ids)
+    counted = set(
+        CountedOrder.objects.select_for_update().filter(order_id__in=order_ids).values_list('order_id', flat=True)
+    )
+    selling = set(
+        Order.objects.filter(id__in=order_ids)
+        .exclude(status__in=Order.STOCK_RELEASE_STATUSES)
+        .values_list('id', flat=True)
+    )
+    added, removed = selling - counted, counted - selling
+
+    now = timezone.now()
+    for orders, sign in ((added, 1), (removed, -1)):
+        if not orders:
+            continue
+        by_product, by_category = _order_deltas(orders)
+        _apply_deltas(DailyProductSales, 'product_id', by_product, sign, now)
+        _apply_deltas(DailyCategorySales, 'category_id', by_category, sign, now)
+
+    if added:
+        CountedOrder.objects.bulk_create([CountedOrder(order_id=order_id) for order_id in added])
+    if removed:
+        CountedOrder.objects.filter(order_id__in=removed).delete()
+    return {"added": len(added), "removed": len(removed)}
+
+
+def _unapplied_orders(now, grace: int):
+    """
+    Orders whose rollup state disagrees with their status: selling orders
+    missing from the ledger, older than ``grace`` seconds so the commit task
+    gets a chance to apply them first, and ledger orders cancelled or refunded since.
+    """
+    missing = (
+        Order.objects
+        .exclude(status__in=Order.STOCK_RELEASE_STATUSES)
+        .filter(created_at__lt=now - datetime.timedelta(seconds=grace))
+        .filter(~Exists(CountedOrder.objects.filter(order_id=OuterRef('pk'))))
+        .values_list('id', flat=True)
+    )
+    released = (
+        CountedOrder.objects
+        .filter(order__status__in=Order.STOCK_RELEASE_STATUSES)
+        .values_list('order_id', flat=True)
+    )
+    return missing, released
+
+
+def reconcile_sales(batch_size: int = None) -> Dict[str, int]:
+    """
+    Apply the orders whose commit task never ran or failed for good.
+
+    ``on_commit`` hooks survive neither a broker outage nor a crash between
+    the commit and the enqueue; this sweep repairs what they missed, batch by
+    batch, through ``apply_order_sales``. Orders are only picked up after
+    ``SALES_RECONCILE_GRACE`` seconds (default 60).
+    """
+    batch_size = batch_size or DEFAULT_RECONCILE_BATCH
+    grace = getattr(settings, 'SALES_RECONCILE_GRACE', DEFAULT_RECONCILE_GRACE)
+    totals = {"added": 0, "removed": 0}
+    missing, released = _unapplied_orders(timezone.now(), grace)
+    for orders in (missing, released):
+        while True:
+            order_ids = list(orders[:batch_size])
+            if not order_ids:
+                break
+            result = apply_order_sales(order_ids)
+            for key in totals:
+                totals[key] += result[key]
+            if not any(result.values()):
+                # Another worker applied them in the meantime; nothing left for this pass
+                break
+    return totals
+
+
+def _defer(task_name: str, *args) -> None:
+    """Queue an ``aggregates.task`` task once the current transaction commits."""
+    from . import task
+
+    transaction.on_commit(lambda: getattr(task, task_name).delay(*args), robust=True)
+
+
+def schedule_order_sales(order_ids: Iterable) -> None:
+    """Apply the given orders to the rollups in a task after commit."""
+    _defer('apply_order_sales_task', [str(pk) for pk in order_ids])
+
+
+def schedule_sales_refresh(keys: Iterable[SalesKey] = (), order_ids: Iterable = (),
+                           product_ids: Iterable[int] = ()) -> None:
+    """
+    Recompute pairs from the ledger in a task after commit.
+
+    ``order_ids`` are resolved to their pairs by the task, so items written
+    later in the same transaction are included. ``product_ids`` are paired
+    with the days of those orders, which covers items deleted meanwhile.
+    """
+    _defer(
+        'refresh_sales_task',
+        [[product_id, day.isoformat()] for product_id, day in keys],
+        [str(pk) for pk in order_ids],
+        list(product_ids),
+    )
+
+
+def order_keys(order_ids: Iterable, product_ids: Iterable[int] = ()) -> Set[SalesKey]:
+    """
+    The pairs of the given orders' items, plus each of ``product_ids`` on
+    the days of those orders.
+    """
+    order_ids = list(order_ids)
+    days = set(
+        Order.objects.filter(id__in=order_ids)
+        .annotate(day=TruncDate('created_at'))
+        .values_list('day', flat=True)
+    )
+    return sales_keys(order_ids) | {(product_id, day) for product_id in product_ids for day in days}
+
+
+def schedule_product_sales_refresh(product_ids: Iterable[int], category_ids: Iterable[int] = ()) -> None:
+    """Recompute every rolled-up day of the given products in a task after commit."""
+    _defer('refresh_product_sales_task', list(product_ids), list(category_ids))
+
+
+def schedule_category_sales_rebuild() -> None:
+    """Rebuild every category rollup in a task after commit."""
+    _defer('rebuild_category_sales_task')
+
+
+def _day_range(days):
+    start = timezone.make_aware(datetime.datetime.combine(min(days), datetime.time.min))
+    end = timezone.make_aware(datetime.datetime.combine(max(days) + datetime.timedelta(days=1), datetime.time.min))
+    return start, end
+
+
+def _sold_items():
+    return OrderItem.objects.filter(Exists(CountedOrder.objects.filter(order_id=OuterRef('order_id'))))
+
+
+def _daily_totals(items, *group):
+    return (
+        items.annotate(day=TruncDate('order__created_at'))
+        .order_by()
+        .values(*group, 'day')
+        .annotate(
+            order_count=Count('order_id', distinct=True),
+            units=Sum('quantity'),
+            revenue=Sum('total_price'),
+        )
+    )
+
+
+def _in_subtree(category):
+    """Items whose product is linked anywhere inside ``category``'s subtree."""
+    return Exists(Product.categories.through.objects.filter(
+        product_id=OuterRef('product_id'),
+        category__tree_id=category['tree_id'],
+        category__lft__gte=category['lft'],
+        category__lft__lte=category['rght'],
+    ))
+
+
+def _upsert(model, rows, unique_field):
+    model.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=[unique_field, 'date'],
+        update_fields=['order_count', 'units', 'revenue', 'refreshed_at'],
+    )
+
+
+def _refresh_categories(categories, items, days, now) -> None:
+    """Recompute ``DailyCategorySales`` of ``categories`` for ``days`` from ``items``."""
+    rows = []
+    for category in categories:
+        totals = _daily_totals(items.filter(_in_subtree(category)))
+        rows.extend(
+            DailyCategorySales(category_id=category['id'], date=total['day'], order_count=total['order_count'],
+                               units=total['units'], revenue=total['revenue'], refreshed_at=now)
+            for total in totals if total['day'] in days
+        )
+    _upsert(DailyCategorySales, rows, 'category')
+
+    written = defaultdict(set)
+    for row in rows:
+        written[row.date].add(row.category_id)
+    for day in days:
+        DailyCategorySales.objects.filter(
+            date=day, category_id__in=[category['id'] for category in categories]
+        ).exclude(category_id__in=written[day]).delete()
+
+
+@transaction.atomic
+def refresh_sales(keys: Iterable[SalesKey], category_ids: Iterable[int] = ()) -> int:
+    """
+    Recompute the rollups for the given ``(product_id, day)`` pairs from the ledger.
+
+    Categories the products were just unlinked from are passed as
+    ``category_ids`` so their branches are recomputed too. Pairs with no
+    remaining sales lose their rows. Returns the number of product rows
+    written. Runs in tasks: the category side costs one query per category.
+    """
+    keys = set(keys)
+    if not keys:
+        return 0
+
+    now = timezone.now()
+    product_ids = {product_id for product_id, _ in keys}
+    days = {day for _, day in keys}
+    start, end = _day_range(days)
+    items = _sold_items().filter(order__created_at__gte=start, order__created_at__lt=end)
+
+    totals = _daily_totals(items.filter(product_id__in=product_ids), 'product_id')
+    rows = [
+        DailyProductSales(product_id=total['product_id'], date=total['day'], order_count=total['order_count'],
+                          units=total['units'], revenue=total['revenue'], refreshed_at=now)
+        for total in totals if (total['product_id'], total['day']) in keys
+    ]
+    _upsert(DailyProductSales, rows, 'product')
+
+    emptied = keys - {(row.product_id, row.date) for row in rows}
+    if emptied:
+        stale = Q()
+        for product_id, day in emptied:
+            stale |= Q(product_id=product_id, date=day)
+        DailyProductSales.objects.filter(stale).delete()
+
+    nodes = list(
+        Category.objects.filter(Q(products__id__in=product_ids) | Q(id__in=set(category_ids)))
+        .values('tree_id', 'lft', 'rght')
+        .distinct()
+    )
+    if nodes:
+        branch = Q()
+        for node in nodes:
+            branch |= Q(tree_id=node['tree_id'], lft__lte=node['lft'], rght__gte=node['rght'])
+        categories = list(Category.objects.filter(branch).values('id', 'tree_id', 'lft', 'rght'))
+        _refresh_categories(categories, items, days, now)
+
+    return len(rows)
+
+
+@transaction.atomic
+def rebuild_sales() -> int:
+    """
+    Rebuild the ledger and every daily rollup from scratch.
+
+    Every order not cancelled or refunded is counted. Returns the number
+    of product rows.
+    """
+    CountedOrder.objects.all().delete()
+    order_ids = Order.objects.exclude(status__in=Order.STOCK_RELEASE_STATUSES).values_list('id', flat=True)
+    CountedOrder.objects.bulk_create(
+        [CountedOrder(order_id=order_id) for order_id in order_ids.iterator()], batch_size=1000,
+    )
+
+    DailyProductSales.objects.all().delete()
+    now = timezone.now()
+    rows = [
+        DailyProductSales(product_id=total['product_id'], date=total['day'], order_count=total['order_count'],
+                          units=total['units'], revenue=total['revenue'], refreshed_at=now)
+        for total in _daily_totals(_sold_items(), 'product_id')
+    ]
+    DailyProductSales.objects.bulk_create(rows)
+    rebuild_category_sales()
+    return len(rows)
+
+
+@transaction.atomic
+def rebuild_category_sales() -> int:
+    """
+    Recompute every ``DailyCategorySales`` row, one grouped query per category.
+
+    Used when categories move or disappear, which reshapes every subtree.
+    """
+    DailyCategorySales.objects.all().delete()
+    now = timezone.now()
+    items = _sold_items()
+    rows = [
+        DailyCategorySales(category_id=category['id'], date=total['day'], order_count=total['order_count'],
+                           units=total['units'], revenue=total['revenue'], refreshed_at=now)
+        for category in Category.objects.values('id', 'tree_id', 'lft', 'rght')
+        for total in _daily_totals(items.filter(_in_subtree(category)))
+    ]
+    DailyCategorySales.objects.bulk_create(rows)
+    return len(rows)
@@ -0,0 +1,37 @@
+from rest_framework import serializers
+
+from .models import CategoryStats
+
+
+class CategoryStatsSerializer(serializers.ModelSerializer):
+    """Subtree product rollup of a category, read from ``CategoryStats`` and its category row."""
+    category_id = serializers.IntegerField(read_only=True)
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    product_count = serializers.IntegerField(source='category.product_count', read_only=True)
+    average_price = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = CategoryStats
+        fields = ['category_id', 'category_name', 'product_count', 'price_total', 'average_price', 'refreshed_at']
+
+
+class DailySalesSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    order_count = serializers.IntegerField()
+    units = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class SalesReportQuerySerializer(serializers.Serializer):
+    """Query parameters of the sales report: exactly one of product/category, plus a date window."""
+    product = serializers.IntegerField(required=False)
+    category = serializers.SlugField(required=False)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if ('product' in attrs) == ('category' in attrs):
+            raise serializers.ValidationError("Pass exactly one of product or category.")
+        if attrs.get('start') and attrs.get('end') and attrs['start'] > attrs['end']:
+            raise serializers.ValidationError({"end": "Must not be before start."})
+        return attrs
@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from orders.models import Order, OrderItem
+from .models import CountedOrder
+from .sales import schedule_order_sales, schedule_sales_refresh, sales_keys
+
+
+@receiver(post_save, sender=Order)
+def order_saved(sender, instance, **kwargs):
+    # Covers creation and status changes made through save(); the task
+    # works out whether the order has to be added or taken out
+    schedule_order_sales([instance.pk])
+
+
+@receiver(pre_delete, sender=Order)
+def order_pre_delete(sender, instance, **kwargs):
+    if CountedOrder.objects.filter(order_id=instance.pk).exists():
+        instance._sales_keys = sales_keys([instance.pk])
+
+
+@receiver(post_delete, sender=Order)
+def order_deleted(sender, instance, **kwargs):
+    keys = getattr(instance, '_sales_keys', None)
+    if keys:
+        schedule_sales_refresh(keys=keys)
+
+
+@receiver(post_save, sender=OrderItem)
+def order_item_saved(sender, instance, **kwargs):
+    schedule_sales_refresh(order_ids=[instance.order_id])
+
+
+@receiver(post_delete, sender=OrderItem)
+def order_item_deleted(sender, instance, **kwargs):
+    # No query here: deleting an order cascades to every item. If the order
+    # went too, order_deleted already scheduled its pairs
+    schedule_sales_refresh(order_ids=[instance.order_id], product_ids=[instance.product_id])
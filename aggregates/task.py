@@ -0,0 +1,69 @@
+import datetime
+import logging
+
+from celery import shared_task
+from django.db import IntegrityError, OperationalError
+
+from .sales import (
+    apply_order_sales, order_keys, product_sales_keys, rebuild_category_sales, reconcile_sales, refresh_sales,
+)
+
+logger = logging.getLogger(__name__)
+
+# Lost connections, locked tables and the like are retried with backoff.
+# Orders whose task still gives up are applied by reconcile_sales
+RETRY = dict(autoretry_for=(OperationalError,), retry_backoff=True, max_retries=5)
+
+
+@shared_task(bind=True, **RETRY)
+def apply_order_sales_task(self, order_ids):
+    """
+    Add new orders to the daily sales rollups, or take cancelled ones out.
+    """
+    try:
+        result = apply_order_sales(order_ids)
+    except IntegrityError as e:
+        # Another worker counted one of the orders first; the retry sees its ledger row
+        if self.request.is_eager:
+            raise
+        raise self.retry(exc=e, countdown=5)
+    logger.info(f"Sales rollups updated for {len(order_ids)} orders: {result}")
+    return result
+
+
+@shared_task(**RETRY)
+def refresh_sales_task(keys=(), order_ids=(), product_ids=()):
+    """
+    Recompute (product, day) pairs, given directly or by order, from the ledger.
+    """
+    keys = {(product_id, datetime.date.fromisoformat(day)) for product_id, day in keys}
+    return refresh_sales(keys | order_keys(order_ids, product_ids))
+
+
+@shared_task(**RETRY)
+def refresh_product_sales_task(product_ids, category_ids=()):
+    """
+    Recompute every rolled-up day of products whose category links changed.
+    """
+    return refresh_sales(product_sales_keys(product_ids), category_ids=category_ids)
+
+
+@shared_task(**RETRY)
+def rebuild_category_sales_task():
+    """
+    Rebuild every category rollup after categories moved or were deleted.
+    """
+    rows = rebuild_category_sales()
+    logger.info(f"Category sales rebuilt: {rows} rows")
+    return rows
+
+
+@shared_task(**RETRY)
+def reconcile_sales_task(batch_size=None):
+    """
+    Apply orders the commit tasks missed (see ``reconcile_sales``).
+    """
+    result = reconcile_sales(batch_size)
+    if any(result.values()):
+        logger.warning(f"Sales reconcile applied missed orders: {result}")
+    return result
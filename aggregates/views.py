@@ -0,0 +1,67 @@
+from decimal import Decimal
+
+from django.shortcuts import get_object_or_404
+from rest_framework import mixins, viewsets
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.response import Response
+
+from products.cache import cache_response
+from products.models import Category, Product
+from .models import CategoryStats, DailyCategorySales, DailyProductSales
+from .serializers import CategoryStatsSerializer, DailySalesSerializer, SalesReportQuerySerializer
+
+
+class CategoryStatsViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """Precomputed subtree product count and prices of a category, by category slug."""
+    queryset = CategoryStats.objects.select_related('category').filter(category__is_active=True)
+    serializer_class = CategoryStatsSerializer
+    permission_classes = [AllowAny]
+    lookup_field = 'category__slug'
+    lookup_url_kwarg = 'slug'
+
+    @cache_response(Category, Product)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+
+class SalesReportViewSet(viewsets.ViewSet):
+    """
+    Daily sales of one product (``?product=<id>``) or one category subtree
+    (``?category=<slug>``), optionally limited to ``?start=`` and ``?end=``
+    (inclusive ISO dates). Served from the daily rollups only.
+    """
+    permission_classes = [IsAdminUser]
+
+    def list(self, request):
+        params = SalesReportQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+
+        if 'product' in params:
+            rows = DailyProductSales.objects.filter(product_id=params['product'])
+        else:
+            category = get_object_or_404(Category, slug=params['category'])
+            rows = DailyCategorySales.objects.filter(category=category)
+        if params.get('start'):
+            rows = rows.filter(date__gte=params['start'])
+        if params.get('end'):
+            rows = rows.filter(date__lte=params['end'])
+
+        series = list(rows.order_by('date').values('date', 'order_count', 'units', 'revenue'))
+        totals = {
+            'order_count': sum(row['order_count'] for row in series),
+            'units': sum(row['units'] for row in series),
+            'revenue': sum((row['revenue'] for row in series), Decimal('0.00')),
+        }
+        return Response({
+            'product': params.get('product'),
+            'category': params.get('category'),
+            'start': params.get('start'),
+            'end': params.get('end'),
+            'days': DailySalesSerializer(series, many=True).data,
+            'totals': {
+                'order_count': totals['order_count'],
+                'units': totals['units'],
+                'revenue': f"{totals['revenue']:.2f}",
+            },
+        })
@@ -0,0 +1,15 @@
+"""
+Celery application for the project.
+
+Configuration comes from the ``CELERY_*`` Django settings. Tasks live in
+each app's ``task`` module.
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+app = Celery('backend')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks(related_name='task')
@@ -0,0 +1,39 @@
+"""
+Database settings for the development and production modes.
+"""
+
+POSTGRES_ENGINE = 'django.db.backends.postgresql'
+
+
+def database_from_env(env, default):
+    """
+    Build ``DATABASES['default']`` from ``DATABASE_URL``.
+
+    SQLite keeps Django's one-connection-per-request behaviour. PostgreSQL
+    connections are reused across requests in one of two ways:
+
+    - ``DB_POOL=true`` turns on psycopg 3's connection pool in each worker
+      process. The pool manages connection lifetime, so ``CONN_MAX_AGE``
+      must stay 0.
+    - otherwise every worker thread keeps a persistent connection for
+      ``DB_CONN_MAX_AGE`` seconds, and the connection is health-checked
+      before reuse.
+    """
+    config = env.db_url('DATABASE_URL', default=default)
+    if config['ENGINE'] != POSTGRES_ENGINE:
+        return config
+
+    options = config.setdefault('OPTIONS', {})
+    options.setdefault('connect_timeout', env.int('DB_CONNECT_TIMEOUT', default=5))
+
+    if env.bool('DB_POOL', default=False):
+        options['pool'] = {
+            'min_size': env.int('DB_POOL_MIN_SIZE', default=2),
+            'max_size': env.int('DB_POOL_MAX_SIZE', default=10),
+            'timeout': env.float('DB_POOL_TIMEOUT', default=10.0),
+        }
+        config['CONN_MAX_AGE'] = 0
+    else:
+        config['CONN_MAX_AGE'] = env.int('DB_CONN_MAX_AGE', default=60)
+        config['CONN_HEALTH_CHECKS'] = True
+    return config
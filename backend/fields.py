@@ -0,0 +1,122 @@
+"""
+Sparse fieldsets for the API: ``?fields=`` and ``?expand=``.
+
+``?fields=id,sku,name`` keeps only the listed top-level fields of a read
+response. ``?expand=product`` renders the listed relations in full instead
+of as their compact summary.
+
+The same selection drives the queryset: ``plan_queryset`` loads only the
+columns behind the fields that are left and prefetches only the relations
+they read, so unrequested data is never fetched.
+"""
+from typing import Iterable, Optional, Set
+
+from django.db.models import Prefetch
+from rest_framework.permissions import SAFE_METHODS
+
+
+def requested_fields(request) -> Optional[Set[str]]:
+    """Field names from ``?fields=``, or None when every field is wanted."""
+    value = request.query_params.get('fields') if request is not None else None
+    if not value:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def requested_expand(request) -> Set[str]:
+    """Relation names from ``?expand=``."""
+    value = request.query_params.get('expand', '') if request is not None else ''
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class DynamicFieldsMixin:
+    """
+    Serializer mixin accepting a ``fields`` argument that limits the output
+    to those names; unknown names are ignored.
+
+    Two hints tell ``plan_queryset`` what the remaining fields read:
+    ``field_columns`` maps fields that are not model fields of the same
+    name to the columns behind them, and ``field_prefetches`` maps
+    relation fields to a function of the serializer returning the
+    ``prefetch_related`` lookups to apply.
+    """
+    field_columns = {}
+    field_prefetches = {}
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+def plan_queryset(queryset, serializer, always: Iterable[str] = ('pk',), defer_columns: bool = True):
+    """
+    Apply ``only()`` and the prefetches needed by ``serializer``'s fields.
+
+    ``only()`` is skipped when a field reads something the hints do not
+    describe, so an unknown property never costs a query per row.
+    """
+    concrete = {field.name for field in queryset.model._meta.concrete_fields}
+    columns, lookups, known = set(always), {}, True
+
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if name in serializer.field_prefetches:
+            for lookup in serializer.field_prefetches[name](serializer):
+                lookups[lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup] = lookup
+        if name in serializer.field_columns:
+            columns.update(serializer.field_columns[name])
+        elif field.source.split('.')[0] in concrete:
+            columns.add(field.source.split('.')[0])
+        elif name not in serializer.field_prefetches:
+            known = False
+
+    if defer_columns and known:
+        queryset = queryset.only(*columns)
+    if lookups:
+        queryset = queryset.prefetch_related(*lookups.values())
+    return queryset
+
+
+class SparseFieldsMixin:
+    """
+    ViewSet mixin applying ``?fields=`` and ``?expand=``.
+
+    Reads by the actions in ``sparse_actions`` get serializers pruned to
+    ``?fields=`` and querysets limited to the columns those fields read.
+    Every serializer sees the ``?expand=`` set in its context. Other actions
+    (writes, custom reports) keep every field and column and only get the
+    prefetches. ``get_queryset`` implementations pass their result through
+    ``plan_queryset``.
+    """
+    sparse_actions = ('list', 'retrieve')
+    # Columns loaded whatever ?fields= asks for, e.g. pagination keys
+    always_columns = ('pk',)
+
+    def _sparse_read(self) -> bool:
+        return (
+            self.request is not None
+            and self.request.method in SAFE_METHODS
+            and self.action in self.sparse_actions
+        )
+
+    def sparse_fields(self) -> Optional[Set[str]]:
+        return requested_fields(self.request) if self._sparse_read() else None
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['expand'] = requested_expand(self.request)
+        return context
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.sparse_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def plan_queryset(self, queryset):
+        return plan_queryset(
+            queryset, self.get_serializer(), self.always_columns, defer_columns=self._sparse_read()
+        )
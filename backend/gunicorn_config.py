@@ -0,0 +1,39 @@
+"""
+Gunicorn settings, loaded with ``gunicorn -c python:backend.gunicorn_config``.
+
+Threaded workers keep each process's database connections (persistent or
+pooled, see ``backend.database``) busy across requests. Every worker opens
+at most ``threads`` connections, so PostgreSQL has to accept
+``workers * threads`` per replica. ``DB_POOL_MAX_SIZE`` should be at least
+``threads``.
+"""
+import multiprocessing
+import os
+
+
+def cpu_count():
+    # Respect container CPU limits where the platform exposes them
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return multiprocessing.cpu_count()
+
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+worker_class = "gthread"
+workers = int(os.environ.get("GUNICORN_WORKERS", cpu_count() * 2 + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then so slow leaks cannot build up
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = 100
+
+# No preload: connections opened at import time must not be shared across forks
+preload_app = False
+
+accesslog = "-"
+errorlog = "-"
@@ -0,0 +1,193 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CountOptionalPageNumberPagination(PageNumberPagination):
+    """
+    Page number pagination where ``?count=false`` skips the COUNT(*) query.
+
+    Without a count the page is fetched with one extra row to tell whether a
+    next page exists, and ``count`` is returned as ``null``.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get('count', '').lower() != 'false':
+            self.skip_count = False
+            return super().paginate_queryset(queryset, request, view)
+
+        self.skip_count = True
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        try:
+            self.page_number = max(1, int(request.query_params.get(self.page_query_param, 1)))
+        except ValueError:
+            raise NotFound("Invalid page.")
+
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_paginated_response(self, data):
+        if not self.skip_count:
+            return super().get_paginated_response(data)
+
+        url = self.request.build_absolute_uri()
+        next_url = replace_query_param(url, self.page_query_param, self.page_number + 1) if self.has_next else None
+        previous_url = None
+        if self.page_number > 1:
+            previous_url = replace_query_param(url, self.page_query_param, self.page_number - 1)
+        return Response(OrderedDict([
+            ('count', None),
+            ('next', next_url),
+            ('previous', previous_url),
+            ('results', data),
+        ]))
+
+
+class CreatedAtKeysetPagination(BasePagination):
+    """
+    Keyset pagination over ``(created_at, id)``, newest first.
+
+    The cursor carries the sort key of the row at the page boundary, and the
+    next page is a range condition on the composite ``(created_at, id)``
+    index. Every page costs the same no matter how deep it is, and no total
+    count is computed. Parameters are read from ``request.GET`` so plain
+    Django requests from the async views can be paginated too.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    page_size = None
+    invalid_cursor_message = "Invalid cursor."
+
+    def get_page_size(self, request):
+        default = self.page_size or settings.REST_FRAMEWORK.get('PAGE_SIZE') or 20
+        try:
+            size = int(request.GET.get(self.page_size_query_param, default))
+        except ValueError:
+            size = default
+        return max(1, min(size, self.max_page_size))
+
+    @staticmethod
+    def encode_cursor(created_at, pk, reverse=False):
+        payload = json.dumps({'c': created_at.isoformat(), 'i': str(pk), 'r': int(reverse)})
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    @classmethod
+    def decode_cursor(cls, value, model=None):
+        """``(created_at, pk, reverse)`` from a cursor; the pk is checked against ``model``."""
+        try:
+            padded = value + '=' * (-len(value) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            created_at = parse_datetime(payload['c'])
+            if created_at is None:
+                raise ValueError
+            pk = payload['i']
+            if model is not None:
+                pk = model._meta.pk.to_python(pk)
+            return created_at, pk, bool(payload.get('r'))
+        except (binascii.Error, ValueError, KeyError, TypeError, ValidationError):
+            raise NotFound(cls.invalid_cursor_message)
+
+    def _page_queryset(self, queryset, request):
+        self.request = request
+        self.limit = self.get_page_size(request)
+        raw_cursor = request.GET.get(self.cursor_query_param)
+        self.cursor = self.decode_cursor(raw_cursor, queryset.model) if raw_cursor else None
+        self.reverse = bool(self.cursor and self.cursor[2])
+
+        if self.cursor:
+            created_at, pk, _ = self.cursor
+            # The redundant leading bound lets the planner seek into the index
+            # instead of filtering a scan from the top
+            if self.reverse:
+                queryset = queryset.filter(
+                    Q(created_at__gte=created_at),
+                    Q(created_at__gt=created_at) | Q(id__gt=pk),
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(created_at__lte=created_at),
+                    Q(created_at__lt=created_at) | Q(id__lt=pk),
+                )
+
+        ordering = ('created_at', 'id') if self.reverse else ('-created_at', '-id')
+        return queryset.order_by(*ordering)[:self.limit + 1]
+
+    def _finish_page(self, rows):
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+        if self.reverse:
+            rows.reverse()
+
+        self.page = rows
+        # Walking backwards we arrived from a later page, so a next page exists
+        self.has_next = has_more if not self.reverse else bool(rows)
+        self.has_previous = bool(self.cursor) if not self.reverse else has_more
+        return rows
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self._finish_page(list(self._page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request):
+        """``paginate_queryset`` for async views, reading the page with ``async for``."""
+        return self._finish_page([row async for row in self._page_queryset(queryset, request)])
+
+    def _link(self, row, reverse):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, 'page')
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(row.created_at, row.pk, reverse)
+        )
+
+    def get_paginated_data(self, data):
+        next_url = self._link(self.page[-1], False) if self.has_next and self.page else None
+        previous_url = self._link(self.page[0], True) if self.has_previous and self.page else None
+        return OrderedDict([
+            ('next', next_url),
+            ('previous', previous_url),
+            ('results', data),
+        ])
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+
+class CatalogPagination(BasePagination):
+    """
+    Page numbers by default; keyset pagination on request.
+
+    ``?paginate=cursor`` (or any ``?cursor=``) switches to
+    ``CreatedAtKeysetPagination``, which orders by recency. Page number mode
+    accepts ``?count=false`` to skip the COUNT(*).
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if params.get('paginate') == 'cursor' or 'cursor' in params:
+            self.delegate = CreatedAtKeysetPagination()
+        else:
+            self.delegate = CountOptionalPageNumberPagination()
+        return self.delegate.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.delegate.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return CountOptionalPageNumberPagination().get_paginated_response_schema(schema)
@@ -0,0 +1,53 @@
+"""
+JSON rendering with orjson.
+
+``ORJSONRenderer`` is a drop-in replacement for DRF's ``JSONRenderer``:
+same media type, same ``indent`` handling and the same output for the
+types DRF's encoder knows about, at a fraction of the CPU cost.
+"""
+import orjson
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.mediatypes import parse_header_parameters
+
+_default = JSONEncoder().default
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    Render JSON with orjson.
+
+    UUIDs and dict/list subclasses (``ReturnDict``, ``OrderedDict``) are
+    serialized natively. Datetimes and anything else orjson does not handle
+    go through DRF's encoder, so they render exactly as with ``JSONRenderer``;
+    that includes raw ``Decimal`` values, which become floats. Serializer
+    fields have already turned amounts into strings by then.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        options = self.options
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+
+        ret = orjson.dumps(data, default=_default, option=options)
+        # Keep the output a strict JavaScript subset, like JSONRenderer
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+    def get_indent(self, accepted_media_type, renderer_context):
+        # orjson only indents by two spaces; any requested indent turns it on
+        if accepted_media_type:
+            _, params = parse_header_parameters(accepted_media_type)
+            try:
+                return int(params['indent'])
+            except (KeyError, ValueError, TypeError):
+                pass
+        return renderer_context.get('indent')
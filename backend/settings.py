@@ -45,6 +45,7 @@ INSTALLED_APPS = [
     "products",
     "orders",
     "notifications",
+    "aggregates",
 ]
 
 AUTH_USER_MODEL = "customers.Customer"
@@ -90,24 +91,32 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
-
 import environ
 import os
 
+from .database import database_from_env
+
 env = environ.Env()
 environ.Env.read_env(os.path.join(BASE_DIR, ".env"))
 
+# SQLite unless DATABASE_URL is set, e.g. postgres://user:pass@db:5432/orders
+DATABASES = {
+    'default': database_from_env(env, default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}")
+}
+
 
 AFRICASTALKING_USERNAME = env("AFRICASTALKING_USERNAME", default="sandbox")
 AFRICASTALKING_API_KEY = env("AFRICASTALKING_API_KEY", default="")
 
 AT_SANDBOX_NUMBER = env("AT_SANDBOX_NUMBER", default="")
+AFRICASTALKING_SENDER_ID = env("AFRICASTALKING_SENDER_ID", default="")
+
+# SMS transport (notifications.sms); SMS_TRANSPORT takes a dotted path to
+# override the Africa's Talking client, e.g. notifications.sms.FakeTransport
+SMS_TRANSPORT = env("SMS_TRANSPORT", default="")
+SMS_MAX_WORKERS = env.int("SMS_MAX_WORKERS", default=4)
+SMS_MAX_RECIPIENTS = env.int("SMS_MAX_RECIPIENTS", default=100)
+SMS_DEFAULT_COUNTRY_CODE = env("SMS_DEFAULT_COUNTRY_CODE", default="254")
 
 
 
@@ -119,12 +128,49 @@ EMAIL_HOST_PASSWORD = env("EMAIL_HOST_PASSWORD")
 EMAIL_USE_TLS=True
 DEFAULT_FROM_EMAIL = env("DEFAULT_FROM_EMAIL")
 
-CELERY_TASK_ALWAYS_EAGER = True
+# Send admins one periodic digest of new orders (send_admin_digest) instead
+# of one email per order
+ADMIN_EMAIL_DIGEST = env.bool("ADMIN_EMAIL_DIGEST", default=False)
+ADMIN_EMAIL_DIGEST_MAX_ORDERS = env.int("ADMIN_EMAIL_DIGEST_MAX_ORDERS", default=500)
+
+# Cache (local memory by default, Redis when REDIS_URL is set)
+REDIS_URL = env("REDIS_URL", default="")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        }
+    }
+
+# Seconds a cached catalog response lives (see products.cache)
+CATALOG_CACHE_TIMEOUT = env.int("CATALOG_CACHE_TIMEOUT", default=300)
+
+# Tasks run inline unless a broker is configured; deployments set
+# CELERY_TASK_ALWAYS_EAGER=false and run `celery -A backend worker`
+CELERY_BROKER_URL = env("CELERY_BROKER_URL", default="redis://localhost:6379/0")
+CELERY_TASK_ALWAYS_EAGER = env.bool("CELERY_TASK_ALWAYS_EAGER", default=True)
 CELERY_TASK_EAGER_PROPAGATES = True
 
 
 
 # REST Framework settings
+# JSON renderer for the API (set API_JSON_RENDERER=rest_framework.renderers.JSONRenderer
+# for the stdlib one). The browsable API follows DEBUG unless API_BROWSABLE is set;
+# deployments turn it off
+API_JSON_RENDERER = env("API_JSON_RENDERER", default="backend.renderers.ORJSONRenderer")
+API_BROWSABLE = env.bool("API_BROWSABLE", default=DEBUG)
+API_RENDERER_CLASSES = [API_JSON_RENDERER]
+if API_BROWSABLE:
+    API_RENDERER_CLASSES.append('rest_framework.renderers.BrowsableAPIRenderer')
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'oauth2_provider.contrib.rest_framework.OAuth2Authentication',
@@ -133,10 +179,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
-    ],
+    'DEFAULT_RENDERER_CLASSES': API_RENDERER_CLASSES,
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
 }
@@ -216,6 +259,10 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded files (product import jobs are stored under MEDIA_ROOT/imports)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
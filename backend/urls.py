@@ -17,9 +17,12 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from products.views import CategoryViewSet, ProductViewSet
+from products.views import CategoryViewSet, ProductViewSet, ProductImportJobViewSet
 from customers.views import CustomerViewSet
 from orders.views import OrderViewSet
+from aggregates.views import CategoryStatsViewSet, SalesReportViewSet
+from orders import async_views as order_async_views
+from products import async_views as product_async_views
 
     
 
@@ -30,11 +33,23 @@ from orders.views import OrderViewSet
 router = DefaultRouter()
 router.register(r'categories', CategoryViewSet)
 router.register(r'products', ProductViewSet)
+router.register(r'import-jobs', ProductImportJobViewSet)
 router.register(r'customers', CustomerViewSet)
 router.register(r'orders', OrderViewSet)
+router.register(r'category-stats', CategoryStatsViewSet)
+router.register(r'reports/sales', SalesReportViewSet, basename='sales-report')
+
+# Async (ASGI) versions of the hot read endpoints
+async_urlpatterns = [
+    path('products/', product_async_views.product_list, name='async-product-list'),
+    path('products/<slug:slug>/', product_async_views.product_detail, name='async-product-detail'),
+    path('categories/tree/', product_async_views.category_tree, name='async-category-tree'),
+    path('orders/', order_async_views.my_orders, name='async-my-orders'),
+]
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/async/', include(async_urlpatterns)),
     path('api/', include(router.urls)),
     path('o/', include('oauth2_provider.urls', namespace='oauth2_provider')), 
 ]
@@ -1,8 +1,10 @@
 from rest_framework import serializers
+
+from backend.fields import DynamicFieldsMixin
 from .models import Customer
 
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Customer
         fields = [
@@ -2,14 +2,17 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+
+from backend.fields import SparseFieldsMixin
 from .models import Customer
 from .serializers import CustomerSerializer, CustomerRegistrationSerializer
 
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
     permission_classes = [IsAuthenticated]
+    sparse_actions = ('list', 'retrieve', 'me')
 
     def get_permissions(self):
         if self.action in ['create', 'register']:
@@ -20,8 +23,8 @@ class CustomerViewSet(viewsets.ModelViewSet):
         user = self.request.user
         if user.is_authenticated:
             if user.is_staff:
-                return Customer.objects.all()
-            return Customer.objects.filter(id=user.id)
+                return self.plan_queryset(Customer.objects.all())
+            return self.plan_queryset(Customer.objects.filter(id=user.id))
         return Customer.objects.none()
 
     @action(detail=False, methods=['post'], permission_classes=[AllowAny])
@@ -40,7 +43,7 @@ class CustomerViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def me(self, request):
-        return Response(CustomerSerializer(request.user).data)
+        return Response(self.get_serializer(request.user).data)
 
     @action(detail=False, methods=['patch'])
     def update_profile(self, request):
@@ -1,3 +1,9 @@
 from django.contrib import admin
+from .models import NotificationOutbox
 
-# Register your models here.
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = ("order", "event", "channel", "status", "attempts", "next_attempt_at", "created_at", "sent_at")
+    search_fields = ("order__order_number",)
+    list_filter = ("status", "channel", "event")
@@ -0,0 +1,82 @@
+"""
+Email delivery engine.
+
+Messages are built in memory and sent over a single backend connection per
+batch (``get_connection()`` plus ``send_messages``). Previously every email
+opened and closed its own SMTP session through ``send_mail``. Templates are
+compiled once per process.
+"""
+import functools
+import logging
+from typing import Dict, Hashable, List
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import get_template
+from django.utils.html import strip_tags
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def get_cached_template(name: str):
+    """Compiled template, looked up and parsed once per process."""
+    return get_template(name)
+
+
+def build_message(subject: str, recipients: List[str], template: str, context: dict) -> EmailMultiAlternatives:
+    """An HTML email with a plain-text alternative derived from the same render."""
+    html = get_cached_template(template).render(context)
+    message = EmailMultiAlternatives(
+        subject=subject,
+        body=strip_tags(html),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=recipients,
+    )
+    message.attach_alternative(html, "text/html")
+    return message
+
+
+class EmailQueue:
+    """
+    Collect messages and send them over one connection.
+
+    ``flush()`` opens the backend connection once, sends every message on it
+    and returns ``{key: delivered}``. A failing message does not stop the
+    rest of the batch.
+    """
+
+    def __init__(self, connection=None):
+        self.connection = connection
+        self._pending = []  # (key, message)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, key: Hashable, message: EmailMultiAlternatives) -> None:
+        self._pending.append((key, message))
+
+    def flush(self) -> Dict[Hashable, bool]:
+        pending, self._pending = self._pending, []
+        if not pending:
+            return {}
+
+        results = {key: False for key, _ in pending}
+        connection = self.connection or get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as e:
+            logger.error("Failed to open email connection | %s", e, exc_info=True)
+            return results
+
+        try:
+            for key, message in pending:
+                message.connection = connection
+                try:
+                    results[key] = bool(connection.send_messages([message]))
+                    logger.info("Email sent | Recipient=%s | Subject=%s", message.to, message.subject)
+                except Exception as e:
+                    logger.error("Failed to send email | Recipient=%s | %s", message.to, e, exc_info=True)
+        finally:
+            connection.close()
+        return results
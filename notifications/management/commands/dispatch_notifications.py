@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import drain
+
+
+class Command(BaseCommand):
+    help = "Deliver pending order notifications from the outbox in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None, help="Rows claimed per batch.")
+        parser.add_argument("--loop", action="store_true", help="Keep polling the outbox instead of exiting.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds to sleep between polls with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            result = drain(options["batch_size"])
+            if result["claimed"]:
+                self.stdout.write(
+                    f"Claimed {result['claimed']} | Sent {result['sent']} | Failed {result['failed']}"
+                )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
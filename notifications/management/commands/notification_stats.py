@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from notifications.metrics import notification_stats
+
+
+class Command(BaseCommand):
+    help = "Show send, retry and dedup counters of order notifications."
+
+    def handle(self, *args, **options):
+        for channel, stats in notification_stats().items():
+            self.stdout.write(
+                f"{channel}: Sent {stats['sent']} | Failed {stats['failed']} "
+                f"| Retried {stats['retried']} | Dedup skipped {stats['dedup_skipped']}"
+            )
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import send_admin_digest
+
+
+class Command(BaseCommand):
+    help = "Email the admin one digest of new orders waiting in the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=None, help="Most orders listed in one digest.")
+        parser.add_argument("--loop", action="store_true", help="Keep sending digests instead of exiting.")
+        parser.add_argument("--interval", type=float, default=900.0, help="Seconds between digests with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            result = send_admin_digest(options["limit"])
+            if result["claimed"]:
+                self.stdout.write(
+                    f"Digest of {result['claimed']} | Sent {result['sent']} | Failed {result['failed']}"
+                )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
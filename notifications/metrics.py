@@ -0,0 +1,48 @@
+"""
+Delivery counters for order notifications.
+
+Counters live in the default cache so every worker and dispatcher adds to
+the same totals (see ``python manage.py notification_stats``).
+"""
+import logging
+from typing import Dict
+
+from django.core.cache import cache
+
+from .models import NotificationOutbox
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY = "notifications:stats:{}:{}"
+
+SENT = "sent"
+FAILED = "failed"
+RETRIED = "retried"
+DEDUP_SKIPPED = "dedup_skipped"
+OUTCOMES = (SENT, FAILED, RETRIED, DEDUP_SKIPPED)
+
+
+def record(channel: str, outcome: str, count: int = 1) -> None:
+    """Add ``count`` to the ``outcome`` counter of ``channel``."""
+    if count <= 0:
+        return
+    key = STATS_KEY.format(channel, outcome)
+    try:
+        cache.incr(key, count)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key, count)
+    except Exception as e:
+        # Metrics must never fail a delivery
+        logger.warning("Could not record notification metric %s | %s", key, e)
+
+
+def notification_stats() -> Dict[str, Dict[str, int]]:
+    """``{channel: {outcome: count}}`` for every channel."""
+    channels = [channel for channel, _ in NotificationOutbox.CHANNEL_CHOICES]
+    keys = {(channel, outcome): STATS_KEY.format(channel, outcome) for channel in channels for outcome in OUTCOMES}
+    found = cache.get_many(list(keys.values()))
+    return {
+        channel: {outcome: found.get(keys[channel, outcome], 0) for outcome in OUTCOMES}
+        for channel in channels
+    }
@@ -1,3 +1,77 @@
 from django.db import models
 
-# Create your models here.
+
+class NotificationOutbox(models.Model):
+    """
+    Transactional outbox for order notifications.
+
+    Rows are written in the same transaction as the order they belong to and
+    drained in batches by the dispatcher (see ``notifications.outbox``), so
+    the request that creates an order never waits on SMS or SMTP.
+    """
+    EVENT_ORDER_CREATED = 'order_created'
+    # Customer SMS on status changes, one event per target status
+    STATUS_EVENTS = {
+        status: f'order_{status}'
+        for status in ('confirmed', 'shipped', 'delivered', 'cancelled', 'refunded')
+    }
+
+    CHANNEL_SMS = 'sms'
+    CHANNEL_ADMIN_EMAIL = 'admin_email'
+    CHANNEL_CHOICES = [
+        (CHANNEL_SMS, 'SMS'),
+        (CHANNEL_ADMIN_EMAIL, 'Admin email'),
+    ]
+
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    # Another sender already delivered the order on this channel
+    STATUS_SKIPPED = 'skipped'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+        (STATUS_SKIPPED, 'Skipped'),
+    ]
+
+    order = models.ForeignKey(
+        'orders.Order',
+        on_delete=models.CASCADE,
+        related_name='notifications'
+    )
+    event = models.CharField(max_length=50, default=EVENT_ORDER_CREATED)
+    channel = models.CharField(max_length=20, choices=CHANNEL_CHOICES)
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # Failed rows wait until then before the next attempt (exponential backoff)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'notification_outbox'
+        verbose_name = 'Notification Outbox Entry'
+        verbose_name_plural = 'Notification Outbox'
+        ordering = ['created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['order', 'event', 'channel'],
+                name='unique_notification_per_order_event_channel'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='outbox_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event}:{self.channel} for order {self.order_id} ({self.status})"
@@ -0,0 +1,397 @@
+import logging
+import random
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from orders.models import Order
+from . import metrics
+from .mailer import EmailQueue
+from .models import NotificationOutbox
+from .sms import SmsQueue
+from .utils import NotificationService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_DIGEST_MAX_ORDERS = 500
+DEFAULT_RETRY_BASE_DELAY = 30
+DEFAULT_RETRY_MAX_DELAY = 3600
+DEFAULT_CLAIM_TIMEOUT = 300
+
+EMPTY_RESULT = {"claimed": 0, "sent": 0, "skipped": 0, "failed": 0}
+
+# Channel -> Order flag set once the order_created event has been delivered
+CHANNELS = {
+    NotificationOutbox.CHANNEL_SMS: 'sms_sent',
+    NotificationOutbox.CHANNEL_ADMIN_EMAIL: 'email_sent_to_admin',
+}
+
+
+# Status event -> the status it announces
+EVENT_STATUSES = {event: status for status, event in NotificationOutbox.STATUS_EVENTS.items()}
+
+
+def enqueue_order_notifications(
+    orders: Iterable[Order],
+    event: str = NotificationOutbox.EVENT_ORDER_CREATED,
+    channels: Optional[Iterable[str]] = None,
+) -> None:
+    """
+    Write outbox rows for the given orders, one per channel.
+
+    Must be called inside the transaction that creates or changes the orders
+    so the rows commit (or roll back) together with them. Re-enqueueing an
+    order is a no-op thanks to the (order, event, channel) unique constraint.
+    """
+    channels = list(channels or CHANNELS)
+    entries = [
+        NotificationOutbox(order=order, event=event, channel=channel)
+        for order in orders
+        for channel in channels
+    ]
+    NotificationOutbox.objects.bulk_create(entries, ignore_conflicts=True)
+
+
+def schedule_dispatch(order_ids: Iterable, channels: Optional[Iterable[str]] = None) -> None:
+    """
+    Queue delivery of the given orders' notifications once the current transaction commits.
+
+    Only those orders' rows are sent, by ``send_order_notifications_task``
+    on a worker; the request never sends itself unless Celery runs tasks
+    eagerly. The kick is best effort: if the broker is unreachable the rows
+    stay pending for the next ``dispatch_notifications`` run, and the order
+    request is not failed after its data has already been committed.
+    """
+    from .task import send_order_notifications_task
+
+    order_ids = [str(pk) for pk in order_ids]
+    channels = list(channels) if channels else None
+    transaction.on_commit(lambda: send_order_notifications_task.delay(order_ids, channels), robust=True)
+
+
+def _build_sms(entry: NotificationOutbox):
+    if entry.event in EVENT_STATUSES:
+        return NotificationService.order_status_sms(entry.order, EVENT_STATUSES[entry.event])
+    return NotificationService.order_sms(entry.order)
+
+
+def _deliver(entries) -> Dict:
+    """
+    Send a claimed batch and return ``{entry id: delivered}``.
+
+    SMS entries go through one ``SmsQueue`` so identical texts share a
+    request and the rest are sent concurrently. Emails go through one
+    ``EmailQueue`` so the whole batch shares a single connection.
+    """
+    outcomes = {}
+    sms_queue = SmsQueue()
+    email_queue = EmailQueue()
+    for entry in entries:
+        try:
+            if entry.channel == NotificationOutbox.CHANNEL_SMS:
+                sms = _build_sms(entry)
+                if sms is None:
+                    outcomes[entry.id] = False
+                else:
+                    sms_queue.add(entry.id, *sms)
+            else:
+                message = NotificationService.order_admin_email(entry.order)
+                if message is None:
+                    outcomes[entry.id] = False
+                else:
+                    email_queue.add(entry.id, message)
+        except Exception as e:
+            logger.error("Outbox delivery raised | Entry=%s | %s", entry.id, e, exc_info=True)
+            outcomes[entry.id] = False
+
+    for entry_id, result in sms_queue.flush().items():
+        outcomes[entry_id] = result.ok
+    outcomes.update(email_queue.flush())
+    return outcomes
+
+
+def _deliver_digest(entries) -> Dict:
+    """Send one admin email listing the orders of ``entries``; they share its outcome."""
+    entries = sorted(entries, key=lambda entry: entry.order.created_at)
+    # Same rule as the per-order email: orders without a total are not reported
+    listed = [entry for entry in entries if entry.order.total_amount > 0]
+    delivered = False
+    try:
+        message = NotificationService.admin_digest_email(entry.order for entry in listed)
+        if message is not None:
+            queue = EmailQueue()
+            queue.add("digest", message)
+            delivered = queue.flush()["digest"]
+    except Exception as e:
+        logger.error("Failed to build admin digest | %s", e, exc_info=True)
+    return {entry.id: delivered for entry in listed}
+
+
+def digest_enabled() -> bool:
+    """Whether admin emails are batched into a periodic digest instead of sent per order."""
+    return getattr(settings, "ADMIN_EMAIL_DIGEST", False)
+
+
+def retry_delay(attempts: int) -> float:
+    """
+    Seconds to wait before the next attempt: exponential in ``attempts`` and
+    capped, with jitter so rows that failed together do not retry together.
+    """
+    base = getattr(settings, "NOTIFICATION_RETRY_BASE_DELAY", DEFAULT_RETRY_BASE_DELAY)
+    cap = getattr(settings, "NOTIFICATION_RETRY_MAX_DELAY", DEFAULT_RETRY_MAX_DELAY)
+    delay = min(cap, base * 2 ** max(attempts - 1, 0))
+    return random.uniform(delay / 2, delay)
+
+
+def _claimable(now) -> Q:
+    """
+    Rows a dispatcher may claim: due pending rows, and rows left in processing
+    longer than ``NOTIFICATION_CLAIM_TIMEOUT`` seconds by a dispatcher that died.
+    """
+    timeout = getattr(settings, "NOTIFICATION_CLAIM_TIMEOUT", DEFAULT_CLAIM_TIMEOUT)
+    due = Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now)
+    return (
+        Q(due, status=NotificationOutbox.STATUS_PENDING)
+        | Q(status=NotificationOutbox.STATUS_PROCESSING, claimed_at__lt=now - timedelta(seconds=timeout))
+    )
+
+
+def _release_stale_flags(ids) -> None:
+    """
+    Clear the order flags held by stale ``order_created`` rows among ``ids``.
+
+    A dispatcher claims the flag before sending, so one that died mid-send
+    leaves it set. Each order has a single ``order_created`` row per channel,
+    so the flag belongs to that row, and the new claim must be able to set
+    it again. Otherwise the notification would never go out.
+    """
+    stale = (
+        NotificationOutbox.objects
+        .filter(id__in=ids, status=NotificationOutbox.STATUS_PROCESSING,
+                event=NotificationOutbox.EVENT_ORDER_CREATED)
+        .values_list('channel', 'order_id')
+    )
+    by_channel = defaultdict(list)
+    for channel, order_id in stale:
+        by_channel[channel].append(order_id)
+    for channel, order_ids in by_channel.items():
+        Order.objects.filter(id__in=order_ids).update(**{CHANNELS[channel]: False})
+
+
+def _claim_batch(batch_size: Optional[int], channels: Optional[Iterable[str]] = None,
+                 exclude_channels: Iterable[str] = (), order_ids: Optional[Iterable] = None) -> list:
+    """Atomically move up to ``batch_size`` claimable rows (all if None) to processing."""
+    now = timezone.now()
+    claimable = NotificationOutbox.objects.filter(_claimable(now))
+    if order_ids is not None:
+        claimable = claimable.filter(order_id__in=list(order_ids))
+    if channels is not None:
+        claimable = claimable.filter(channel__in=list(channels))
+    if exclude_channels:
+        claimable = claimable.exclude(channel__in=list(exclude_channels))
+
+    with transaction.atomic():
+        ids = list(
+            claimable
+            .select_for_update(skip_locked=True)
+            .order_by('created_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        _release_stale_flags(ids)
+        NotificationOutbox.objects.filter(_claimable(now), id__in=ids).update(
+            status=NotificationOutbox.STATUS_PROCESSING,
+            claimed_at=now,
+            attempts=F('attempts') + 1,
+        )
+    return ids
+
+
+def _load_entries(ids) -> list:
+    """Claimed rows with their order and customer, loaded in one query."""
+    return list(NotificationOutbox.objects.filter(id__in=ids).select_related('order__customer'))
+
+
+def _claim_order_flags(entries) -> set:
+    """
+    Set the ``Order`` delivery flag of every ``order_created`` entry before sending.
+
+    The flag is the idempotency key for order + channel: it is flipped with a
+    conditional UPDATE on the rows still unset, so whichever sender flips it
+    owns the delivery. Returns the ids of entries whose flag was already set,
+    which must not be sent again.
+    """
+    by_channel = defaultdict(list)
+    for entry in entries:
+        if entry.event == NotificationOutbox.EVENT_ORDER_CREATED:
+            by_channel[entry.channel].append(entry)
+
+    skipped = set()
+    with transaction.atomic():
+        for channel, channel_entries in by_channel.items():
+            flag = CHANNELS[channel]
+            claimed = set(
+                Order.objects.select_for_update()
+                .filter(id__in=[entry.order_id for entry in channel_entries], **{flag: False})
+                .values_list('id', flat=True)
+            )
+            if claimed:
+                Order.objects.filter(id__in=claimed, **{flag: False}).update(**{flag: True})
+            skipped.update(entry.id for entry in channel_entries if entry.order_id not in claimed)
+    return skipped
+
+
+def _record_outcomes(entries, outcomes: Dict, skipped: set, max_attempts: int) -> Dict[str, int]:
+    """
+    Write delivery outcomes back and release the flags of undelivered orders.
+
+    Sent, skipped and failed rows take one UPDATE each; retried rows get their
+    own backoff delay and are written with one ``bulk_update``.
+    """
+    sent_ids, skipped_ids, retry_entries, failed_ids = [], [], [], []
+    released_orders = {channel: [] for channel in CHANNELS}
+    counts = defaultdict(lambda: defaultdict(int))
+    now = timezone.now()
+
+    for entry in entries:
+        if entry.id in skipped:
+            skipped_ids.append(entry.id)
+            counts[entry.channel][metrics.DEDUP_SKIPPED] += 1
+            continue
+        if outcomes.get(entry.id):
+            sent_ids.append(entry.id)
+            counts[entry.channel][metrics.SENT] += 1
+            continue
+
+        if entry.event == NotificationOutbox.EVENT_ORDER_CREATED:
+            released_orders[entry.channel].append(entry.order_id)
+        if entry.attempts >= max_attempts:
+            failed_ids.append(entry.id)
+            counts[entry.channel][metrics.FAILED] += 1
+        else:
+            entry.status = NotificationOutbox.STATUS_PENDING
+            entry.last_error = "Delivery failed"
+            entry.next_attempt_at = now + timedelta(seconds=retry_delay(entry.attempts))
+            retry_entries.append(entry)
+            counts[entry.channel][metrics.RETRIED] += 1
+
+    with transaction.atomic():
+        if sent_ids:
+            NotificationOutbox.objects.filter(id__in=sent_ids).update(
+                status=NotificationOutbox.STATUS_SENT, sent_at=now
+            )
+        if skipped_ids:
+            NotificationOutbox.objects.filter(id__in=skipped_ids).update(
+                status=NotificationOutbox.STATUS_SKIPPED, last_error="Already delivered"
+            )
+        if retry_entries:
+            NotificationOutbox.objects.bulk_update(retry_entries, ['status', 'last_error', 'next_attempt_at'])
+        if failed_ids:
+            NotificationOutbox.objects.filter(id__in=failed_ids).update(
+                status=NotificationOutbox.STATUS_FAILED, last_error="Delivery failed"
+            )
+        for channel, order_ids in released_orders.items():
+            if order_ids:
+                Order.objects.filter(id__in=order_ids).update(**{CHANNELS[channel]: False})
+
+    for channel, outcome_counts in counts.items():
+        for outcome, count in outcome_counts.items():
+            metrics.record(channel, outcome, count)
+
+    return {
+        "sent": len(sent_ids), "skipped": len(skipped_ids),
+        "retry": len(retry_entries), "failed": len(failed_ids),
+    }
+
+
+def _process(ids, deliver, label: str) -> Dict[str, int]:
+    """Deliver claimed rows with ``deliver(entries) -> {entry id: delivered}`` and record the outcomes."""
+    max_attempts = getattr(settings, "NOTIFICATION_OUTBOX_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)
+    entries = _load_entries(ids)
+    skipped = _claim_order_flags(entries)
+    outcomes = deliver([entry for entry in entries if entry.id not in skipped])
+    result = _record_outcomes(entries, outcomes, skipped, max_attempts)
+
+    logger.info(
+        "%s | Claimed=%s | Sent=%s | Skipped=%s | Retry=%s | Failed=%s",
+        label, len(ids), result["sent"], result["skipped"], result["retry"], result["failed"],
+    )
+    return {"claimed": len(ids), "sent": result["sent"], "skipped": result["skipped"], "failed": result["failed"]}
+
+
+def dispatch_orders(order_ids: Iterable, channels: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """
+    Deliver the pending notifications of specific orders right away.
+
+    The ``order_created`` rows are (re)enqueued first, which is a no-op for
+    rows that already exist, so calling this twice never sends twice. The
+    whole batch costs a fixed number of queries however many orders it
+    covers: the orders' rows are claimed together, loaded with their orders
+    and customers in one query and fanned out to the channel queues. Admin
+    emails are left for the digest in digest mode.
+    """
+    order_ids = list(order_ids)
+    channels = list(channels or CHANNELS)
+
+    orders = Order.objects.filter(id__in=order_ids, total_amount__gt=0).only('id')
+    enqueue_order_notifications(orders, channels=channels)
+
+    exclude = [NotificationOutbox.CHANNEL_ADMIN_EMAIL] if digest_enabled() else []
+    ids = _claim_batch(None, channels=channels, exclude_channels=exclude, order_ids=order_ids)
+    if not ids:
+        return dict(EMPTY_RESULT)
+    return _process(ids, _deliver, f"Order notifications dispatched | Orders={len(order_ids)}")
+
+
+def dispatch_pending(batch_size: int = None) -> Dict[str, int]:
+    """
+    Deliver one batch of pending outbox rows.
+
+    Rows are claimed before sending so concurrent dispatchers never deliver the
+    same row twice, and ``order_created`` rows also claim their order's flag
+    so nothing else delivers that order on that channel. Failed rows come
+    back after an exponential backoff. In digest mode admin emails are left
+    for ``send_admin_digest``.
+    """
+    batch_size = batch_size or getattr(settings, "NOTIFICATION_OUTBOX_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+
+    exclude = [NotificationOutbox.CHANNEL_ADMIN_EMAIL] if digest_enabled() else []
+    ids = _claim_batch(batch_size, exclude_channels=exclude)
+    if not ids:
+        return dict(EMPTY_RESULT)
+    return _process(ids, _deliver, "Outbox batch dispatched")
+
+
+def send_admin_digest(limit: int = None) -> Dict[str, int]:
+    """
+    Send one admin email listing every pending new order.
+
+    Claims up to ``limit`` pending admin email rows (``ADMIN_EMAIL_DIGEST_MAX_ORDERS``
+    by default) and reports them in a single message. The rows share the
+    outcome of that one send.
+    """
+    limit = limit or getattr(settings, "ADMIN_EMAIL_DIGEST_MAX_ORDERS", DEFAULT_DIGEST_MAX_ORDERS)
+
+    ids = _claim_batch(limit, channels=[NotificationOutbox.CHANNEL_ADMIN_EMAIL])
+    if not ids:
+        return dict(EMPTY_RESULT)
+    return _process(ids, _deliver_digest, "Admin digest dispatched")
+
+
+def drain(batch_size: int = None) -> Dict[str, int]:
+    """Dispatch batches until no claimable rows are left."""
+    totals = dict(EMPTY_RESULT)
+    while True:
+        result = dispatch_pending(batch_size)
+        for key in totals:
+            totals[key] += result[key]
+        if not result["claimed"]:
+            return totals
@@ -0,0 +1,272 @@
+"""
+SMS transport layer.
+
+A transport sends one message to one or more recipients and reports a result
+per recipient. ``get_transport()`` returns the process-wide transport, built
+lazily from settings. ``SmsQueue`` merges queued messages with identical text
+into multi-recipient sends and runs the resulting requests concurrently on a
+bounded thread pool.
+"""
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional
+
+import requests
+from django.conf import settings
+from django.utils.module_loading import import_string
+from requests.adapters import HTTPAdapter
+
+from .utils import clean_phone_number
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_RECIPIENTS = 100
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_COUNTRY_CODE = "254"
+# Digits of a national number without its trunk 0 (7XXXXXXXX)
+LOCAL_NUMBER_DIGITS = 9
+
+# Africa's Talking per-recipient codes meaning the message was accepted
+# (Processed, Sent, Queued)
+SUCCESS_STATUS_CODES = {100, 101, 102}
+
+
+@dataclass(frozen=True)
+class SmsResult:
+    number: str
+    ok: bool
+    status: str
+    message_id: str = ""
+    cost: str = ""
+
+
+def normalize_phone(phone: str) -> str:
+    """Clean a number and put it in international form (+2547...)."""
+    phone = clean_phone_number(phone)
+    country_code = getattr(settings, "SMS_DEFAULT_COUNTRY_CODE", DEFAULT_COUNTRY_CODE)
+    if phone.startswith("+"):
+        return phone
+    if phone.startswith("0"):
+        return f"+{country_code}{phone[1:]}"
+    if len(phone) == LOCAL_NUMBER_DIGITS:
+        # Local number typed without its leading 0 (712345678)
+        return f"+{country_code}{phone}"
+    return f"+{phone}"
+
+
+def parse_recipients(response, recipients: List[str]) -> Dict[str, SmsResult]:
+    """
+    Per-recipient results from an ``SMSMessageData`` response.
+
+    Every entry of ``Recipients`` is read. Numbers that were sent but are
+    missing from the response count as failed.
+    """
+    data = response.get("SMSMessageData", {}) if isinstance(response, dict) else {}
+    results = {}
+    for entry in data.get("Recipients", []):
+        number = entry.get("number", "")
+        status = entry.get("status", "")
+        results[number] = SmsResult(
+            number=number,
+            ok=entry.get("statusCode") in SUCCESS_STATUS_CODES or status == "Success",
+            status=status,
+            message_id=entry.get("messageId", ""),
+            cost=entry.get("cost", ""),
+        )
+    for number in recipients:
+        if number not in results:
+            results[number] = SmsResult(number, False, data.get("Message") or "Missing from response")
+    return results
+
+
+class AfricasTalkingTransport:
+    """Africa's Talking messaging API over one keep-alive HTTP session."""
+    PRODUCTION_URL = "https://api.africastalking.com/version1/messaging"
+    SANDBOX_URL = "https://api.sandbox.africastalking.com/version1/messaging"
+
+    def __init__(self, username: str, api_key: str, sender_id: Optional[str] = None,
+                 pool_size: int = DEFAULT_MAX_WORKERS, timeout: float = 10.0):
+        self.username = username
+        self.sender_id = sender_id
+        self.timeout = timeout
+        self.url = self.SANDBOX_URL if username == "sandbox" else self.PRODUCTION_URL
+
+        # The SDK issues a bare requests.post per call; a shared session keeps
+        # TLS connections open for every thread of the pool
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.headers.update({"Accept": "application/json", "apiKey": api_key})
+
+    def send(self, message: str, recipients: List[str]) -> Dict[str, SmsResult]:
+        data = {
+            "username": self.username,
+            "to": ",".join(recipients),
+            "message": message,
+            "bulkSMSMode": 1,
+        }
+        if self.sender_id:
+            data["from"] = self.sender_id
+        response = self.session.post(self.url, data=data, timeout=self.timeout)
+        response.raise_for_status()
+        payload = response.json()
+        logger.info("SMS API returned: %s", payload)
+        return parse_recipients(payload, recipients)
+
+
+class LoggingTransport:
+    """Sandbox stand-in used when no API key is configured: logs and reports success."""
+
+    def send(self, message: str, recipients: List[str]) -> Dict[str, SmsResult]:
+        logger.info("[Sandbox SMS] To=%s | Msg=%s", recipients, message)
+        return {number: SmsResult(number, True, "Success") for number in recipients}
+
+
+class FakeTransport:
+    """
+    In-memory transport for tests.
+
+    Every request is recorded in ``requests`` as ``(message, recipients)``;
+    numbers in ``fail_numbers`` are reported as rejected.
+    """
+
+    def __init__(self, fail_numbers=()):
+        self.requests = []
+        self.fail_numbers = set(fail_numbers)
+        self._lock = threading.Lock()
+
+    def send(self, message: str, recipients: List[str]) -> Dict[str, SmsResult]:
+        with self._lock:
+            self.requests.append((message, list(recipients)))
+        return {
+            number: SmsResult(number, False, "InvalidPhoneNumber") if number in self.fail_numbers
+            else SmsResult(number, True, "Success", message_id=f"fake-{len(self.requests)}")
+            for number in recipients
+        }
+
+    @property
+    def messages(self) -> List[tuple]:
+        """Every ``(message, number)`` delivered, flattened across requests."""
+        return [(message, number) for message, numbers in self.requests for number in numbers]
+
+
+_lock = threading.Lock()
+_transport = None
+_executor = None
+
+
+def _build_transport():
+    path = getattr(settings, "SMS_TRANSPORT", "")
+    if path:
+        return import_string(path)()
+
+    username = settings.AFRICASTALKING_USERNAME
+    api_key = settings.AFRICASTALKING_API_KEY
+    if api_key:
+        return AfricasTalkingTransport(
+            username,
+            api_key,
+            sender_id=getattr(settings, "AFRICASTALKING_SENDER_ID", None) or None,
+            pool_size=getattr(settings, "SMS_MAX_WORKERS", DEFAULT_MAX_WORKERS),
+        )
+    if username == "sandbox":
+        return LoggingTransport()
+    return None
+
+
+def get_transport():
+    """The process-wide transport, created on first use (``None`` if SMS is not configured)."""
+    global _transport
+    if _transport is None:
+        with _lock:
+            if _transport is None:
+                _transport = _build_transport()
+    return _transport
+
+
+def set_transport(transport) -> None:
+    """Replace the process-wide transport; ``None`` rebuilds it from settings on next use."""
+    global _transport
+    with _lock:
+        _transport = transport
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "SMS_MAX_WORKERS", DEFAULT_MAX_WORKERS),
+                    thread_name_prefix="sms",
+                )
+    return _executor
+
+
+class SmsQueue:
+    """
+    Collect outbound messages and deliver them in as few requests as possible.
+
+    Messages with identical text are merged into multi-recipient sends, up to
+    ``SMS_MAX_RECIPIENTS`` numbers per request. When that leaves more than
+    one request, they run concurrently on the shared, bounded thread pool.
+    ``flush()`` returns an ``SmsResult`` for every key that was added.
+    """
+
+    def __init__(self, transport=None):
+        self.transport = transport or get_transport()
+        self._pending = defaultdict(list)  # message -> [(key, number)]
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._pending.values())
+
+    def add(self, key: Hashable, message: str, phone: str) -> None:
+        self._pending[message].append((key, normalize_phone(phone)))
+
+    def _send(self, message: str, numbers: List[str]) -> Dict[str, SmsResult]:
+        try:
+            return self.transport.send(message, numbers)
+        except Exception as e:
+            logger.error("Error sending SMS | Recipients=%s | %s", numbers, e, exc_info=True)
+            return {number: SmsResult(number, False, str(e)) for number in numbers}
+
+    def flush(self) -> Dict[Hashable, SmsResult]:
+        pending, self._pending = self._pending, defaultdict(list)
+        if not pending:
+            return {}
+
+        if self.transport is None:
+            logger.error("SMS service unavailable.")
+            return {
+                key: SmsResult(number, False, "SMS service unavailable")
+                for entries in pending.values() for key, number in entries
+            }
+
+        max_recipients = getattr(settings, "SMS_MAX_RECIPIENTS", DEFAULT_MAX_RECIPIENTS)
+        batches = []
+        for message, entries in pending.items():
+            numbers = list(dict.fromkeys(number for _, number in entries))
+            for start in range(0, len(numbers), max_recipients):
+                batches.append((message, numbers[start:start + max_recipients]))
+
+        if len(batches) == 1:
+            outcomes = [self._send(*batches[0])]
+        else:
+            outcomes = list(_get_executor().map(lambda batch: self._send(*batch), batches))
+
+        by_message = defaultdict(dict)
+        for (message, _), outcome in zip(batches, outcomes):
+            by_message[message].update(outcome)
+
+        results = {}
+        for message, entries in pending.items():
+            for key, number in entries:
+                result = by_message[message].get(number)
+                if result is None:
+                    result = SmsResult(number, False, "Missing from response")
+                elif not result.ok:
+                    logger.error("SMS failed | Recipient=%s | Status=%s", number, result.status)
+                results[key] = result
+        return results
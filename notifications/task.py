@@ -1,60 +1,63 @@
 import logging
 from celery import shared_task
 from .utils import NotificationService
-from orders.models import Order
+from .models import NotificationOutbox
+from .outbox import dispatch_orders, drain, send_admin_digest
 from customers.models import Customer
 
 logger = logging.getLogger(__name__)
 
-@shared_task(bind=True, max_retries=3)
-def send_order_sms_task(self, order_id: int):
+@shared_task
+def send_order_notifications_task(order_ids, channels=None):
     """
-    Send SMS notification to customer when an order is placed.
+    Send the notifications of a batch of orders on every channel (or ``channels``).
+
+    The orders and customers are loaded once for the whole batch; delivery
+    goes through the outbox so repeated calls do not send twice.
     """
-    try:
-        order = Order.objects.get(id=order_id)
-        success = NotificationService.send_order_sms(order)
+    if not isinstance(order_ids, (list, tuple)):
+        order_ids = [order_ids]
+    result = dispatch_orders(order_ids, channels)
+    logger.info(f"Notifications dispatched for {len(order_ids)} orders: {result}")
+    return result
 
-        if success:
-            logger.info(f"SMS sent successfully for order {order_id}")
-            return True
-        else:
-            logger.error(f"SMS sending failed for order {order_id}")
-            return False
 
-    except Order.DoesNotExist:
-        logger.error(f"Order {order_id} not found. SMS not sent.")
-        return False
-    except Exception as e:
-        logger.error(f"Error sending SMS for order {order_id}: {e}")
-        if not self.request.is_eager:  
-            raise self.retry(exc=e, countdown=60)
-        return False
+@shared_task
+def send_order_sms_task(order_id):
+    """
+    Send SMS notification to customer when an order is placed.
+    """
+    result = send_order_notifications_task([order_id], [NotificationOutbox.CHANNEL_SMS])
+    return result["sent"] > 0
 
-@shared_task(bind=True, max_retries=3)
-def send_admin_email_task(self, order_id: int):
+
+@shared_task
+def send_admin_email_task(order_id):
     """
     Send email notification to admin when a new order is placed.
     """
-    try:
-        order = Order.objects.get(id=order_id)
-        success = NotificationService.send_order_email_to_admin(order)
+    result = send_order_notifications_task([order_id], [NotificationOutbox.CHANNEL_ADMIN_EMAIL])
+    return result["sent"] > 0
 
-        if success:
-            logger.info(f"Admin email sent successfully for order {order_id}")
-            return True
-        else:
-            logger.error(f"Admin email sending failed for order {order_id}")
-            return False
 
-    except Order.DoesNotExist:
-        logger.error(f"Order {order_id} not found. Admin email not sent.")
-        return False
-    except Exception as e:
-        logger.error(f"Error sending admin email for order {order_id}: {e}")
-        if not self.request.is_eager:
-            raise self.retry(exc=e, countdown=60)
-        return False
+@shared_task
+def dispatch_notification_outbox_task(batch_size: int = None):
+    """
+    Drain pending order notifications from the outbox in batches.
+    """
+    result = drain(batch_size)
+    logger.info(f"Notification outbox drained: {result}")
+    return result
+
+
+@shared_task
+def send_admin_digest_task(limit: int = None):
+    """
+    Send the periodic admin digest of new orders (ADMIN_EMAIL_DIGEST mode).
+    """
+    result = send_admin_digest(limit)
+    logger.info(f"Admin digest sent: {result}")
+    return result
 
 
 @shared_task
@@ -1,14 +1,12 @@
 import logging
 import re
 import unicodedata
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from django.conf import settings
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from django.core.mail import EmailMultiAlternatives
 
-import africastalking
+from .mailer import EmailQueue, build_message
 
 logger = logging.getLogger(__name__)
 
@@ -19,18 +17,6 @@ def clean_phone_number(phone: str) -> str:
     return re.sub(r"[^\d+]", "", phone)
 
 
-def _get_sms_service() -> Optional[object]:
-    """Try to initialize Africa's Talking SMS service."""
-    try:
-        username = settings.AFRICASTALKING_USERNAME
-        api_key = settings.AFRICASTALKING_API_KEY
-        sms = getattr(africastalking, "SMS", None)
-
-    except Exception as e:
-        logger.error("Failed to initialize SMS service: %s", e, exc_info=True)
-        return None
-
-
 #Service 
 class NotificationService:
     """Send SMS and email notifications."""
@@ -38,82 +24,106 @@ class NotificationService:
     #SMS 
     @staticmethod
     def _send_sms(message: str, recipients: List[str]) -> bool:
-        sms = _get_sms_service()
-
-        if not sms and settings.AFRICASTALKING_USERNAME == "sandbox":
-            logger.info("[Sandbox SMS] To=%s | Msg=%s", recipients, message)
+        """Send one message to ``recipients``; True only if every recipient was accepted."""
+        from .sms import SmsQueue
+
+        queue = SmsQueue()
+        for index, recipient in enumerate(r for r in recipients if r):
+            queue.add(index, message, recipient)
+        results = queue.flush()
+        if results and all(result.ok for result in results.values()):
+            logger.info("SMS sent to %s successfully.", recipients)
             return True
-
-        if not sms:
-            logger.error("SMS service unavailable.")
-            return False
-
-        try:
-            recipients = [clean_phone_number(r) for r in recipients if r]
-            response = sms.send(message, recipients)
-            logger.info("SMS API returned: %s", response)
-
-            recipients_data = response.get("SMSMessageData", {}).get("Recipients", [])
-            if recipients_data and recipients_data[0].get("status") == "Success":
-                logger.info("SMS sent to %s successfully.", recipients)
-                return True
-
-            logger.error("SMS failed | Recipients=%s | Response=%s", recipients, response)
-            return False
-
-        except Exception as e:
-            logger.error("Error sending SMS | Recipients=%s | %s", recipients, e, exc_info=True)
-            return False
+        return False
 
     #Email
     @staticmethod
     def _send_email(subject: str, recipient: str, template: str, context: dict) -> bool:
         try:
-            html_msg = render_to_string(template, context)
-            plain_msg = strip_tags(html_msg)
-
-            send_mail(
-                subject=subject,
-                message=plain_msg,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[recipient],
-                html_message=html_msg,
-                fail_silently=False,
-            )
-            logger.info("Email sent | Recipient=%s | Subject=%s", recipient, subject)
-            return True
-
+            message = build_message(subject, [recipient], template, context)
         except Exception as e:
-            logger.error("Failed to send email | Recipient=%s | %s", recipient, e, exc_info=True)
+            logger.error("Failed to render email | Recipient=%s | %s", recipient, e, exc_info=True)
             return False
+        queue = EmailQueue()
+        queue.add(recipient, message)
+        return queue.flush()[recipient]
+
+    @staticmethod
+    def _admin_email() -> str:
+        return getattr(settings, "ADMIN_EMAIL", settings.DEFAULT_FROM_EMAIL)
 
     #Notifications 
-    @classmethod
-    def send_order_sms(cls, order) -> bool:
-        """Send order confirmation SMS to customer."""
+    @staticmethod
+    def order_sms(order) -> Optional[Tuple[str, str]]:
+        """Order confirmation ``(message, phone)``, or None if it should not be sent."""
         if order.total_amount <= 0:
             logger.info(f"Skipping SMS for order {order.order_number} because total is {order.total_amount}")
-            return False
+            return None
 
         phone = getattr(order.customer, "phone", None)
         if not phone:
             logger.error("Can't send SMS: Customer %s has no phone number.", order.customer.id)
-            return False
+            return None
 
         message = (
             f"Hi {order.customer.first_name},\n"
             f"Your order #{order.order_number} is confirmed!\n"
             f"Total: KES {order.total_amount}\n"
         )
-        return cls._send_sms(message, [phone])
+        return message, phone
+
+    @staticmethod
+    def order_status_sms(order, status: str) -> Optional[Tuple[str, str]]:
+        """Status update ``(message, phone)``, or None if the customer has no phone."""
+        phone = getattr(order.customer, "phone", None)
+        if not phone:
+            logger.error("Can't send SMS: Customer %s has no phone number.", order.customer.id)
+            return None
+
+        label = dict(order.STATUS_CHOICES).get(status, status).lower()
+        message = (
+            f"Hi {order.customer.first_name},\n"
+            f"Your order #{order.order_number} is now {label}.\n"
+        )
+        return message, phone
 
     @classmethod
-    def send_order_email_to_admin(cls, order) -> bool:
-        """Notify admin about a new order."""
+    def order_admin_email(cls, order) -> Optional[EmailMultiAlternatives]:
+        """New order email for the admin, or None if it should not be sent."""
         if order.total_amount <= 0:
             logger.info(f"Skipping admin email for order {order.order_number} because total is {order.total_amount}")
-            return False
+            return None
         subject = f"New Order Received - #{order.order_number}"
-        context = {"order": order}
-        admin_email = getattr(settings, "ADMIN_EMAIL", settings.DEFAULT_FROM_EMAIL)
-        return cls._send_email(subject, admin_email, "emails/order_notification.html", context)
+        return build_message(subject, [cls._admin_email()], "emails/order_notification.html", {"order": order})
+
+    @classmethod
+    def admin_digest_email(cls, orders) -> Optional[EmailMultiAlternatives]:
+        """One email listing ``orders`` for the admin, or None if there is nothing to report."""
+        orders = [order for order in orders if order.total_amount > 0]
+        if not orders:
+            return None
+        subject = f"{len(orders)} New Order{'s' if len(orders) != 1 else ''} Received"
+        context = {"orders": orders, "total": sum(order.total_amount for order in orders)}
+        return build_message(subject, [cls._admin_email()], "emails/order_digest.html", context)
+
+    @classmethod
+    def send_order_sms(cls, order) -> bool:
+        """Send order confirmation SMS to customer."""
+        sms = cls.order_sms(order)
+        return cls._send_sms(sms[0], [sms[1]]) if sms else False
+
+    @classmethod
+    def send_order_email_to_admin(cls, order) -> bool:
+        """Notify admin about a new order."""
+        message = cls.order_admin_email(order)
+        if message is None:
+            return False
+        queue = EmailQueue()
+        queue.add(order.id, message)
+        return queue.flush()[order.id]
+
+    @classmethod
+    def send_order_status_sms(cls, order, status: str) -> bool:
+        """Tell the customer their order moved to ``status``."""
+        sms = cls.order_status_sms(order, status)
+        return cls._send_sms(sms[0], [sms[1]]) if sms else False
@@ -1,16 +1,22 @@
 from django.contrib import admin
-from .models import Order, OrderItem
+from .models import Order, OrderItem, OrderStatusHistory
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     extra = 1
 
+class OrderStatusHistoryInline(admin.TabularInline):
+    model = OrderStatusHistory
+    extra = 0
+    can_delete = False
+    readonly_fields = ("from_status", "to_status", "changed_by", "note", "created_at")
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = ("order_number", "customer", "status", "total_amount", "created_at")
     search_fields = ("order_number", "customer__email")
     list_filter = ("status", "created_at")
-    inlines = [OrderItemInline]
+    inlines = [OrderItemInline, OrderStatusHistoryInline]
 
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
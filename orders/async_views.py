@@ -0,0 +1,47 @@
+"""
+Async read endpoint for the signed-in customer's own orders.
+"""
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from backend.pagination import CreatedAtKeysetPagination
+from .models import Order
+from .serializers import OrderListSerializer
+from .views import with_list_plan
+
+
+def _authenticate(request):
+    """Run the API's authentication classes (OAuth2 bearer, session) on a plain request."""
+    drf_request = Request(
+        request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    )
+    try:
+        user = drf_request.user
+    except exceptions.AuthenticationFailed:
+        return None
+    return user if user.is_authenticated else None
+
+
+@require_GET
+async def my_orders(request):
+    """The customer's orders, newest first, with keyset pagination (``?cursor=``)."""
+    # Token lookups go through the sync ORM, so they run off the event loop
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+
+    paginator = CreatedAtKeysetPagination()
+    qs = with_list_plan(Order.objects.filter(customer=user))
+    try:
+        orders = await paginator.apaginate_queryset(qs, request)
+    except exceptions.NotFound as e:
+        return JsonResponse({"detail": str(e.detail)}, status=404)
+
+    data = paginator.get_paginated_data(OrderListSerializer(orders, many=True).data)
+    if request.GET.get("count", "").lower() == "true":
+        data["count"] = await qs.acount()
+    return JsonResponse(data)
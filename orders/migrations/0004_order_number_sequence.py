@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:29
+
+from django.db import migrations, models
+
+
+def create_order_number_source(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("CREATE SEQUENCE IF NOT EXISTS order_number_seq")
+    OrderNumberCounter = apps.get_model('orders', 'OrderNumberCounter')
+    OrderNumberCounter.objects.using(schema_editor.connection.alias).get_or_create(pk=1)
+
+
+def drop_order_number_source(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("DROP SEQUENCE IF EXISTS order_number_seq")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_stock_reserved'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderNumberCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'order_number_counter',
+            },
+        ),
+        migrations.RunPython(create_order_number_source, drop_order_number_source),
+    ]
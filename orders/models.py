@@ -1,8 +1,8 @@
-from django.db import models
+from django.db import models, router
 from django.core.validators import MinValueValidator
 from decimal import Decimal, ROUND_HALF_UP
 import uuid
-import random
+from .numbering import next_order_number
 
 
 class Order(models.Model):
@@ -15,6 +15,18 @@ class Order(models.Model):
         ('cancelled', 'Cancelled'),
         ('refunded', 'Refunded'),
     ]
+    # Allowed moves from each status; terminal statuses map to nothing
+    TRANSITIONS = {
+        'pending': ('confirmed', 'cancelled'),
+        'confirmed': ('processing', 'cancelled'),
+        'processing': ('shipped', 'cancelled'),
+        'shipped': ('delivered',),
+        'delivered': ('refunded',),
+        'cancelled': (),
+        'refunded': (),
+    }
+    # Statuses that hand reserved stock back to inventory
+    STOCK_RELEASE_STATUSES = ('cancelled', 'refunded')
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     order_number = models.CharField(max_length=20, unique=True, blank=True)
@@ -59,6 +71,8 @@ class Order(models.Model):
     shipping_address = models.TextField()
     billing_address = models.TextField(blank=True)
 
+    stock_reserved = models.BooleanField(default=False)
+
     sms_sent = models.BooleanField(default=False)
     email_sent_to_admin = models.BooleanField(default=False)
 
@@ -70,13 +84,26 @@ class Order(models.Model):
         verbose_name = 'Order'
         verbose_name_plural = 'Orders'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination walks (created_at, id) newest first
+            models.Index(fields=['-created_at', '-id'], name='orders_created_id_idx'),
+            # Customer order history, newest first
+            models.Index(fields=['customer', '-created_at', '-id'], name='orders_customer_created_idx'),
+            # Fulfilment queues and the admin status filter
+            models.Index(fields=['status', 'created_at'], name='orders_status_created_idx'),
+        ]
 
     def __str__(self):
         return f"Order {self.order_number} - {self.customer.full_name}"
 
+    @classmethod
+    def can_transition(cls, from_status, to_status):
+        return to_status in cls.TRANSITIONS.get(from_status, ())
+
     def save(self, *args, **kwargs):
         if not self.order_number:
-            self.order_number = f"ORD{random.randint(10000000, 99999999)}"
+            using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+            self.order_number = next_order_number(using)
 
         # Ensure subtotal is always rounded to nearest shilling (KES)
         if self.subtotal is None:
@@ -97,6 +124,46 @@ class Order(models.Model):
         super().save(*args, **kwargs)
 
 
+class OrderStatusHistory(models.Model):
+    """One row per status change, written in bulk by the transition service."""
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name='status_history'
+    )
+    from_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    to_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    changed_by = models.ForeignKey(
+        'customers.Customer',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    note = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'order_status_history'
+        verbose_name = 'Order Status Change'
+        verbose_name_plural = 'Order Status History'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['order', 'created_at'], name='order_status_history_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.order_id}: {self.from_status} -> {self.to_status}"
+
+
+class OrderNumberCounter(models.Model):
+    """Single-row order number counter for databases without sequences."""
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'order_number_counter'
+
+
 class OrderItem(models.Model):
     order = models.ForeignKey(
         Order,
@@ -0,0 +1,80 @@
+from django.db import connections, transaction
+from django.db.models import F, Max
+
+ORDER_NUMBER_PREFIX = "ORD"
+ORDER_NUMBER_DIGITS = 10
+ORDER_NUMBER_SEQUENCE = "order_number_seq"
+
+
+def _increment_counter(using: str):
+    """Increment the counter row and return the new value, or None when the row is missing."""
+    from .models import OrderNumberCounter
+
+    connection = connections[using]
+    if connection.vendor == 'sqlite' and connection.features.can_return_columns_from_insert:
+        # SQLite >= 3.35 understands UPDATE ... RETURNING: one statement, no savepoint
+        table = connection.ops.quote_name(OrderNumberCounter._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(f"UPDATE {table} SET value = value + 1 WHERE id = 1 RETURNING value")
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    with transaction.atomic(using=using):
+        counter = OrderNumberCounter.objects.using(using)
+        if not counter.filter(pk=1).update(value=F('value') + 1):
+            return None
+        return counter.values_list('value', flat=True).get(pk=1)
+
+
+def _seed_counter(using: str) -> None:
+    """
+    Recreate a missing counter row, e.g. after ``flush`` or on a database not
+    built by the migrations. It starts from the highest number already issued,
+    so the next one cannot collide. Concurrent seeds insert only one row.
+    """
+    from .models import Order, OrderNumberCounter
+
+    highest = (
+        Order.objects.using(using)
+        .filter(order_number__regex=rf'^{ORDER_NUMBER_PREFIX}[0-9]{{{ORDER_NUMBER_DIGITS}}}$')
+        .aggregate(value=Max('order_number'))['value']
+    )
+    start = int(highest[len(ORDER_NUMBER_PREFIX):]) if highest else 0
+    OrderNumberCounter.objects.using(using).bulk_create(
+        [OrderNumberCounter(pk=1, value=start)], ignore_conflicts=True,
+    )
+
+
+def _next_counter_value(using: str) -> int:
+    """
+    Increment the single-row counter table and return the new value.
+
+    Used on backends without sequences. The UPDATE takes the row (or, on
+    SQLite, the database) write lock until the surrounding transaction ends,
+    and a rolled back order rolls its number back with it, so no two
+    committed orders can share a value. A missing row is recreated first.
+    """
+    value = _increment_counter(using)
+    if value is None:
+        _seed_counter(using)
+        value = _increment_counter(using)
+    return value
+
+
+def next_order_number(using: str = 'default') -> str:
+    """
+    Return a new order number such as ``ORD0000001234``.
+
+    On PostgreSQL the value comes from a database sequence, which is shared by
+    every gunicorn worker and replica and is never handed out twice, even when
+    the calling transaction rolls back. Numbers grow monotonically, so inserts
+    into the unique index on ``order_number`` always land on its right edge.
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT nextval(%s)", [ORDER_NUMBER_SEQUENCE])
+            value = cursor.fetchone()[0]
+    else:
+        value = _next_counter_value(using)
+    return f"{ORDER_NUMBER_PREFIX}{value:0{ORDER_NUMBER_DIGITS}d}"
@@ -1,16 +1,38 @@
-from decimal import Decimal, ROUND_HALF_UP
+from django.db.models import Prefetch
 from rest_framework import serializers
+
+from backend.fields import DynamicFieldsMixin
+from products.serializers import PRODUCT_CATEGORIES, ProductSerializer, ProductSummarySerializer
 from .models import Order, OrderItem
-from products.models import Product
-from products.serializers import ProductSerializer
-from notifications.utils import NotificationService
+from .services import create_order, transition_orders
+
+
+# Status changes a customer may make to their own order
+CUSTOMER_TRANSITIONS = {('pending', 'cancelled')}
+
+
+def order_items_prefetches(serializer):
+    """Items with their products; product categories too when ``product`` is expanded."""
+    lookups = [Prefetch('items', queryset=OrderItem.objects.select_related('product'))]
+    if 'product' in serializer.context.get('expand', ()):
+        lookups.append(Prefetch('items__product__categories', queryset=PRODUCT_CATEGORIES))
+    return lookups
+
+
+def order_item_summaries_prefetches(serializer):
+    """Items with only the columns the listing reads."""
+    items = OrderItem.objects.select_related('product').only(
+        'id', 'order_id', 'quantity', 'unit_price', 'total_price',
+        'product__id', 'product__name', 'product__sku',
+    )
+    return [Prefetch('items', queryset=items)]
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
     """
-    Order items 
+    Order items; the product is a summary unless the context expands ``product``
     """
-    product = ProductSerializer(read_only=True)
+    product = ProductSummarySerializer(read_only=True)
     product_id = serializers.IntegerField(write_only=True)
 
     class Meta:
@@ -18,28 +40,21 @@ class OrderItemSerializer(serializers.ModelSerializer):
         fields = ['id', 'product', 'product_id', 'quantity', 'unit_price', 'total_price']
         read_only_fields = ['id', 'unit_price', 'total_price']
 
-    def create(self, validated_data):
-        product_id = validated_data.pop("product_id")
-        product = Product.objects.get(id=product_id)
-
-        unit_price = product.price
-        quantity = validated_data.get("quantity", 1)
-        total_price = unit_price * quantity
-
-        return OrderItem.objects.create(
-            product=product,
-            unit_price=unit_price,
-            total_price=total_price,
-            **validated_data
-        )
+    def get_fields(self):
+        fields = super().get_fields()
+        if 'product' in self.context.get('expand', ()):
+            fields['product'] = ProductSerializer(read_only=True)
+        return fields
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Orders
     """
     items = OrderItemSerializer(many=True)
 
+    field_prefetches = {'items': order_items_prefetches}
+
     class Meta:
         model = Order
         fields = [
@@ -64,26 +79,77 @@ class OrderSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         items_data = validated_data.pop('items', [])
-        order = Order.objects.create(**validated_data)
+        # Notifications are queued by the post_save receiver in the same transaction
+        return create_order(items_data, **validated_data)
+
+    def validate_status(self, value):
+        current = self.instance.status if self.instance is not None else 'pending'
+        if value == current:
+            return value
+        if self.instance is not None and not Order.can_transition(current, value):
+            raise serializers.ValidationError(f"Cannot move from {current} to {value}.")
+        # Fulfilment moves are staff only; customers may just cancel a pending order
+        request = self.context.get('request')
+        user = getattr(request, 'user', None)
+        if not getattr(user, 'is_staff', False) and (current, value) not in CUSTOMER_TRANSITIONS:
+            raise serializers.ValidationError("Only staff can change the status of an order.")
+        return value
+
+    def update(self, instance, validated_data):
+        # Status changes go through the transition service for history and notifications
+        new_status = validated_data.pop('status', instance.status)
+        instance = super().update(instance, validated_data)
+        if new_status != instance.status:
+            request = self.context.get('request')
+            transition_orders([instance.pk], new_status, changed_by=getattr(request, 'user', None))
+            instance.refresh_from_db(fields=['status', 'stock_reserved', 'updated_at'])
+        return instance
+
+
+class OrderTransitionSerializer(serializers.Serializer):
+    """
+    Bulk status change request
+    """
+    order_ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False, max_length=10000)
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES)
+    note = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+
+
+class OrderItemSummarySerializer(serializers.ModelSerializer):
+    """
+    Order items with just enough product data for listings
+    """
+    product_id = serializers.IntegerField(read_only=True)
+    product_name = serializers.CharField(source='product.name', read_only=True)
+    product_sku = serializers.CharField(source='product.sku', read_only=True)
 
-        subtotal = Decimal('0.00')
-        for item_data in items_data:
-            serializer = OrderItemSerializer(data=item_data)
-            serializer.is_valid(raise_exception=True)
-            item = serializer.save(order=order)
-            subtotal += item.total_price
+    class Meta:
+        model = OrderItem
+        fields = ['id', 'product_id', 'product_name', 'product_sku', 'quantity', 'unit_price', 'total_price']
+        read_only_fields = fields
 
-        # Round subtotal and calculate tax
-        order.subtotal = subtotal.quantize(Decimal('1'), rounding=ROUND_HALF_UP)
-        order.tax_amount = (order.subtotal * Decimal('0.16')).quantize(Decimal('1'), rounding=ROUND_HALF_UP)
-        order.total_amount = (order.subtotal + order.tax_amount + order.shipping_cost).quantize(
-            Decimal('1'), rounding=ROUND_HALF_UP
-        )
 
-        order.save()
+class OrderListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """
+    Orders as listed: no nested product, category or address details
+    """
+    items = OrderItemSummarySerializer(many=True, read_only=True)
 
-        # Send notifications
-        NotificationService.send_order_sms(order)
-        NotificationService.send_order_email_to_admin(order)
+    field_prefetches = {'items': order_item_summaries_prefetches}
 
-        return order
+    class Meta:
+        model = Order
+        fields = [
+            'id',
+            'order_number',
+            'customer',
+            'status',
+            'subtotal',
+            'tax_amount',
+            'shipping_cost',
+            'total_amount',
+            'items',
+            'created_at',
+            'updated_at',
+        ]
+        read_only_fields = fields
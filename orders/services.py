@@ -0,0 +1,189 @@
+import uuid
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from aggregates.sales import schedule_order_sales
+from notifications.models import NotificationOutbox
+from notifications.outbox import enqueue_order_notifications, schedule_dispatch
+from products.inventory import InsufficientStock, release_stock, reserve_stock
+from products.models import Product
+from .models import Order, OrderItem, OrderStatusHistory
+
+
+def price_order_items(items_data: Iterable[dict]) -> List[OrderItem]:
+    """
+    Resolve and price order lines in memory.
+
+    All referenced products are loaded with a single ``id__in`` query; the
+    returned ``OrderItem`` instances are unsaved and have no order yet.
+    """
+    items_data = list(items_data)
+    product_ids = {item["product_id"] for item in items_data}
+    products = Product.objects.filter(is_active=True).in_bulk(product_ids)
+
+    missing = sorted(product_ids - products.keys())
+    if missing:
+        raise serializers.ValidationError({"items": f"Unknown or inactive products: {missing}"})
+
+    lines = []
+    for item in items_data:
+        product = products[item["product_id"]]
+        quantity = item.get("quantity", 1)
+        lines.append(OrderItem(
+            product=product,
+            quantity=quantity,
+            unit_price=product.price,
+            total_price=product.price * quantity,
+        ))
+    return lines
+
+
+@transaction.atomic
+def create_order(items_data: Iterable[dict], **order_fields) -> Order:
+    """
+    Create an order and its items with a constant number of queries.
+
+    Totals are computed once from the priced lines, the order is inserted with
+    a single ``save()`` and the items are written with one ``bulk_create``.
+    Stock is reserved in the same transaction; the product row locks are
+    released on commit, before any notification is dispatched.
+    """
+    lines = price_order_items(items_data)
+
+    try:
+        stock_reserved = reserve_stock((line.product_id, line.quantity) for line in lines)
+    except InsufficientStock as e:
+        raise serializers.ValidationError({"items": f"Insufficient stock for products: {e.product_ids}"})
+
+    order = Order(stock_reserved=stock_reserved, **order_fields)
+    order.subtotal = sum((line.total_price for line in lines), Decimal('0.00'))
+    order.save()
+
+    for line in lines:
+        line.order = order
+    OrderItem.objects.bulk_create(lines)
+
+    return order
+
+
+@transaction.atomic
+def release_order_stock(order: Order) -> bool:
+    """
+    Hand an order's reserved stock back to inventory.
+
+    The ``stock_reserved`` flag is cleared with a conditional UPDATE first, so
+    concurrent cancel/refund requests release the stock exactly once.
+    """
+    claimed = Order.objects.filter(pk=order.pk, stock_reserved=True).update(stock_reserved=False)
+    order.stock_reserved = False
+    if not claimed:
+        return False
+
+    release_stock(order.items.values_list('product_id', 'quantity'))
+    return True
+
+
+@transaction.atomic
+def release_orders_stock(order_ids: Iterable) -> int:
+    """
+    Bulk version of ``release_order_stock``; returns the number of orders released.
+
+    The orders still holding a reservation are locked and cleared in one
+    UPDATE, and all of their lines go back to inventory in one pass.
+    """
+    claimed = list(
+        Order.objects.select_for_update()
+        .filter(id__in=list(order_ids), stock_reserved=True)
+        .values_list('id', flat=True)
+    )
+    if not claimed:
+        return 0
+
+    Order.objects.filter(id__in=claimed).update(stock_reserved=False)
+    release_stock(OrderItem.objects.filter(order_id__in=claimed).values_list('product_id', 'quantity'))
+    return len(claimed)
+
+
+@transaction.atomic
+def transition_orders(order_ids: Iterable, to_status: str, changed_by=None, note: str = '') -> Dict:
+    """
+    Move many orders to ``to_status`` in a constant number of queries.
+
+    Orders are locked and grouped by their current status; every source
+    status allowed by ``Order.TRANSITIONS`` is applied with one conditional
+    UPDATE. History rows and customer notifications are written in bulk.
+    ``UPDATE`` bypasses ``save()``, so reserved stock of cancelled or refunded
+    orders is released, and their sales dropped from the daily rollups, here
+    rather than by the post_save receivers.
+
+    Returns ``{"updated": [ids], "rejected": {id: reason}}``.
+    """
+    if to_status not in dict(Order.STATUS_CHOICES):
+        raise serializers.ValidationError({"status": f"Unknown status: {to_status}"})
+
+    requested = list(dict.fromkeys(str(uuid.UUID(str(pk))) for pk in order_ids))
+    orders = (
+        Order.objects.select_for_update()
+        .filter(id__in=requested)
+        .only('id', 'status', 'stock_reserved')
+        .order_by('id')
+    )
+
+    rejected = {}
+    by_source = defaultdict(list)
+    for order in orders:
+        if Order.can_transition(order.status, to_status):
+            by_source[order.status].append(order)
+        else:
+            rejected[str(order.pk)] = f"Cannot move from {order.status} to {to_status}"
+    found = {str(order.pk) for group in by_source.values() for order in group} | rejected.keys()
+    for pk in requested:
+        if pk not in found:
+            rejected[pk] = "Not found"
+
+    now = timezone.now()
+    moved = []  # (order, from_status)
+    for from_status, group in by_source.items():
+        ids = [order.pk for order in group]
+        updated = Order.objects.filter(id__in=ids, status=from_status).update(status=to_status, updated_at=now)
+        if updated != len(ids):
+            # Only possible on backends that ignore row locks
+            changed = set(Order.objects.filter(id__in=ids, status=to_status, updated_at=now).values_list('id', flat=True))
+            for order in group:
+                if order.pk not in changed:
+                    rejected[str(order.pk)] = "Status changed concurrently"
+            group = [order for order in group if order.pk in changed]
+        for order in group:
+            order.status = to_status
+            moved.append((order, from_status))
+
+    if not moved:
+        return {"updated": [], "rejected": rejected}
+
+    OrderStatusHistory.objects.bulk_create([
+        OrderStatusHistory(
+            order=order,
+            from_status=from_status,
+            to_status=to_status,
+            changed_by=changed_by,
+            note=note,
+        )
+        for order, from_status in moved
+    ])
+
+    orders = [order for order, _ in moved]
+    if to_status in Order.STOCK_RELEASE_STATUSES:
+        release_orders_stock(order.pk for order in orders if order.stock_reserved)
+        schedule_order_sales(order.pk for order in orders)
+
+    event = NotificationOutbox.STATUS_EVENTS.get(to_status)
+    if event:
+        enqueue_order_notifications(orders, event, channels=[NotificationOutbox.CHANNEL_SMS])
+        schedule_dispatch([order.pk for order in orders], channels=[NotificationOutbox.CHANNEL_SMS])
+
+    return {"updated": [str(order.pk) for order in orders], "rejected": rejected}
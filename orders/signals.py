@@ -1,10 +1,8 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from .models import Order
-from notifications.task import send_order_sms_task, send_admin_email_task
-from django.conf import settings
-from notifications.utils import NotificationService 
-from django.db import transaction
+from .services import release_order_stock
+from notifications.outbox import enqueue_order_notifications, schedule_dispatch
 
 
 @receiver(post_save, sender=Order)
@@ -12,12 +10,12 @@ def order_created_handler(sender, instance, created, **kwargs):
     if not created or instance.total_amount <= 0:
         return  
 
-    def send_notifications():
-        if getattr(settings, "DEBUG", False):
-            send_order_sms_task(instance.id)
-            send_admin_email_task(instance.id)
-        else:
-            send_order_sms_task.delay(instance.id)
-            send_admin_email_task.delay(instance.id)
+    # Outbox rows commit with the order; the dispatcher delivers them afterwards
+    enqueue_order_notifications([instance])
+    schedule_dispatch([instance.pk])
 
-    transaction.on_commit(send_notifications)
+
+@receiver(post_save, sender=Order)
+def order_stock_release_handler(sender, instance, created, **kwargs):
+    if instance.stock_reserved and instance.status in Order.STOCK_RELEASE_STATUSES:
+        release_order_stock(instance)
@@ -1,20 +1,41 @@
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from backend.fields import SparseFieldsMixin, plan_queryset
+from backend.pagination import CatalogPagination
 from .models import Order
-from .serializers import OrderSerializer
+from .serializers import OrderSerializer, OrderListSerializer, OrderTransitionSerializer
+from .services import transition_orders
 
 
-class OrderViewSet(viewsets.ModelViewSet):
-    queryset = Order.objects.all().select_related('customer').prefetch_related('items__product')
+# Order columns loaded whatever ?fields= asks for (keyset pagination keys)
+ORDER_ALWAYS_COLUMNS = ('id', 'created_at')
+
+
+def with_list_plan(qs):
+    """Summary columns of orders plus one prefetch of their items and products."""
+    return plan_queryset(qs, OrderListSerializer(), ORDER_ALWAYS_COLUMNS)
+
+
+class OrderViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
+    queryset = Order.objects.all()
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CatalogPagination
+    always_columns = ORDER_ALWAYS_COLUMNS
 
     def get_queryset(self):
         user = self.request.user
+        qs = self.plan_queryset(Order.objects.all())
         if user.is_staff:
-            return Order.objects.all()
-        return Order.objects.filter(customer=user)
+            return qs
+        return qs.filter(customer=user)
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return OrderListSerializer
+        return OrderSerializer
 
     def perform_create(self, serializer):
         # assign current user as customer
@@ -33,3 +54,21 @@ class OrderViewSet(viewsets.ModelViewSet):
         if not request.user.is_staff and instance.customer == request.user:
             return Response({'error': 'You cannot delete your own order.'}, status=status.HTTP_403_FORBIDDEN)
         return super().destroy(request, *args, **kwargs)
+
+    @action(detail=False, methods=['post'], url_path='transition', permission_classes=[IsAdminUser])
+    def transition(self, request):
+        """
+        Move many orders to one status, e.g. a warehouse batch from processing to shipped.
+
+        Orders whose current status does not allow the move are reported under
+        ``rejected``; the rest are updated.
+        """
+        serializer = OrderTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = transition_orders(
+            serializer.validated_data['order_ids'],
+            serializer.validated_data['status'],
+            changed_by=request.user,
+            note=serializer.validated_data['note'],
+        )
+        return Response(result, status=status.HTTP_200_OK)
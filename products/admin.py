@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Category, Product
+from .models import Category, Product, ProductImportJob
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -12,3 +12,8 @@ class ProductAdmin(admin.ModelAdmin):
     list_display = ("name", "sku", "price", "stock_quantity", "is_active")
     search_fields = ("name", "sku", "description")
     list_filter = ("is_active", "is_featured", "is_digital")
+
+@admin.register(ProductImportJob)
+class ProductImportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "format", "status", "rows_processed", "total_rows", "error_count", "created_at")
+    list_filter = ("status", "format")
@@ -0,0 +1,68 @@
+"""
+Async read endpoints for the catalog, served under ``/api/async/``.
+
+They mirror the hot GET endpoints of ``products.views`` but load data with
+the async ORM, so under an ASGI server a worker keeps serving other requests
+while a query is in flight. Everything a serializer reads is prefetched:
+lazy queries are not allowed inside the event loop.
+"""
+from django.db.models import Prefetch
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import NotFound
+
+from backend.pagination import CreatedAtKeysetPagination
+from .models import Category, Product
+from .serializers import CategoryTreeSerializer, ProductReadSerializer
+from .tree import build_category_tree, category_tree_queryset
+from .views import filter_products
+
+NOT_FOUND = {"detail": "Not found."}
+
+
+def _product_queryset():
+    categories = Category.objects.only("id", "name", "slug", "tree_id", "lft")
+    return Product.objects.filter(is_active=True).prefetch_related(
+        Prefetch("categories", queryset=categories)
+    )
+
+
+@require_GET
+async def product_list(request):
+    """Active products, newest first, with keyset pagination (``?cursor=``)."""
+    paginator = CreatedAtKeysetPagination()
+    qs = filter_products(_product_queryset(), request.GET)
+    try:
+        products = await paginator.apaginate_queryset(qs, request)
+    except NotFound as e:
+        return JsonResponse({"detail": str(e.detail)}, status=404)
+
+    data = paginator.get_paginated_data(ProductReadSerializer(products, many=True).data)
+    if request.GET.get("count", "").lower() == "true":
+        data["count"] = await qs.acount()
+    return JsonResponse(data)
+
+
+@require_GET
+async def product_detail(request, slug):
+    try:
+        product = await _product_queryset().aget(slug=slug)
+    except Product.DoesNotExist:
+        return JsonResponse(NOT_FOUND, status=404)
+    return JsonResponse(ProductReadSerializer(product).data)
+
+
+@require_GET
+async def category_tree(request):
+    """The active category tree, or the subtree under ?root=<slug>."""
+    root = None
+    root_slug = request.GET.get("root")
+    if root_slug:
+        try:
+            root = await Category.objects.aget(slug=root_slug, is_active=True)
+        except Category.DoesNotExist:
+            return JsonResponse(NOT_FOUND, status=404)
+
+    nodes = [node async for node in category_tree_queryset(root)]
+    roots = build_category_tree(nodes, root)
+    return JsonResponse(CategoryTreeSerializer(roots, many=True).data, safe=False)
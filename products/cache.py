@@ -0,0 +1,146 @@
+import functools
+import hashlib
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = "catalog:gen:{}"
+RESPONSE_KEY = "catalog:resp:{}"
+STATS_KEY = "catalog:stats:{}"
+DEFAULT_TIMEOUT = 300
+
+# Generation of stock levels alone: reservations move it instead of the
+# Product generation, so checkouts only invalidate reads that show stock
+STOCK = "products.stock"
+
+
+def _label(model) -> str:
+    return model if isinstance(model, str) else model._meta.label_lower
+
+
+def _initial_generation() -> int:
+    # Counters start from the clock so a counter lost to eviction or a cache
+    # restart can never come back at a value whose entries are still cached
+    return int(time.time() * 1000)
+
+
+def get_generations(*models) -> list:
+    """Current generation of each model; one cache round trip for all of them."""
+    keys = [GENERATION_KEY.format(_label(model)) for model in models]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, _initial_generation(), timeout=None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def bump_generation(model) -> None:
+    """
+    Invalidate every cached response that depends on ``model`` (or ``STOCK``).
+
+    Responses are keyed by the generations they were built from, so moving
+    the counter on makes the old entries unreachable (they simply expire);
+    nothing has to be scanned or deleted.
+    """
+    key = GENERATION_KEY.format(_label(model))
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _initial_generation(), timeout=None)
+
+
+def bump_on_commit(*models) -> None:
+    """
+    Bump generations once the current transaction commits.
+
+    Bumping earlier would let a concurrent reader cache the pre-commit rows
+    under the new generation.
+    """
+    def bump():
+        for model in models:
+            bump_generation(model)
+
+    transaction.on_commit(bump)
+
+
+def _record(outcome: str) -> None:
+    key = STATS_KEY.format(outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def cache_stats() -> dict:
+    """Hit, miss and 304 counters shared by every worker using the cache."""
+    outcomes = ("hit", "miss", "not_modified")
+    found = cache.get_many([STATS_KEY.format(outcome) for outcome in outcomes])
+    stats = {outcome: found.get(STATS_KEY.format(outcome), 0) for outcome in outcomes}
+    served = stats["hit"] + stats["miss"]
+    stats["hit_ratio"] = round(stats["hit"] / served, 4) if served else 0.0
+    return stats
+
+
+def _response_key(view, request, generations) -> str:
+    params = sorted(
+        (key, sorted(request.query_params.getlist(key)))
+        for key in request.query_params
+    )
+    parts = [
+        type(view).__name__, view.action, sorted(view.kwargs.items()),
+        params, request.get_host(), generations,
+    ]
+    digest = hashlib.md5(json.dumps(parts, default=str).encode()).hexdigest()
+    return RESPONSE_KEY.format(digest)
+
+
+def cache_response(*models):
+    """
+    Cache the data of a successful GET viewset action.
+
+    Entries are keyed by the view, action, URL kwargs, normalized query params
+    and the generation of every model in ``models``. The key doubles as the
+    ETag, so a matching ``If-None-Match`` is answered with 304 without
+    touching the database or the cached payload.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            key = _response_key(view, request, get_generations(*models))
+            etag = f'"{key.rsplit(":", 1)[-1]}"'
+
+            if etag in request.headers.get("If-None-Match", ""):
+                _record("not_modified")
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+                response["ETag"] = etag
+                response["X-Cache"] = "NOT-MODIFIED"
+                return response
+
+            data = cache.get(key)
+            if data is not None:
+                _record("hit")
+                response = Response(data)
+                response["X-Cache"] = "HIT"
+            else:
+                _record("miss")
+                response = method(view, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                timeout = getattr(settings, "CATALOG_CACHE_TIMEOUT", DEFAULT_TIMEOUT)
+                cache.set(key, response.data, timeout)
+                response["X-Cache"] = "MISS"
+
+            response["ETag"] = etag
+            return response
+        return wrapper
+    return decorator
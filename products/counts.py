@@ -0,0 +1,57 @@
+from typing import Iterable
+
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .cache import bump_on_commit
+from .models import Category, Product
+
+
+def subtree_product_count():
+    """
+    Expression counting the distinct active products in a category's subtree.
+
+    Meant to be evaluated against a ``Category`` queryset; the MPTT range of
+    the outer row selects the subtree, so no descendant list is materialized.
+    """
+    products = (
+        Product.objects
+        .filter(
+            is_active=True,
+            categories__tree_id=OuterRef('tree_id'),
+            categories__lft__gte=OuterRef('lft'),
+            categories__lft__lte=OuterRef('rght'),
+        )
+        .order_by()
+        .values('is_active')
+        .annotate(total=Count('id', distinct=True))
+        .values('total')
+    )
+    return Coalesce(Subquery(products, output_field=IntegerField()), Value(0))
+
+
+def refresh_category_counts(category_ids: Iterable[int]) -> int:
+    """
+    Recompute ``product_count`` for the given categories and their ancestors.
+
+    Only the affected branch is touched: one query finds the ancestors and one
+    UPDATE recounts them. Returns the number of categories updated. Category
+    reads are cached on the Category generation alone, so it is bumped here.
+    """
+    nodes = list(Category.objects.filter(id__in=set(category_ids)).values('tree_id', 'lft', 'rght'))
+    if not nodes:
+        return 0
+
+    branch = Q()
+    for node in nodes:
+        branch |= Q(tree_id=node['tree_id'], lft__lte=node['lft'], rght__gte=node['rght'])
+    updated = Category.objects.filter(branch).update(product_count=subtree_product_count())
+    bump_on_commit(Category)
+    return updated
+
+
+def rebuild_category_counts() -> int:
+    """Recompute ``product_count`` for every category with a single UPDATE."""
+    updated = Category.objects.update(product_count=subtree_product_count())
+    bump_on_commit(Category)
+    return updated
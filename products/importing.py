@@ -0,0 +1,305 @@
+import csv
+import json
+from datetime import timedelta
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.text import slugify
+from rest_framework import serializers
+
+from aggregates.categories import refresh_category_stats
+from .cache import bump_on_commit
+from .counts import refresh_category_counts
+from .models import Category, Product, ProductImportJob
+from .serializers import ProductUploadSerializer
+
+DEFAULT_CHUNK_SIZE = 500
+# Seconds without a committed chunk after which a running job counts as stalled
+DEFAULT_STALE_AFTER = 600
+# pg_advisory_xact_lock key held while import chunks add category roots
+CATEGORY_TREE_LOCK_ID = 7_301_001
+CSV_LIST_SEPARATOR = "|"
+
+
+def iter_ndjson(lines: Iterable[bytes]) -> Iterator[dict]:
+    """Yield one product row per non-blank NDJSON line."""
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield {"_parse_error": f"Line {number}: {e}"}
+
+
+def iter_csv(lines: Iterable[bytes]) -> Iterator[dict]:
+    """
+    Yield product rows from CSV with a header line.
+
+    ``category_names`` holds several names separated by ``|``.
+    """
+    reader = csv.DictReader(line.decode("utf-8-sig") for line in lines)
+    for row in reader:
+        names = row.get("category_names") or ""
+        row["category_names"] = [name.strip() for name in names.split(CSV_LIST_SEPARATOR) if name.strip()]
+        if not row.get("cost_price"):
+            row.pop("cost_price", None)
+        yield row
+
+
+def chunked(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ProductImporter:
+    """
+    Import products in chunks with a constant number of queries per chunk.
+
+    Each chunk is validated in memory, its SKUs and category names are
+    resolved with one set query each, and products and category links are
+    written with ``bulk_create`` in one transaction. New categories, which
+    are rare after the first imports, are inserted one by one through mptt.
+    """
+
+    def __init__(self, chunk_size: int = None):
+        self.chunk_size = chunk_size or getattr(settings, "PRODUCT_IMPORT_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)
+
+    def run(self, rows: Iterable[dict], start_row: int = 0) -> Dict:
+        """Import every row; returns counts plus one compact result per row."""
+        summary = {"created_count": 0, "error_count": 0, "results": []}
+        row_number = start_row
+        for chunk in chunked(rows, self.chunk_size):
+            results = self.import_chunk(chunk, row_number)
+            row_number += len(chunk)
+            for result in results:
+                summary["created_count" if "id" in result else "error_count"] += 1
+            summary["results"].extend(results)
+        return summary
+
+    @transaction.atomic
+    def import_chunk(self, chunk: List[dict], start_row: int = 0) -> List[dict]:
+        """Import one chunk and return a result per row, numbered from ``start_row``."""
+        results: Dict[int, dict] = {}
+        valid: List[Tuple[int, dict]] = []
+
+        skus = {row.get("sku") for row in chunk if isinstance(row, dict) and isinstance(row.get("sku"), str)}
+        # Existing SKUs plus those accepted earlier in the chunk; the serializer checks membership
+        taken_skus = set(Product.objects.filter(sku__in=skus).values_list("sku", flat=True))
+
+        # One serializer validates every row, as ListSerializer does, so its
+        # fields are built once per chunk instead of deep-copied per row
+        validator = ProductUploadSerializer(context={"existing_skus": taken_skus})
+
+        for offset, row in enumerate(chunk):
+            row_number = start_row + offset
+            if not isinstance(row, dict) or "_parse_error" in row:
+                error = row.get("_parse_error") if isinstance(row, dict) else "Expected an object"
+                results[row_number] = {"row": row_number, "errors": {"non_field_errors": [error]}}
+                continue
+
+            try:
+                data = validator.run_validation(row)
+            except serializers.ValidationError as e:
+                results[row_number] = {"row": row_number, "sku": row.get("sku"), "errors": e.detail}
+                continue
+            taken_skus.add(data["sku"])
+            valid.append((row_number, data))
+
+        categories = self._resolve_categories(
+            {name for _, data in valid for name in data["category_names"]}
+        )
+
+        slugs = self._unique_slugs([slugify(f"{data['name']}-{data['sku']}")[:190] for _, data in valid])
+
+        products, links = [], []
+        for (row_number, data), slug in zip(valid, slugs):
+            names = list(dict.fromkeys(data.pop("category_names")))
+            missing = [name for name in names if name not in categories]
+            if missing:
+                results[row_number] = {
+                    "row": row_number, "sku": data["sku"],
+                    "errors": {"category_names": [f"Could not create categories: {missing}"]},
+                }
+                continue
+            products.append((row_number, Product(slug=slug, **data), [categories[name] for name in names]))
+
+        Product.objects.bulk_create([product for _, product, _ in products])
+
+        Link = Product.categories.through
+        for row_number, product, product_categories in products:
+            results[row_number] = {"row": row_number, "sku": product.sku, "id": product.id}
+            links.extend(Link(product_id=product.id, category_id=category.id) for category in product_categories)
+        Link.objects.bulk_create(links)
+
+        if links:
+            # Bulk links send no m2m_changed, so the rollups are refreshed here
+            category_ids = {link.category_id for link in links}
+            refresh_category_counts(category_ids)
+            refresh_category_stats(category_ids)
+        if products or categories:
+            bump_on_commit(Product, Category)
+
+        return [results[row_number] for row_number in sorted(results)]
+
+    @staticmethod
+    def _unique_slugs(candidates: List[str]) -> List[str]:
+        """Suffix slugs already taken in the database or earlier in the chunk."""
+        taken = set(Product.objects.filter(slug__in=candidates).values_list("slug", flat=True))
+        slugs = []
+        for candidate in candidates:
+            slug, suffix = candidate, 2
+            while slug in taken:
+                slug = f"{candidate}-{suffix}"
+                suffix += 1
+            taken.add(slug)
+            slugs.append(slug)
+        return slugs
+
+    @staticmethod
+    def _resolve_categories(names) -> Dict[str, Category]:
+        """
+        Map category names to categories, creating the missing ones.
+
+        New categories are inserted through mptt as root nodes, so they get
+        their place in the name order. A name whose slug is already taken by
+        another category is left out of the result and reported on the
+        affected rows.
+        """
+        if not names:
+            return {}
+        found = {c.name: c for c in Category.objects.filter(name__in=names)}
+        if names - found.keys():
+            _lock_category_tree(Category.objects.db)
+            # Another import may have created some of them while we waited
+            found = {c.name: c for c in Category.objects.filter(name__in=names)}
+            for name in sorted(names - found.keys()):
+                slug = slugify(name)[:100]
+                if not slug:
+                    continue
+                try:
+                    with transaction.atomic():
+                        found[name] = Category.objects.create(name=name, slug=slug)
+                except IntegrityError:
+                    continue
+        return found
+
+
+def _lock_category_tree(using: str):
+    """
+    Serialize root inserts until the surrounding transaction ends.
+
+    mptt picks tree ids from what it reads, so two imports adding roots at
+    once could hand out the same one. PostgreSQL takes a transaction-level
+    advisory lock; SQLite already allows a single writer at a time.
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [CATEGORY_TREE_LOCK_ID])
+
+
+FORMAT_READERS = {
+    'ndjson': iter_ndjson,
+    'csv': iter_csv,
+}
+
+
+def stale_before(now=None):
+    """Running jobs whose last heartbeat (``updated_at``) is older than this have stalled."""
+    timeout = getattr(settings, "PRODUCT_IMPORT_STALE_AFTER", DEFAULT_STALE_AFTER)
+    return (now or timezone.now()) - timedelta(seconds=timeout)
+
+
+def is_stalled(job) -> bool:
+    return job.status == 'running' and job.updated_at < stale_before()
+
+
+class JobTakenOver(Exception):
+    """Another worker reclaimed the job while this one was still running it."""
+
+
+def _claim_job(job_id):
+    """
+    Move the job to running with a conditional UPDATE, so only one worker
+    gets it. Pending and failed jobs can be claimed, and so can running jobs
+    whose worker stopped sending heartbeats.
+    """
+    now = timezone.now()
+    claimed = (
+        ProductImportJob.objects
+        .filter(pk=job_id)
+        .filter(Q(status__in=['pending', 'failed']) | Q(status='running', updated_at__lt=stale_before(now)))
+        .update(status='running', started_at=Coalesce('started_at', now), last_error='', updated_at=now)
+    )
+    return claimed == 1
+
+
+def run_import_job(job_id) -> ProductImportJob:
+    """
+    Process an import job from its stored file, resuming where it stopped.
+
+    Each chunk is committed together with the job's counters, so after a
+    crash ``rows_processed`` points exactly past the last committed chunk and
+    the next run skips the rows already imported. The counters only move if
+    ``rows_processed`` is still where this worker left it, so a worker whose
+    stalled job was reclaimed rolls its chunk back instead of applying it twice.
+    """
+    if not _claim_job(job_id):
+        # Completed, or already running on another worker
+        return ProductImportJob.objects.get(pk=job_id)
+    job = ProductImportJob.objects.get(pk=job_id)
+
+    reader = FORMAT_READERS[job.format]
+    if job.total_rows is None:
+        with job.file.open('rb') as f:
+            job.total_rows = sum(1 for _ in reader(f))
+        job.save(update_fields=['total_rows', 'updated_at'])
+
+    importer = ProductImporter(job.chunk_size)
+    try:
+        with job.file.open('rb') as f:
+            rows = islice(reader(f), job.rows_processed, None)
+            for chunk in chunked(rows, importer.chunk_size):
+                with transaction.atomic():
+                    results = importer.import_chunk(chunk, job.rows_processed)
+                    errors = [result for result in results if 'errors' in result]
+                    room = ProductImportJob.MAX_STORED_ERRORS - len(job.errors)
+                    if room > 0 and errors:
+                        job.errors = job.errors + errors[:room]
+                    committed = ProductImportJob.objects.filter(
+                        pk=job.pk, status='running', rows_processed=job.rows_processed,
+                    ).update(
+                        rows_processed=F('rows_processed') + len(chunk),
+                        created_count=F('created_count') + len(results) - len(errors),
+                        error_count=F('error_count') + len(errors),
+                        errors=job.errors,
+                        updated_at=timezone.now(),
+                    )
+                    if not committed:
+                        raise JobTakenOver(job.pk)
+                    job.rows_processed += len(chunk)
+    except JobTakenOver:
+        job.refresh_from_db()
+        return job
+    except Exception as e:
+        ProductImportJob.objects.filter(
+            pk=job.pk, status='running', rows_processed=job.rows_processed,
+        ).update(status='failed', last_error=str(e), updated_at=timezone.now())
+        raise
+
+    ProductImportJob.objects.filter(
+        pk=job.pk, status='running', rows_processed=job.rows_processed,
+    ).update(status='completed', finished_at=timezone.now(), updated_at=timezone.now())
+    job.refresh_from_db()
+    return job
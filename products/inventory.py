@@ -0,0 +1,97 @@
+from collections import Counter
+from typing import Dict, Iterable, Tuple
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+
+from .cache import STOCK, bump_on_commit
+from .models import Product
+
+
+class InsufficientStock(Exception):
+    """Raised when a reservation cannot be satisfied; carries the short product ids."""
+
+    def __init__(self, product_ids):
+        self.product_ids = sorted(product_ids)
+        super().__init__(f"Insufficient stock for products: {self.product_ids}")
+
+
+def _quantities(lines: Iterable[Tuple[int, int]]) -> Dict[int, int]:
+    """Sum quantities per product id."""
+    totals = Counter()
+    for product_id, quantity in lines:
+        totals[product_id] += quantity
+    return dict(totals)
+
+
+def _lock_tracked(product_ids) -> Dict[int, int]:
+    """
+    Lock the stock-tracked products in primary key order and return their stock.
+
+    Locking in a deterministic order means two checkouts touching the same
+    products queue behind each other instead of deadlocking.
+    """
+    rows = (
+        Product.objects
+        .select_for_update()
+        .filter(id__in=product_ids, is_digital=False)
+        .order_by('id')
+        .values_list('id', 'stock_quantity')
+    )
+    return dict(rows)
+
+
+def _apply_delta(deltas: Dict[int, int]) -> int:
+    """
+    Apply per-product stock deltas with one UPDATE and return the rows changed.
+
+    Rows receiving a negative delta only match while they still hold enough
+    stock, so the statement itself can never drive stock below zero.
+    """
+    condition = Q()
+    for pid, delta in deltas.items():
+        row = Q(id=pid, stock_quantity__gte=-delta) if delta < 0 else Q(id=pid)
+        condition |= row
+    cases = [When(id=pid, then=F('stock_quantity') + Value(delta)) for pid, delta in deltas.items()]
+    return (
+        Product.objects
+        .filter(condition)
+        .update(stock_quantity=Case(*cases, default=F('stock_quantity'), output_field=IntegerField()))
+    )
+
+
+@transaction.atomic
+def reserve_stock(lines: Iterable[Tuple[int, int]]) -> bool:
+    """
+    Decrement stock for ``(product_id, quantity)`` lines, all or nothing.
+
+    Digital products are not stock-tracked and are skipped. Returns ``True``
+    if any stock was reserved. Raises ``InsufficientStock`` (rolling back the
+    enclosing transaction's reservation) when any product is short. Row locks
+    are held until the caller's transaction commits, so callers must not do
+    network I/O inside it.
+    """
+    wanted = _quantities(lines)
+    stock = _lock_tracked(wanted.keys())
+    if not stock:
+        return False
+
+    short = [pid for pid, available in stock.items() if available < wanted[pid]]
+    if short:
+        raise InsufficientStock(short)
+
+    if _apply_delta({pid: -wanted[pid] for pid in stock}) != len(stock):
+        # Stock moved under us on a backend without row locks
+        raise InsufficientStock(stock.keys())
+    bump_on_commit(STOCK)
+    return True
+
+
+@transaction.atomic
+def release_stock(lines: Iterable[Tuple[int, int]]) -> None:
+    """Return stock for ``(product_id, quantity)`` lines previously reserved."""
+    wanted = _quantities(lines)
+    stock = _lock_tracked(wanted.keys())
+    if stock:
+        _apply_delta({pid: wanted[pid] for pid in stock})
+        bump_on_commit(STOCK)
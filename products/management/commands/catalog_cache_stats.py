@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from products.cache import cache_stats
+
+
+class Command(BaseCommand):
+    help = "Show hit/miss counters of the catalog response cache."
+
+    def handle(self, *args, **options):
+        stats = cache_stats()
+        self.stdout.write(
+            f"Hits {stats['hit']} | Misses {stats['miss']} | 304s {stats['not_modified']} "
+            f"| Hit ratio {stats['hit_ratio']:.2%}"
+        )
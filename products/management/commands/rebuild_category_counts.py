@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from products.counts import rebuild_category_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized subtree product count of every category."
+
+    def handle(self, *args, **options):
+        updated = rebuild_category_counts()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt product counts for {updated} categories"))
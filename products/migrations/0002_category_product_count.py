@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:32
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_product_counts(apps, schema_editor):
+    Category = apps.get_model('products', 'Category')
+    Product = apps.get_model('products', 'Product')
+    products = (
+        Product.objects
+        .filter(
+            is_active=True,
+            categories__tree_id=OuterRef('tree_id'),
+            categories__lft__gte=OuterRef('lft'),
+            categories__lft__lte=OuterRef('rght'),
+        )
+        .order_by()
+        .values('is_active')
+        .annotate(total=Count('id', distinct=True))
+        .values('total')
+    )
+    Category.objects.update(
+        product_count=Coalesce(Subquery(products, output_field=IntegerField()), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='product_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_product_counts, migrations.RunPython.noop),
+    ]
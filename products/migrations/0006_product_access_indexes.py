@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_created_id_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at', '-id'], name='products_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True), models.Q(('stock_quantity__gt', 0), ('is_digital', True), _connector='OR')), fields=['-created_at', '-id'], name='products_in_stock_idx'),
+        ),
+    ]
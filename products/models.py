@@ -1,7 +1,9 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from mptt.models import MPTTModel, TreeForeignKey
 from django.core.validators import MinValueValidator
 from decimal import Decimal
+import uuid
 
 
 class Category(MPTTModel):
@@ -21,6 +23,10 @@ class Category(MPTTModel):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
 
+    # Distinct active products in this category and its descendants,
+    # maintained by products.signals (rebuild with rebuild_category_counts)
+    product_count = models.PositiveIntegerField(default=0, editable=False)
+
     class MPTTMeta:
         order_insertion_by = ['name']
 
@@ -71,19 +77,113 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Weighted name/sku/description document, kept current by a database
+    # trigger and GIN-indexed on PostgreSQL. SQLite indexes the same columns
+    # in the products_fts FTS5 table instead (see products.search).
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         db_table = 'products'
         verbose_name = 'Product'
         verbose_name_plural = 'Products'
         ordering = ['-created_at']
+        indexes = [
+            # LIKE 'prefix%' lookups for the SKU fast path; opclasses only apply on PostgreSQL
+            models.Index(fields=['sku'], name='products_sku_prefix_idx', opclasses=['varchar_pattern_ops']),
+            # Keyset pagination walks (created_at, id) newest first
+            models.Index(fields=['-created_at', '-id'], name='products_created_id_idx'),
+            # The public catalog only ever lists active products
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='products_active_created_idx',
+                condition=models.Q(is_active=True),
+            ),
+            # ?in_stock=true
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='products_in_stock_idx',
+                condition=models.Q(is_active=True) & (models.Q(stock_quantity__gt=0) | models.Q(is_digital=True)),
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the post_save receiver spot is_active and price changes without a query
+        instance._loaded_rollup_values = (instance.__dict__.get('is_active'), instance.__dict__.get('price'))
+        return instance
+
     @property
     def is_in_stock(self):
         return self.stock_quantity > 0 or self.is_digital
 
     @property
     def primary_category(self):
+        """First category in tree order, read from prefetched categories when present."""
+        prefetched = getattr(self, '_prefetched_objects_cache', {}).get('categories')
+        if prefetched is not None:
+            return min(prefetched, key=lambda c: (c.tree_id, c.lft), default=None)
         return self.categories.first()
+
+
+class ProductImportJob(models.Model):
+    """A catalog file imported in the background, chunk by chunk."""
+    FORMAT_CHOICES = [
+        ('ndjson', 'NDJSON'),
+        ('csv', 'CSV'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    # Row errors kept on the job; the counters still cover every row
+    MAX_STORED_ERRORS = 1000
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    file = models.FileField(upload_to='imports/')
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    chunk_size = models.PositiveIntegerField(default=500)
+
+    # rows_processed only moves in the transaction that commits a chunk, so a
+    # restarted job resumes right after the last committed chunk
+    total_rows = models.PositiveIntegerField(null=True, blank=True)
+    rows_processed = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    last_error = models.TextField(blank=True)
+
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'product_import_jobs'
+        verbose_name = 'Product Import Job'
+        verbose_name_plural = 'Product Import Jobs'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Import {self.id} ({self.status})"
+
+    @property
+    def progress(self):
+        if not self.total_rows:
+            return 100.0 if self.status == 'completed' else 0.0
+        return round(100 * self.rows_processed / self.total_rows, 2)
+
+    @property
+    def rows_per_second(self):
+        if not self.started_at or not self.rows_processed:
+            return 0.0
+        elapsed = ((self.finished_at or self.updated_at) - self.started_at).total_seconds()
+        return round(self.rows_processed / elapsed, 1) if elapsed > 0 else 0.0
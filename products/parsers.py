@@ -0,0 +1,24 @@
+from rest_framework.parsers import BaseParser
+
+from .importing import iter_csv, iter_ndjson
+
+
+class NDJSONParser(BaseParser):
+    """
+    Lazily parse newline-delimited JSON.
+
+    ``request.data`` becomes a generator of rows that reads the request body
+    line by line, so large uploads are never held in memory.
+    """
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return iter_ndjson(stream or [])
+
+
+class CSVParser(BaseParser):
+    """Lazily parse a CSV body with a header line into a generator of rows."""
+    media_type = "text/csv"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return iter_csv(stream or [])
@@ -0,0 +1,92 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Case, F, FloatField, IntegerField, Q, Value, When
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+SKU_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._/-]*$")
+
+# bm25 column weights for products_fts(name, sku, description)
+FTS5_RANK = "bm25(products_fts, 10.0, 10.0, 1.0)"
+
+
+def _tokens(term: str) -> list:
+    return TOKEN_RE.findall(term.lower())
+
+
+def _sku_rank(term: str):
+    """
+    2 for an exact SKU match and 1 for a SKU prefix match, both case-insensitive.
+
+    Only evaluated on rows the full-text search already matched (the SKU is
+    part of the indexed document), so it needs no index of its own.
+    """
+    if not SKU_RE.match(term):
+        return Value(0)
+    return Case(
+        When(sku__iexact=term, then=Value(2)),
+        When(sku__istartswith=term, then=Value(1)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def _postgres_search(qs, tokens):
+    # Every token is prefix-matched so results follow the user while typing
+    query = SearchQuery(" & ".join(f"{token}:*" for token in tokens), config='english', search_type='raw')
+    return (
+        qs.filter(search_vector=query)
+        .annotate(search_rank=SearchRank(F('search_vector'), query))
+        .order_by('-search_rank', '-created_at')
+    )
+
+
+def _sqlite_search(qs, tokens):
+    match = " ".join(f'"{token}"*' for token in tokens)
+    table = qs.model._meta.db_table
+    # Join the FTS5 table so MATCH drives the query and bm25() is computed in
+    # the same pass; the ORM has no join API for virtual tables, hence extra().
+    # bm25() is lower-is-better, negate it so every backend sorts descending.
+    return (
+        qs.extra(
+            tables=['products_fts'],
+            where=[f'products_fts.rowid = "{table}"."id"', 'products_fts MATCH %s'],
+            params=[match],
+            select={'search_rank': f'-{FTS5_RANK}'},
+        )
+        .order_by('-search_rank', '-created_at')
+    )
+
+
+def _text_search(qs, term: str, tokens: list):
+    vendor = connections[qs.db].vendor
+    if vendor == 'postgresql':
+        return _postgres_search(qs, tokens)
+    if vendor == 'sqlite':
+        return _sqlite_search(qs, tokens)
+    return qs.filter(
+        Q(name__icontains=term) | Q(description__icontains=term) | Q(sku__icontains=term)
+    ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def search_products(qs, term: str):
+    """
+    Rank ``qs`` against a free-text search ``term``.
+
+    PostgreSQL queries the GIN-indexed ``search_vector`` and SQLite the
+    ``products_fts`` FTS5 table; other backends fall back to ``icontains``.
+    Products whose SKU equals or starts with the term come first, then the
+    rest by relevance. Results carry a ``search_rank`` annotation. Nothing is
+    queried until the result is evaluated.
+    """
+    term = term.strip()
+    tokens = _tokens(term)
+    if not tokens:
+        return qs.none()
+
+    return (
+        _text_search(qs, term, tokens)
+        .annotate(sku_rank=_sku_rank(term))
+        .order_by('-sku_rank', '-search_rank', '-created_at')
+    )
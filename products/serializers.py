@@ -1,14 +1,26 @@
+from decimal import Decimal
 from rest_framework import serializers
-from django.db.models import Avg
-from .models import Category, Product
+from django.db.models import Avg, Prefetch
 
+from backend.fields import DynamicFieldsMixin
+from .models import Category, Product, ProductImportJob
 
-class CategorySerializer(serializers.ModelSerializer):
+
+# Columns read by get_children() and get_ancestors()
+TREE_COLUMNS = ["parent", "tree_id", "lft", "rght", "level"]
+
+# Category columns embedded in product payloads, plus the tree order of primary_category
+PRODUCT_CATEGORIES = Category.objects.only("id", "name", "slug", "tree_id", "lft")
+
+
+class CategorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for product categories, including nested children and product counts."""
     children = serializers.SerializerMethodField()
     full_path = serializers.ReadOnlyField()
     level = serializers.ReadOnlyField()
-    product_count = serializers.SerializerMethodField()
+    product_count = serializers.ReadOnlyField()
+
+    field_columns = {"children": TREE_COLUMNS, "full_path": TREE_COLUMNS}
 
     class Meta:
         model = Category
@@ -21,13 +33,30 @@ class CategorySerializer(serializers.ModelSerializer):
 
     def get_children(self, obj):
         """Return direct child categories, if any."""
-        children = obj.get_children()
-        return CategorySerializer(children, many=True).data if children.exists() else []
+        return CategorySerializer(obj.get_children(), many=True).data
+
+
+class CategoryTreeSerializer(serializers.ModelSerializer):
+    """
+    Nested category tree built in memory by ``products.tree.build_category_tree``.
+
+    Reads ``tree_children`` and ``tree_path`` from the linked nodes, so a whole
+    tree serializes from the single query that loaded it.
+    """
+    children = serializers.SerializerMethodField()
+    full_path = serializers.CharField(source="tree_path", read_only=True)
+
+    class Meta:
+        model = Category
+        fields = [
+            "id", "name", "slug", "description", "parent",
+            "children", "level", "full_path", "product_count",
+            "is_active", "created_at"
+        ]
+        read_only_fields = fields
 
-    def get_product_count(self, obj):
-        """Count all products under this category, including descendants."""
-        related_categories = obj.get_descendants(include_self=True)
-        return Product.objects.filter(categories__in=related_categories).distinct().count()
+    def get_children(self, obj):
+        return CategoryTreeSerializer(obj.tree_children, many=True).data
 
 
 class CategoryAveragePriceSerializer(serializers.Serializer):
@@ -39,15 +68,33 @@ class CategoryAveragePriceSerializer(serializers.Serializer):
     include_subcategories = serializers.BooleanField(default=True)
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class CategorySummarySerializer(serializers.ModelSerializer):
+    """Flat category reference (no children, no ancestor path)."""
+
+    class Meta:
+        model = Category
+        fields = ["id", "name", "slug"]
+        read_only_fields = fields
+
+
+class ProductSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for products, with category details and stock info."""
-    categories = CategorySerializer(many=True, read_only=True)
+    # Flat references: a nested CategorySerializer would query children and ancestors per category
+    categories = CategorySummarySerializer(many=True, read_only=True)
     category_ids = serializers.ListField(
         child=serializers.IntegerField(), write_only=True, required=False
     )
-    primary_category = CategorySerializer(read_only=True)
+    primary_category = CategorySummarySerializer(read_only=True)
     is_in_stock = serializers.ReadOnlyField()
 
+    field_columns = {"is_in_stock": ["stock_quantity", "is_digital"]}
+    # One categories query per page serves both fields; primary_category
+    # picks the first of them in tree order
+    field_prefetches = {
+        "categories": lambda serializer: [Prefetch("categories", queryset=PRODUCT_CATEGORIES)],
+        "primary_category": lambda serializer: [Prefetch("categories", queryset=PRODUCT_CATEGORIES)],
+    }
+
     class Meta:
         model = Product
         fields = [
@@ -81,14 +128,56 @@ class ProductSerializer(serializers.ModelSerializer):
         return instance
 
 
+class ProductSummarySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """
+    Compact product reference for embedding in orders and long lists.
+
+    Reads only its own columns, so it never touches categories.
+    """
+
+    class Meta:
+        model = Product
+        fields = ["id", "sku", "name", "price", "slug"]
+        read_only_fields = fields
+
+
+class ProductReadSerializer(serializers.ModelSerializer):
+    """
+    Read-only product representation built purely from prefetched data.
+
+    Used by the async views, where a lazy query would raise
+    ``SynchronousOnlyOperation``: categories must be prefetched, and the
+    primary category is the first of them in tree order, as with
+    ``Product.primary_category``.
+    """
+    categories = CategorySummarySerializer(many=True, read_only=True)
+    primary_category = serializers.SerializerMethodField()
+    is_in_stock = serializers.ReadOnlyField()
+
+    class Meta:
+        model = Product
+        fields = [
+            "id", "name", "slug", "description",
+            "price", "cost_price", "sku", "stock_quantity",
+            "is_digital", "is_active", "is_featured",
+            "categories", "primary_category",
+            "is_in_stock", "created_at", "updated_at"
+        ]
+        read_only_fields = fields
+
+    def get_primary_category(self, obj):
+        category = obj.primary_category
+        return CategorySummarySerializer(category).data if category else None
+
+
 class ProductUploadSerializer(serializers.Serializer):
     """Serializer for bulk product upload."""
     name = serializers.CharField(max_length=200)
     description = serializers.CharField()
-    price = serializers.DecimalField(max_digits=10, decimal_places=2)
-    cost_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal("0.01"))
+    cost_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal("0.00"), required=False)
     sku = serializers.CharField(max_length=50)
-    stock_quantity = serializers.IntegerField(default=0)
+    stock_quantity = serializers.IntegerField(default=0, min_value=0)
     is_digital = serializers.BooleanField(default=False)
     category_names = serializers.ListField(
         child=serializers.CharField(),
@@ -96,6 +185,46 @@ class ProductUploadSerializer(serializers.Serializer):
     )
 
     def validate_sku(self, value):
-        if Product.objects.filter(sku=value).exists():
+        # Bulk imports pre-resolve SKUs with one query and pass them in the context
+        existing_skus = self.context.get("existing_skus")
+        if existing_skus is not None:
+            exists = value in existing_skus
+        else:
+            exists = Product.objects.filter(sku=value).exists()
+        if exists:
             raise serializers.ValidationError("A product with this SKU already exists.")
         return value
+
+
+class ProductImportJobSerializer(serializers.ModelSerializer):
+    """Serializer for background import jobs: upload on create, progress on read."""
+    file = serializers.FileField(write_only=True)
+    format = serializers.ChoiceField(choices=ProductImportJob.FORMAT_CHOICES, required=False)
+    chunk_size = serializers.IntegerField(min_value=1, max_value=5000, required=False)
+    progress = serializers.ReadOnlyField()
+    rows_per_second = serializers.ReadOnlyField()
+
+    class Meta:
+        model = ProductImportJob
+        fields = [
+            "id", "file", "format", "status", "chunk_size",
+            "total_rows", "rows_processed", "progress", "rows_per_second",
+            "created_count", "error_count", "errors", "last_error",
+            "started_at", "finished_at", "created_at", "updated_at"
+        ]
+        read_only_fields = [
+            "id", "status", "total_rows", "rows_processed", "created_count",
+            "error_count", "errors", "last_error", "started_at", "finished_at",
+            "created_at", "updated_at"
+        ]
+
+    def validate(self, attrs):
+        if not attrs.get("format"):
+            extension = attrs["file"].name.rsplit(".", 1)[-1].lower()
+            if extension in ("ndjson", "jsonl"):
+                attrs["format"] = "ndjson"
+            elif extension == "csv":
+                attrs["format"] = "csv"
+            else:
+                raise serializers.ValidationError({"format": "Could not infer the format; pass ndjson or csv."})
+        return attrs
@@ -0,0 +1,115 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from mptt.signals import node_moved
+
+from aggregates.categories import rebuild_category_stats, refresh_category_stats
+from aggregates.sales import schedule_category_sales_rebuild, schedule_product_sales_refresh
+from .cache import bump_on_commit
+from .counts import rebuild_category_counts, refresh_category_counts
+from .models import Category, Product
+
+
+def refresh_category_rollups(category_ids) -> None:
+    """Recount the product count and price total of the categories and their ancestors."""
+    category_ids = list(category_ids)
+    refresh_category_counts(category_ids)
+    refresh_category_stats(category_ids)
+
+
+def rebuild_category_rollups() -> None:
+    rebuild_category_counts()
+    rebuild_category_stats()
+    # Sales roll up along the tree as well
+    schedule_category_sales_rebuild()
+
+
+@receiver(m2m_changed, sender=Product.categories.through)
+def product_categories_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        # Remember both sides of what is about to be unlinked; post_clear has no pk_set
+        if reverse:
+            instance._cleared_links = ([instance.pk], list(instance.products.values_list('id', flat=True)))
+        else:
+            instance._cleared_links = (list(instance.categories.values_list('id', flat=True)), [instance.pk])
+        return
+
+    if action == 'post_clear':
+        category_ids, product_ids = getattr(instance, '_cleared_links', ([], []))
+    elif action in ('post_add', 'post_remove') and pk_set:
+        category_ids, product_ids = ([instance.pk], pk_set) if reverse else (pk_set, [instance.pk])
+    else:
+        return
+
+    refresh_category_rollups(category_ids)
+    # The products' past sales now roll up into different categories
+    schedule_product_sales_refresh(product_ids, category_ids)
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, created, **kwargs):
+    # A new product has no links yet; later saves matter when they toggle
+    # is_active (counts and totals) or change the price (totals)
+    loaded = getattr(instance, '_loaded_rollup_values', None)
+    current = (instance.__dict__.get('is_active'), instance.__dict__.get('price'))
+    instance._loaded_rollup_values = current
+    if created or loaded == current:
+        return
+    category_ids = list(instance.categories.values_list('id', flat=True))
+    if loaded is None or loaded[0] != current[0]:
+        refresh_category_rollups(category_ids)
+    else:
+        refresh_category_stats(category_ids)
+
+
+@receiver(pre_delete, sender=Product)
+def product_pre_delete(sender, instance, **kwargs):
+    instance._deleted_category_ids = list(instance.categories.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    category_ids = getattr(instance, '_deleted_category_ids', [])
+    refresh_category_rollups(category_ids)
+    if category_ids:
+        # Its order items are gone too, which changes its categories' sales
+        schedule_category_sales_rebuild()
+
+
+@receiver(node_moved, sender=Category)
+def category_moved(sender, instance, **kwargs):
+    # Sent before the row is written; recount once the save has finished
+    instance._moved = True
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, created, **kwargs):
+    if created:
+        # Give every category a stats row, even before it has products
+        refresh_category_stats([instance.pk])
+    elif getattr(instance, '_moved', False):
+        # Moves reshape ancestor ranges; recount everything
+        instance._moved = False
+        rebuild_category_rollups()
+    else:
+        # save() wrote the in-memory count back, which may be stale
+        refresh_category_counts([instance.pk])
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    rebuild_category_rollups()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def catalog_changed(sender, **kwargs):
+    bump_on_commit(sender)
+
+
+@receiver(m2m_changed, sender=Product.categories.through)
+def catalog_links_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        # Links change product payloads and category product counts alike
+        bump_on_commit(Product, Category)
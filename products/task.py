@@ -0,0 +1,31 @@
+import logging
+from celery import shared_task
+from .importing import run_import_job
+from .models import ProductImportJob
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3, acks_late=True)
+def process_product_import_task(self, job_id: str):
+    """
+    Import a stored catalog file in chunks.
+
+    ``acks_late`` makes the broker redeliver the task if the worker dies; the
+    job then resumes from its last committed chunk.
+    """
+    try:
+        job = run_import_job(job_id)
+        logger.info(
+            f"Import {job_id} finished: {job.created_count} created, {job.error_count} errors"
+        )
+        return job.status
+
+    except ProductImportJob.DoesNotExist:
+        logger.error(f"Import job {job_id} not found.")
+        return None
+    except Exception as e:
+        logger.error(f"Error processing import job {job_id}: {e}")
+        if not self.request.is_eager:
+            raise self.retry(exc=e, countdown=60)
+        return 'failed'
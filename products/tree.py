@@ -0,0 +1,48 @@
+from typing import Iterable, List, Optional
+
+from django.db.models import Q
+
+from .models import Category
+
+
+def category_tree_queryset(root: Optional[Category] = None):
+    """
+    Active categories of the whole forest, or of ``root``'s subtree plus its
+    ancestors, ordered so that every parent precedes its children.
+    """
+    qs = Category.objects.filter(is_active=True)
+    if root is not None:
+        subtree = Q(lft__gte=root.lft, rght__lte=root.rght)
+        ancestors = Q(lft__lt=root.lft, rght__gt=root.rght)
+        qs = qs.filter(Q(tree_id=root.tree_id) & (subtree | ancestors))
+    return qs.order_by('tree_id', 'lft')
+
+
+def build_category_tree(nodes: Iterable[Category], root: Optional[Category] = None) -> List[Category]:
+    """
+    Link ``(tree_id, lft)``-ordered nodes into a nested structure in memory.
+
+    Each node gets ``tree_children`` and ``tree_path`` attributes. A node whose
+    parent is missing from ``nodes`` (an inactive branch) is dropped along with
+    its descendants. Returns the top-level nodes, or ``[root]`` when building a
+    subtree; ancestors of ``root`` only contribute to ``tree_path``.
+    """
+    linked = {}
+    roots = []
+    for node in nodes:
+        node.tree_children = []
+        parent = linked.get(node.parent_id)
+        if parent is not None:
+            node.tree_path = f"{parent.tree_path} > {node.name}"
+            parent.tree_children.append(node)
+        elif node.parent_id is None:
+            node.tree_path = node.name
+            roots.append(node)
+        else:
+            continue
+        linked[node.pk] = node
+
+    if root is None:
+        return roots
+    node = linked.get(root.pk)
+    return [node] if node is not None else []
@@ -1,19 +1,92 @@
-from django.db.models import Avg, Q
-from rest_framework import viewsets, status
+from collections.abc import Iterator
+
+from django.db.models import Avg, Count, Exists, OuterRef, Q
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
+
+from backend.fields import SparseFieldsMixin, plan_queryset, requested_fields
+from backend.pagination import CatalogPagination
 
-from .models import Category, Product
+from .cache import STOCK, cache_response
+from .importing import ProductImporter, is_stalled
+from .models import Category, Product, ProductImportJob
+from .parsers import CSVParser, NDJSONParser
+from .search import search_products
+from .tree import build_category_tree, category_tree_queryset
 from .serializers import (
     CategorySerializer,
+    CategoryTreeSerializer,
     ProductSerializer,
+    ProductSummarySerializer,
     CategoryAveragePriceSerializer,
-    ProductUploadSerializer,
+    ProductImportJobSerializer,
 )
+from .task import process_product_import_task
+
+MAX_IMPORT_CHUNK_SIZE = 5000
+
+
+def filter_products(qs, params):
+    """Apply the ?category=, ?search= and ?in_stock= filters shared by the product lists."""
+    category_id = params.get("category")
+    if category_id:
+        qs = qs.filter(categories__id=category_id)
+
+    search = params.get("search")
+    if search:
+        qs = search_products(qs, search)
+
+    in_stock = params.get("in_stock")
+    if in_stock is not None:
+        if in_stock.lower() == "true":
+            qs = qs.filter(Q(stock_quantity__gt=0) | Q(is_digital=True))
+        else:
+            qs = qs.filter(stock_quantity=0, is_digital=False)
+
+    # No DISTINCT: the through table is unique per (product, category) so
+    # filtering on a single category cannot duplicate rows, and DISTINCT
+    # would stop the planner from reading rows in index order
+    return qs
+
+
+def category_products(category, include_subcategories=True):
+    """
+    Active products linked to ``category``, or to any category in its subtree.
+
+    The subtree is the MPTT ``lft`` range of ``category`` within its tree, so
+    the descendants are never materialized. An EXISTS on the link table
+    keeps products in several matching categories to one row without a
+    DISTINCT.
+    """
+    links = Product.categories.through.objects.filter(product_id=OuterRef("pk"))
+    if include_subcategories:
+        links = links.filter(
+            category__tree_id=category.tree_id,
+            category__lft__gte=category.lft,
+            category__lft__lte=category.rght,
+        )
+    else:
+        links = links.filter(category_id=category.id)
+    return Product.objects.filter(Exists(links), is_active=True)
+
+
+# Product columns loaded whatever ?fields= asks for (keyset pagination keys)
+PRODUCT_ALWAYS_COLUMNS = ("id", "created_at")
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+def product_serializer_class(fields):
+    """The summary serializer when ``fields`` asks for nothing beyond it, else the full one."""
+    if fields is not None and fields <= set(ProductSummarySerializer.Meta.fields):
+        return ProductSummarySerializer
+    return ProductSerializer
+
+
+class CategoryViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     """CRUD and custom actions for product categories."""
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
@@ -26,21 +99,43 @@ class CategoryViewSet(viewsets.ModelViewSet):
         parent_id = self.request.query_params.get("parent")
 
         if parent_id == "root":
-            return qs.filter(parent=None)
+            qs = qs.filter(parent=None)
         elif parent_id:
-            return qs.filter(parent_id=parent_id)
-        return qs
+            qs = qs.filter(parent_id=parent_id)
+        return self.plan_queryset(qs)
+
+    @cache_response(Category)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response(Category)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=False, methods=["get"])
+    @cache_response(Category)
+    def tree(self, request):
+        """Return the active category tree (or the subtree under ?root=<slug>) in one query."""
+        root = None
+        root_slug = request.query_params.get("root")
+        if root_slug:
+            root = get_object_or_404(Category, slug=root_slug, is_active=True)
+
+        roots = build_category_tree(category_tree_queryset(root), root)
+        return Response(CategoryTreeSerializer(roots, many=True).data)
 
     @action(detail=True, methods=["get"])
+    @cache_response(Category, Product)
     def average_price(self, request, slug=None):
         """Return average product price for this category."""
         category = self.get_object()
         include_subs = request.query_params.get("include_subcategories", "true").lower() == "true"
-        categories = category.get_descendants(include_self=True) if include_subs else [category]
 
-        products = Product.objects.filter(categories__in=categories, is_active=True).distinct()
-        avg_price = products.aggregate(value=Avg("price"))["value"]
-        product_count = products.count()
+        # Average and count in one aggregate query
+        totals = category_products(category, include_subs).aggregate(
+            avg_price=Avg("price"), product_count=Count("id"),
+        )
+        avg_price, product_count = totals["avg_price"], totals["product_count"]
 
         data = {
             "category_id": category.id,
@@ -52,81 +147,99 @@ class CategoryViewSet(viewsets.ModelViewSet):
         return Response(CategoryAveragePriceSerializer(data).data)
 
     @action(detail=True, methods=["get"])
+    @cache_response(Category, Product, STOCK)
     def products(self, request, slug=None):
-        """List products belonging to this category """
+        """
+        Paginated products of this category (and its subcategories).
+
+        Products come as summaries unless ``?fields=`` asks for more.
+        """
         category = self.get_object()
         include_subs = request.query_params.get("include_subcategories", "true").lower() == "true"
-        categories = category.get_descendants(include_self=True) if include_subs else [category]
 
-        products = Product.objects.filter(categories__in=categories, is_active=True).distinct()
-        return Response(ProductSerializer(products, many=True).data)
+        fields = requested_fields(request)
+        serializer_class = ProductSummarySerializer if fields is None else product_serializer_class(fields)
+        products = category_products(category, include_subs)
+        products = plan_queryset(products, serializer_class(fields=fields), PRODUCT_ALWAYS_COLUMNS)
+
+        paginator = CatalogPagination()
+        page = paginator.paginate_queryset(products, request, view=self)
+        return paginator.get_paginated_response(serializer_class(page, many=True, fields=fields).data)
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     """CRUD and bulk upload for products."""
     queryset = Product.objects.filter(is_active=True)
     serializer_class = ProductSerializer
     permission_classes = [AllowAny]
     lookup_field = "slug"
+    pagination_class = CatalogPagination
+    always_columns = PRODUCT_ALWAYS_COLUMNS
 
     def get_queryset(self):
         """Filter products by category, search term, or stock status."""
-        qs = Product.objects.filter(is_active=True)
-
-        category_id = self.request.query_params.get("category")
-        if category_id:
-            qs = qs.filter(categories__id=category_id)
-
-        search = self.request.query_params.get("search")
-        if search:
-            qs = qs.filter(
-                Q(name__icontains=search) |
-                Q(description__icontains=search) |
-                Q(sku__icontains=search)
-            )
-
-        in_stock = self.request.query_params.get("in_stock")
-        if in_stock is not None:
-            if in_stock.lower() == "true":
-                qs = qs.filter(Q(stock_quantity__gt=0) | Q(is_digital=True))
-            else:
-                qs = qs.filter(stock_quantity=0, is_digital=False)
-
-        return qs.distinct()
-
-    @action(detail=False, methods=["post"])
+        qs = filter_products(Product.objects.filter(is_active=True), self.request.query_params)
+        return self.plan_queryset(qs)
+
+    def get_serializer_class(self):
+        return product_serializer_class(self.sparse_fields())
+
+    @cache_response(Category, Product, STOCK)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response(Category, Product, STOCK)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=False, methods=["post"], parser_classes=[JSONParser, NDJSONParser, CSVParser])
     def bulk_upload(self, request):
-        """Upload multiple products at once, creating categories if missing."""
-        if not isinstance(request.data, list):
+        """
+        Import products in chunks, creating categories if missing.
+
+        Accepts a JSON list, or a streamed NDJSON (``application/x-ndjson``) or
+        CSV (``text/csv``) body that is read line by line. ``?chunk_size=``
+        overrides the rows written per transaction.
+        """
+        rows = request.data
+        if not isinstance(rows, (list, Iterator)):
             return Response({"error": "Expected a list of products"}, status=status.HTTP_400_BAD_REQUEST)
 
-        created, errors = [], []
-
-        for i, data in enumerate(request.data):
-            serializer = ProductUploadSerializer(data=data)
-            if serializer.is_valid():
-                try:
-                    category_names = serializer.validated_data.pop("category_names")
-                    categories = []
-                    for name in category_names:
-                        category, _ = Category.objects.get_or_create(
-                            name=name,
-                            defaults={"slug": name.lower().replace(" ", "-")}
-                        )
-                        categories.append(category)
-
-                    product = Product.objects.create(**serializer.validated_data)
-                    product.categories.set(categories)
-                    created.append(ProductSerializer(product).data)
-                except Exception as e:
-                    errors.append({"index": i, "error": str(e), "data": data})
-            else:
-                errors.append({"index": i, "errors": serializer.errors, "data": data})
-
-        status_code = status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
-        return Response({
-            "created_count": len(created),
-            "error_count": len(errors),
-            "created_products": created,
-            "errors": errors,
-        }, status=status_code)
+        try:
+            chunk_size = max(0, min(int(request.query_params.get("chunk_size", 0)), MAX_IMPORT_CHUNK_SIZE)) or None
+        except ValueError:
+            return Response({"error": "chunk_size must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        summary = ProductImporter(chunk_size).run(rows)
+        status_code = status.HTTP_201_CREATED if summary["created_count"] else status.HTTP_400_BAD_REQUEST
+        return Response(summary, status=status_code)
+
+
+class ProductImportJobViewSet(mixins.CreateModelMixin,
+                              mixins.RetrieveModelMixin,
+                              mixins.ListModelMixin,
+                              viewsets.GenericViewSet):
+    """Upload catalog files for background import and poll their progress."""
+    queryset = ProductImportJob.objects.all()
+    serializer_class = ProductImportJobSerializer
+    parser_classes = [MultiPartParser]
+    permission_classes = [IsAdminUser]
+
+    def perform_create(self, serializer):
+        job = serializer.save()
+        self._enqueue(job)
+
+    @action(detail=True, methods=["post"])
+    def resume(self, request, pk=None):
+        """Restart a failed or stalled job from its last committed chunk."""
+        job = self.get_object()
+        if job.status == "completed":
+            return Response({"error": "Job already completed."}, status=status.HTTP_400_BAD_REQUEST)
+        if job.status == "running" and not is_stalled(job):
+            return Response({"error": "Job is still running."}, status=status.HTTP_409_CONFLICT)
+        self._enqueue(job)
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @staticmethod
+    def _enqueue(job):
+        transaction.on_commit(lambda: process_product_import_task.delay(str(job.id)))
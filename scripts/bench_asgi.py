@@ -0,0 +1,149 @@
+"""
+Compare sync WSGI (gunicorn sync workers) with async ASGI (uvicorn) at high concurrency.
+
+    python scripts/bench_asgi.py --workers 2 --concurrency 200 --requests 5000
+
+Both servers are started with the same number of worker processes against
+the configured database. The sync server gets ``/api/products/<slug>/`` and
+the ASGI server gets ``/api/async/products/<slug>/``. Each client coroutine
+holds its own connection (kept alive where the server allows it), so
+``--concurrency`` is the number of clients connected at once. A sync worker serves one client at a time, while
+an ASGI worker interleaves clients whenever one waits on the database.
+A unique query parameter on every request keeps the catalog response
+cache out of the comparison.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_request_ids = itertools.count()
+
+
+def start_server(kind, port, workers):
+    if kind == "wsgi":
+        cmd = ["gunicorn", "backend.wsgi:application", "--bind", f"127.0.0.1:{port}",
+               "--workers", str(workers), "--worker-class", "sync", "--log-level", "warning"]
+    else:
+        cmd = ["uvicorn", "backend.asgi:application", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+    return subprocess.Popen(cmd, cwd=ROOT, env={**os.environ, "DJANGO_SETTINGS_MODULE": "backend.settings"})
+
+
+async def wait_ready(port, path, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            status, _ = await fetch(reader, writer, path)
+            writer.close()
+            if status == 200:
+                return
+        except OSError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not become ready")
+
+
+async def fetch(reader, writer, path):
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nAccept: application/json\r\n"
+        "Connection: keep-alive\r\n\r\n".encode())
+    await writer.drain()
+    status_line = await reader.readline()
+    status = int(status_line.split()[1])
+    length, keep_alive = 0, True
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+        elif name.lower() == "connection" and value.strip().lower() == "close":
+            keep_alive = False
+    await reader.readexactly(length)
+    return status, keep_alive
+
+
+async def client(port, path, count, latencies, errors):
+    writer = None
+    try:
+        for _ in range(count):
+            started = time.perf_counter()
+            if writer is None:
+                # gunicorn's sync workers close the connection after every response
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            status, keep_alive = await fetch(reader, writer, f"{path}?b={next(_request_ids)}")
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors.append(status)
+            if not keep_alive:
+                writer.close()
+                writer = None
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+async def run(port, path, total, concurrency):
+    latencies, errors = [], []
+    per_client = max(1, total // concurrency)
+    started = time.perf_counter()
+    await asyncio.gather(*(client(port, path, per_client, latencies, errors) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slug", help="Product slug to fetch (defaults to the newest active product)")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    slug = args.slug
+    if not slug:
+        sys.path.insert(0, ROOT)
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+        import django
+
+        django.setup()
+        from products.models import Product
+
+        slug = Product.objects.filter(is_active=True).values_list("slug", flat=True).first()
+        if not slug:
+            sys.exit("No active products to fetch; load some or pass --slug")
+
+    targets = [
+        ("wsgi", 8101, f"/api/products/{slug}/"),
+        ("asgi", 8102, f"/api/async/products/{slug}/"),
+    ]
+    for kind, port, path in targets:
+        server = start_server(kind, port, args.workers)
+        try:
+            asyncio.run(wait_ready(port, path))
+            result = asyncio.run(run(port, path, args.requests, args.concurrency))
+        finally:
+            server.terminate()
+            server.wait()
+        print(
+            f"{kind}  {result['requests']} req  {result['rps']:.0f} req/s  "
+            f"p50 {result['p50']:.1f}ms  p99 {result['p99']:.1f}ms  errors {result['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Load test a running server and report how many database connections it opened.
+
+    DATABASE_URL=postgres://... python scripts/load_test.py \
+        --url http://localhost:8000/api/products/ --requests 2000 --concurrency 16
+
+Requests are spread over ``--concurrency`` threads, each with a keep-alive
+HTTP session. When ``DATABASE_URL`` points at PostgreSQL, the script reads
+``pg_stat_database.sessions`` (PostgreSQL 14+) before and after the run.
+Without connection reuse every request opens a new session. With persistent
+connections or a pool the count stays around ``workers * threads``.
+"""
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import local
+
+import requests
+
+_thread = local()
+
+
+def _session():
+    if not hasattr(_thread, "session"):
+        _thread.session = requests.Session()
+    return _thread.session
+
+
+def _timed_get(url, headers):
+    started = time.perf_counter()
+    response = _session().get(url, headers=headers, timeout=30)
+    return response.status_code, time.perf_counter() - started
+
+
+def _postgres_sessions(database_url):
+    """Total sessions ever opened on the database, or None if unavailable."""
+    if not database_url or not database_url.startswith(("postgres://", "postgresql://")):
+        return None
+    import psycopg2
+
+    with psycopg2.connect(database_url) as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT sessions FROM pg_stat_database WHERE datname = current_database()")
+        return cursor.fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000/api/products/")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--token", default=os.environ.get("LOAD_TEST_TOKEN"), help="OAuth2 bearer token")
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    database_url = os.environ.get("DATABASE_URL")
+    sessions_before = _postgres_sessions(database_url)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda _: _timed_get(args.url, headers), range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    sessions_after = _postgres_sessions(database_url)
+
+    latencies = sorted(latency for _, latency in results)
+    errors = sum(1 for status, _ in results if status >= 400)
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {elapsed:.2f}s")
+    print(f"throughput  {args.requests / elapsed:.1f} req/s")
+    print(f"latency     p50 {statistics.median(latencies) * 1000:.1f}ms"
+          f"  p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms")
+    print(f"errors      {errors}")
+    if sessions_before is not None:
+        opened = sessions_after - sessions_before - 1  # the "after" probe itself
+        print(f"db sessions {opened} opened for {args.requests} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+
+from customers.models import Customer
+from notifications.sms import FakeTransport, set_transport
+from products.models import Category, Product
+
+
+def pytest_collection_modifyitems(config, items):
+    """Benchmarks marked ``slow`` seed large tables; they only run when selected with ``-m slow``"""
+    if config.option.markexpr:
+        return
+    skip = pytest.mark.skip(reason="benchmark, run with -m slow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cached responses must not leak between tests"""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def fake_sms():
+    """Route every SMS through an in-memory transport"""
+    transport = FakeTransport()
+    set_transport(transport)
+    yield transport
+    set_transport(None)
+
+
+@pytest.fixture
+def customer():
+    return Customer.objects.create_user(
+        email="buyer@example.com", username="buyer", password="psw1234", first_name="Buyer", phone="0700000000",
+    )
+
+
+@pytest.fixture
+def staff():
+    return Customer.objects.create_user(
+        email="staff@example.com", username="staff", password="psw1234", is_staff=True, phone="0711111111",
+    )
+
+
+@pytest.fixture
+def tree():
+    """Electronics with two subcategories, Phones and Laptops"""
+    electronics = Category.objects.create(name="Electronics", slug="electronics")
+    phones = Category.objects.create(name="Phones", slug="phones", parent=electronics)
+    laptops = Category.objects.create(name="Laptops", slug="laptops", parent=electronics)
+    return electronics, phones, laptops
+
+
+@pytest.fixture
+def make_product():
+    """Create a product linked to the given categories; fields default to a cheap, stocked item"""
+    def make(sku, *categories, price="10.00", **fields):
+        fields = {"name": sku, "slug": sku.lower(), "description": sku, "stock_quantity": 50, **fields}
+        product = Product.objects.create(sku=sku, price=Decimal(price), **fields)
+        product.categories.set(categories)
+        return product
+    return make
@@ -0,0 +1,304 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from celery.exceptions import Retry
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from aggregates.models import CategoryStats, CountedOrder, DailyCategorySales, DailyProductSales
+from aggregates import task as aggregate_tasks
+from aggregates.sales import apply_order_sales, reconcile_sales
+from orders.models import Order
+from orders.services import create_order, transition_orders
+from products.models import Product
+
+
+def stats():
+    return {
+        s.category.slug: (s.product_count, s.price_total)
+        for s in CategoryStats.objects.select_related("category")
+    }
+
+
+def category_sales():
+    return {
+        s.category.slug: (s.order_count, s.units, s.revenue)
+        for s in DailyCategorySales.objects.select_related("category")
+    }
+
+
+@pytest.mark.django_db
+def test_category_stats_follow_links_prices_and_deletes(tree, make_product):
+    electronics, phones, laptops = tree
+    phone = make_product("PHONE", phones, price="100.00")
+    combo = make_product("COMBO", phones, laptops, price="300.00")
+
+    assert stats() == {
+        "electronics": (2, Decimal("400.00")),
+        "phones": (2, Decimal("400.00")),
+        "laptops": (1, Decimal("300.00")),
+    }
+    assert CategoryStats.objects.get(category=electronics).average_price == Decimal("200.00")
+
+    phone.price = Decimal("150.00")
+    phone.save()
+    assert stats()["electronics"] == (2, Decimal("450.00"))
+
+    combo.is_active = False
+    combo.save()
+    assert stats()["laptops"] == (0, Decimal("0.00"))
+
+    laptops.products.clear()
+    phone.delete()
+    assert stats()["electronics"] == (0, Decimal("0.00"))
+
+
+@pytest.mark.django_db
+def test_product_saves_only_refresh_the_rollups_they_change(tree, make_product):
+    _, phones, _ = tree
+    phone = Product.objects.get(pk=make_product("PHONE", phones, price="100.00").pk)
+
+    with CaptureQueriesContext(connection) as ctx:
+        phone.stock_quantity = 3
+        phone.save()
+    assert not any("categor" in q["sql"] for q in ctx.captured_queries)
+
+    with CaptureQueriesContext(connection) as ctx:
+        phone.price = Decimal("120.00")
+        phone.save()
+    # Only the price total moves; Category.product_count is left alone
+    assert not any('UPDATE "categories"' in q["sql"] for q in ctx.captured_queries)
+    assert stats()["phones"] == (1, Decimal("120.00"))
+
+
+@pytest.mark.django_db
+def test_category_stats_follow_moves(tree, make_product):
+    electronics, phones, laptops = tree
+    make_product("PHONE", phones, price="100.00")
+
+    phones.parent = laptops
+    phones.save()
+    assert stats()["laptops"] == (1, Decimal("100.00"))
+    assert stats()["electronics"] == (1, Decimal("100.00"))
+
+
+@pytest.mark.django_db
+def test_stats_endpoint_reads_the_rollup(tree, django_assert_num_queries, make_product):
+    electronics, phones, _ = tree
+    make_product("PHONE", phones, price="100.00")
+    make_product("CASE", electronics, price="20.00")
+
+    with django_assert_num_queries(1):
+        response = APIClient().get("/api/category-stats/electronics/")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["product_count"] == 2
+    assert data["average_price"] == "60.00"
+    assert APIClient().get("/api/category-stats/nope/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_daily_sales_follow_orders_and_cancellations(tree, customer, django_capture_on_commit_callbacks, make_product):
+    electronics, phones, laptops = tree
+    phone = make_product("PHONE", phones, price="100.00")
+    combo = make_product("COMBO", phones, laptops, price="300.00")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        create_order(
+            [{"product_id": phone.id, "quantity": 2}, {"product_id": combo.id, "quantity": 1}],
+            customer=customer, shipping_address="Utawala",
+        )
+        second = create_order([{"product_id": combo.id, "quantity": 1}], customer=customer, shipping_address="Utawala")
+
+    today = timezone.localdate()
+    assert DailyProductSales.objects.get(product=phone, date=today).revenue == Decimal("200.00")
+    assert DailyProductSales.objects.get(product=combo, date=today).units == 2
+    # The combo sits in two subcategories but counts once for their parent
+    assert category_sales() == {
+        "electronics": (2, 4, Decimal("800.00")),
+        "phones": (2, 4, Decimal("800.00")),
+        "laptops": (2, 2, Decimal("600.00")),
+    }
+
+    with django_capture_on_commit_callbacks(execute=True):
+        transition_orders([second.id], "cancelled")
+
+    assert category_sales()["electronics"] == (1, 3, Decimal("500.00"))
+    assert category_sales()["laptops"] == (1, 1, Decimal("300.00"))
+
+
+@pytest.mark.django_db
+def test_order_deltas_cost_constant_queries(tree, customer, make_product):
+    """One line or ten, applying an order to the rollups costs the same"""
+    _, phones, laptops = tree
+    products = [make_product(f"P-{i}", phones if i % 2 else laptops, price="10.00") for i in range(10)]
+    first = create_order([{"product_id": p.id, "quantity": 1} for p in products], customer=customer, shipping_address="A")
+    apply_order_sales([first.id])
+
+    # Both orders only update rows the first one created
+    small = create_order([{"product_id": products[0].id, "quantity": 1}], customer=customer, shipping_address="A")
+    large = create_order([{"product_id": p.id, "quantity": 2} for p in products], customer=customer, shipping_address="A")
+    counts = []
+    for order in (small, large):
+        with CaptureQueriesContext(connection) as ctx:
+            apply_order_sales([order.id])
+        counts.append(len(ctx.captured_queries))
+
+    assert counts[0] == counts[1]
+    assert category_sales()["electronics"] == (3, 31, Decimal("310.00"))
+
+
+@pytest.mark.django_db
+def test_order_deltas_apply_once(tree, customer, make_product):
+    _, phones, _ = tree
+    phone = make_product("PHONE", phones, price="100.00")
+    order = create_order([{"product_id": phone.id, "quantity": 2}], customer=customer, shipping_address="A")
+
+    assert apply_order_sales([order.id]) == {"added": 1, "removed": 0}
+    assert apply_order_sales([order.id]) == {"added": 0, "removed": 0}
+    assert category_sales()["phones"] == (1, 2, Decimal("200.00"))
+
+    Order.objects.filter(id=order.id).update(status="cancelled")
+    assert apply_order_sales([order.id]) == {"added": 0, "removed": 1}
+    assert apply_order_sales([order.id]) == {"added": 0, "removed": 0}
+    assert category_sales() == {}
+    assert not CountedOrder.objects.exists()
+
+
+@pytest.mark.django_db
+def test_reconcile_applies_orders_whose_task_was_lost(tree, customer, settings, make_product):
+    """Commit hooks that never ran (broker down, crash) are caught up by the sweep"""
+    settings.SALES_RECONCILE_GRACE = 0
+    _, phones, _ = tree
+    phone = make_product("PHONE", phones, price="100.00")
+    lost = [
+        create_order([{"product_id": phone.id, "quantity": 1}], customer=customer, shipping_address="A")
+        for _ in range(3)
+    ]
+    assert not CountedOrder.objects.exists()
+
+    call_command("reconcile_sales", "--batch-size", "2")
+    assert category_sales()["phones"] == (3, 3, Decimal("300.00"))
+
+    Order.objects.filter(id=lost[0].id).update(status="cancelled")
+    assert reconcile_sales() == {"added": 0, "removed": 1}
+    assert reconcile_sales() == {"added": 0, "removed": 0}
+    assert category_sales()["phones"] == (2, 2, Decimal("200.00"))
+
+
+@pytest.mark.django_db
+def test_sales_task_retries_transient_database_errors(tree, customer, monkeypatch, make_product):
+    _, phones, _ = tree
+    phone = make_product("PHONE", phones, price="100.00")
+    order = create_order([{"product_id": phone.id, "quantity": 1}], customer=customer, shipping_address="A")
+
+    def locked(order_ids):
+        raise OperationalError("database is locked")
+
+    monkeypatch.setattr(aggregate_tasks, "apply_order_sales", locked)
+    # Eager mode surfaces the scheduled retry instead of the error
+    with pytest.raises(Retry):
+        aggregate_tasks.apply_order_sales_task.delay([str(order.id)])
+
+
+@pytest.mark.django_db
+def test_deleting_orders_and_items_refreshes_sales(tree, customer, django_capture_on_commit_callbacks, make_product):
+    _, phones, _ = tree
+    phone = make_product("PHONE", phones, price="100.00")
+    case = make_product("CASE", phones, price="20.00")
+    with django_capture_on_commit_callbacks(execute=True):
+        kept = create_order(
+            [{"product_id": phone.id, "quantity": 1}, {"product_id": case.id, "quantity": 1}],
+            customer=customer, shipping_address="A",
+        )
+        dropped = create_order([{"product_id": phone.id, "quantity": 3}], customer=customer, shipping_address="A")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        dropped.delete()
+    assert category_sales()["phones"] == (1, 2, Decimal("120.00"))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        kept.items.get(product=case).delete()
+    assert category_sales()["phones"] == (1, 1, Decimal("100.00"))
+    assert not DailyProductSales.objects.filter(product=case).exists()
+
+
+@pytest.mark.django_db
+def test_category_changes_rebuild_sales_after_commit(tree, customer, django_capture_on_commit_callbacks, make_product):
+    """The full category rebuild runs in a task, not inside the save"""
+    electronics, phones, laptops = tree
+    phone = make_product("PHONE", phones, price="100.00")
+    with django_capture_on_commit_callbacks(execute=True):
+        create_order([{"product_id": phone.id, "quantity": 1}], customer=customer, shipping_address="A")
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        phones.parent = laptops
+        phones.save()
+    assert "laptops" not in category_sales()
+
+    for callback in callbacks:
+        callback()
+    assert category_sales()["laptops"] == (1, 1, Decimal("100.00"))
+
+
+@pytest.mark.django_db
+def test_relinking_a_product_moves_its_category_sales(tree, customer, django_capture_on_commit_callbacks, make_product):
+    electronics, phones, laptops = tree
+    phone = make_product("PHONE", phones, price="100.00")
+    with django_capture_on_commit_callbacks(execute=True):
+        create_order([{"product_id": phone.id, "quantity": 1}], customer=customer, shipping_address="Utawala")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        phone.categories.set([laptops])
+
+    assert set(category_sales()) == {"electronics", "laptops"}
+
+
+@pytest.mark.django_db
+def test_sales_report_is_staff_only_and_windowed(tree, customer, staff, django_capture_on_commit_callbacks, make_product):
+    _, phones, _ = tree
+    phone = make_product("PHONE", phones, price="100.00")
+    with django_capture_on_commit_callbacks(execute=True):
+        order = create_order([{"product_id": phone.id, "quantity": 3}], customer=customer, shipping_address="Utawala")
+
+    client = APIClient()
+    client.force_authenticate(customer)
+    assert client.get(f"/api/reports/sales/?product={phone.id}").status_code == 403
+
+    client.force_authenticate(staff)
+    data = client.get("/api/reports/sales/?category=electronics").json()
+    assert data["days"] == [{"date": str(timezone.localdate(order.created_at)), "order_count": 1,
+                             "units": 3, "revenue": "300.00"}]
+    assert data["totals"] == {"order_count": 1, "units": 3, "revenue": "300.00"}
+
+    tomorrow = timezone.localdate() + datetime.timedelta(days=1)
+    data = client.get(f"/api/reports/sales/?product={phone.id}&start={tomorrow}").json()
+    assert data["days"] == [] and data["totals"]["units"] == 0
+
+    assert client.get("/api/reports/sales/").status_code == 400
+    assert client.get(f"/api/reports/sales/?product={phone.id}&category=phones").status_code == 400
+
+
+@pytest.mark.django_db
+def test_rebuild_matches_incremental_rollups(tree, customer, django_capture_on_commit_callbacks, make_product):
+    electronics, phones, laptops = tree
+    phone = make_product("PHONE", phones, price="100.00")
+    combo = make_product("COMBO", phones, laptops, price="300.00")
+    with django_capture_on_commit_callbacks(execute=True):
+        create_order(
+            [{"product_id": phone.id, "quantity": 2}, {"product_id": combo.id, "quantity": 1}],
+            customer=customer, shipping_address="Utawala",
+        )
+    incremental = (stats(), category_sales(), list(DailyProductSales.objects.values_list("product", "units")))
+
+    CategoryStats.objects.all().delete()
+    DailyProductSales.objects.all().delete()
+    DailyCategorySales.objects.all().delete()
+    call_command("rebuild_aggregates")
+
+    assert (stats(), category_sales(), list(DailyProductSales.objects.values_list("product", "units"))) == incremental
@@ -0,0 +1,106 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from customers.models import Customer
+from orders.services import create_order
+from products.models import Category, Product
+
+
+@pytest.fixture
+def catalog():
+    root = Category.objects.create(name="Kitchen", slug="kitchen")
+    child = Category.objects.create(name="Mugs", slug="mugs", parent=root)
+    products = []
+    for i in range(12):
+        product = Product.objects.create(
+            name=f"Mug {i}", slug=f"mug-{i}", description="Mug", price=Decimal("250.00"),
+            sku=f"MUG-{i}", stock_quantity=10,
+        )
+        product.categories.add(child, root)
+        products.append(product)
+    return products
+
+
+@pytest.mark.django_db
+def test_async_product_detail_matches_primary_category(catalog):
+    response = APIClient().get("/api/async/products/mug-3/")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["sku"] == "MUG-3"
+    assert data["price"] == "250.00"
+    assert {c["slug"] for c in data["categories"]} == {"kitchen", "mugs"}
+    assert data["primary_category"]["slug"] == catalog[3].primary_category.slug
+
+
+@pytest.mark.django_db
+def test_async_product_detail_404():
+    assert APIClient().get("/api/async/products/nope/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_async_product_list_pages_with_two_queries(catalog):
+    """One query for the page, one prefetch for categories; cursors walk every product"""
+    client = APIClient()
+    with CaptureQueriesContext(connection) as ctx:
+        first = client.get("/api/async/products/?page_size=5").json()
+
+    assert len(ctx.captured_queries) == 2
+    seen = [p["slug"] for p in first["results"]]
+    url = first["next"]
+    while url:
+        page = client.get(url).json()
+        seen.extend(p["slug"] for p in page["results"])
+        url = page["next"]
+    assert sorted(seen) == sorted(p.slug for p in catalog)
+
+
+@pytest.mark.django_db
+def test_async_product_list_count_on_request(catalog):
+    data = APIClient().get("/api/async/products/?count=true&in_stock=true").json()
+    assert data["count"] == 12
+
+
+@pytest.mark.django_db
+def test_async_category_tree(catalog):
+    data = APIClient().get("/api/async/categories/tree/").json()
+
+    assert [node["slug"] for node in data] == ["kitchen"]
+    assert data[0]["children"][0]["full_path"] == "Kitchen > Mugs"
+
+
+@pytest.mark.django_db
+def test_async_my_orders_requires_auth():
+    assert APIClient().get("/api/async/orders/").status_code == 401
+
+
+@pytest.mark.django_db
+def test_async_my_orders_lists_only_own_orders(catalog, customer):
+    other = Customer.objects.create_user(email="other@example.com", username="other", password="psw1234")
+    mine = create_order([{"product_id": catalog[0].id, "quantity": 2}], customer=customer, shipping_address="Utawala")
+    create_order([{"product_id": catalog[1].id, "quantity": 1}], customer=other, shipping_address="Utawala")
+
+    client = APIClient()
+    client.force_authenticate(customer)
+    data = client.get("/api/async/orders/").json()
+
+    assert [o["id"] for o in data["results"]] == [str(mine.id)]
+    assert data["results"][0]["items"][0]["product_sku"] == "MUG-0"
+
+
+@pytest.mark.django_db
+def test_async_product_list_search(catalog):
+    """Both the SKU probe and the full-text path run on the async ORM"""
+    client = APIClient()
+
+    by_sku = client.get("/api/async/products/?search=MUG-3").json()
+    assert [p["sku"] for p in by_sku["results"]] == ["MUG-3"]
+
+    by_name = client.get("/api/async/products/?search=mug&page_size=20").json()
+    assert len(by_name["results"]) == 12
+
+    assert client.get("/api/async/products/?search=kettle").json()["results"] == []
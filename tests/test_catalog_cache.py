@@ -0,0 +1,88 @@
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIClient
+
+from customers.models import Customer
+from orders.services import create_order
+from products.cache import cache_stats
+from products.models import Category, Product
+
+
+@pytest.fixture
+def product(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        category = Category.objects.create(name="Kitchen", slug="kitchen")
+        product = Product.objects.create(
+            name="Kettle", slug="kettle", description="Kettle", price=Decimal("1500.00"), sku="KTL-1",
+        )
+        product.categories.set([category])
+    return product
+
+
+@pytest.mark.django_db
+def test_second_read_is_served_from_cache(product):
+    client = APIClient()
+    first = client.get("/api/products/", {"search": "kettle"})
+    second = client.get("/api/products/", {"search": "kettle"})
+
+    assert first["X-Cache"] == "MISS"
+    assert second["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+    assert cache_stats()["hit"] == 1
+
+
+@pytest.mark.django_db
+def test_save_invalidates_cached_reads(product, django_capture_on_commit_callbacks):
+    client = APIClient()
+    client.get(f"/api/products/{product.slug}/")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        product.price = Decimal("1800.00")
+        product.save()
+
+    response = client.get(f"/api/products/{product.slug}/")
+    assert response["X-Cache"] == "MISS"
+    assert response.json()["price"] == "1800.00"
+
+
+@pytest.mark.django_db
+def test_matching_etag_returns_304(product):
+    client = APIClient()
+    first = client.get("/api/categories/tree/")
+
+    response = client.get("/api/categories/tree/", HTTP_IF_NONE_MATCH=first["ETag"])
+    assert response.status_code == 304
+    assert response["ETag"] == first["ETag"]
+
+
+@pytest.mark.django_db
+def test_checkout_keeps_category_reads_cached(product, django_capture_on_commit_callbacks):
+    customer = Customer.objects.create_user(email="cache@example.com", username="cache", password="psw1234")
+    Product.objects.filter(pk=product.pk).update(stock_quantity=5)
+    client = APIClient()
+    for url in ("/api/categories/tree/", "/api/categories/kitchen/", f"/api/products/{product.slug}/"):
+        client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        create_order([{"product_id": product.id, "quantity": 1}], customer=customer, shipping_address="Utawala")
+
+    assert client.get("/api/categories/tree/")["X-Cache"] == "HIT"
+    assert client.get("/api/categories/kitchen/")["X-Cache"] == "HIT"
+    response = client.get(f"/api/products/{product.slug}/")
+    assert response["X-Cache"] == "MISS"
+    assert response.json()["stock_quantity"] == 4
+
+
+@pytest.mark.django_db
+def test_product_count_changes_invalidate_category_reads(product, django_capture_on_commit_callbacks):
+    client = APIClient()
+    client.get("/api/categories/kitchen/")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        product.is_active = False
+        product.save()
+
+    response = client.get("/api/categories/kitchen/")
+    assert response["X-Cache"] == "MISS"
+    assert response.json()["product_count"] == 0
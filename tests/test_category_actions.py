@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from products.models import Category
+
+SUMMARY = {"id", "sku", "name", "price", "slug"}
+
+
+@pytest.mark.django_db
+def test_average_price_counts_each_subtree_product_once(tree, make_product):
+    electronics, phones, laptops = tree
+    make_product("PHONE", phones, price="100.00")
+    make_product("COMBO", phones, laptops, price="300.00")
+    make_product("CASE", electronics, price="20.00")
+    make_product("OLD", phones, is_active=False, price="999.00")
+
+    with CaptureQueriesContext(connection) as ctx:
+        data = APIClient().get("/api/categories/electronics/average_price/").json()
+
+    assert data["product_count"] == 3
+    assert Decimal(data["average_price"]) == Decimal("140.00")
+    # One query for the category, one for the average and count together
+    assert len(ctx.captured_queries) == 2
+    assert "DISTINCT" not in ctx.captured_queries[1]["sql"].upper()
+
+    data = APIClient().get("/api/categories/electronics/average_price/?include_subcategories=false").json()
+    assert data["product_count"] == 1
+    assert Decimal(data["average_price"]) == Decimal("20.00")
+
+
+@pytest.mark.django_db
+def test_category_products_are_paginated_summaries(tree, make_product):
+    electronics, phones, laptops = tree
+    for i in range(25):
+        make_product(f"PHONE-{i}", phones, laptops, price="100.00")
+    make_product("SPADE", Category.objects.create(name="Garden", slug="garden"), price="50.00")
+
+    client = APIClient()
+    with CaptureQueriesContext(connection) as ctx:
+        data = client.get("/api/categories/electronics/products/").json()
+
+    assert data["count"] == 25
+    assert len(data["results"]) == 20
+    assert all(set(product) == SUMMARY for product in data["results"])
+    assert not any("DISTINCT" in q["sql"].upper() for q in ctx.captured_queries)
+    # Category, count, page
+    assert len(ctx.captured_queries) == 3
+
+    second = client.get(data["next"]).json()
+    seen = {p["sku"] for p in data["results"]} | {p["sku"] for p in second["results"]}
+    assert len(seen) == 25
+
+
+@pytest.mark.django_db
+def test_category_products_honor_fields_and_cursor(tree, make_product):
+    _, phones, _ = tree
+    for i in range(5):
+        make_product(f"PHONE-{i}", phones, price="100.00")
+
+    client = APIClient()
+    full = client.get("/api/categories/phones/products/", {"fields": "id,categories"}).json()
+    assert set(full["results"][0]) == {"id", "categories"}
+
+    page = client.get("/api/categories/phones/products/", {"paginate": "cursor", "page_size": 2}).json()
+    seen = [p["sku"] for p in page["results"]]
+    while page["next"]:
+        page = client.get(page["next"]).json()
+        seen.extend(p["sku"] for p in page["results"])
+    assert sorted(seen) == [f"PHONE-{i}" for i in range(5)]
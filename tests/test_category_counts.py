@@ -0,0 +1,79 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from products.counts import rebuild_category_counts
+from products.models import Category, Product
+from products.serializers import CategorySerializer
+
+
+def counts():
+    return dict(Category.objects.values_list("slug", "product_count"))
+
+
+@pytest.mark.django_db
+def test_counts_follow_category_links(tree, make_product):
+    electronics, phones, laptops = tree
+    phone = make_product("PHONE", phones)
+    make_product("COMBO", phones, laptops)
+
+    assert counts() == {"electronics": 2, "phones": 2, "laptops": 1}
+
+    phone.categories.remove(phones)
+    assert counts() == {"electronics": 1, "phones": 1, "laptops": 1}
+
+    laptops.products.clear()
+    assert counts() == {"electronics": 1, "phones": 1, "laptops": 0}
+
+
+@pytest.mark.django_db
+def test_counts_follow_is_active_and_delete(tree, make_product):
+    electronics, phones, laptops = tree
+    phone = make_product("PHONE", phones)
+
+    phone = Product.objects.get(id=phone.id)
+    phone.is_active = False
+    phone.save()
+    assert counts()["electronics"] == 0
+
+    phone.is_active = True
+    phone.save()
+    assert counts()["electronics"] == 1
+
+    phone.delete()
+    assert counts()["electronics"] == 0
+
+
+@pytest.mark.django_db
+def test_counts_follow_category_moves(tree, make_product):
+    electronics, phones, laptops = tree
+    make_product("LAPTOP", laptops)
+    office = Category.objects.create(name="Office", slug="office")
+
+    laptops.parent = office
+    laptops.save()
+    assert counts() == {"electronics": 0, "phones": 0, "laptops": 1, "office": 1}
+
+
+@pytest.mark.django_db
+def test_rebuild_matches_incremental_counts(tree, make_product):
+    electronics, phones, laptops = tree
+    make_product("PHONE", phones)
+    make_product("COMBO", phones, laptops)
+    expected = counts()
+
+    Category.objects.update(product_count=0)
+    rebuild_category_counts()
+    assert counts() == expected
+
+
+@pytest.mark.django_db
+def test_serializer_reads_stored_count(tree, make_product):
+    electronics, phones, laptops = tree
+    make_product("PHONE", phones)
+    phones = Category.objects.get(id=phones.id)
+
+    with CaptureQueriesContext(connection) as ctx:
+        data = CategorySerializer(phones).data["product_count"]
+    assert data == 1
+    assert not any("products" in q["sql"] for q in ctx.captured_queries)
@@ -0,0 +1,43 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from products.models import Category
+
+
+@pytest.fixture
+def tree():
+    electronics = Category.objects.create(name="Electronics", slug="electronics")
+    phones = Category.objects.create(name="Phones", slug="phones", parent=electronics)
+    Category.objects.create(name="Android", slug="android", parent=phones)
+    Category.objects.create(name="Retired", slug="retired", parent=electronics, is_active=False)
+    Category.objects.create(name="Garden", slug="garden")
+    return electronics, phones
+
+
+@pytest.mark.django_db
+def test_whole_tree_in_one_query(tree):
+    with CaptureQueriesContext(connection) as ctx:
+        response = APIClient().get("/api/categories/tree/")
+
+    assert response.status_code == 200
+    assert len(ctx.captured_queries) == 1
+    assert [root["slug"] for root in response.data] == ["electronics", "garden"]
+
+    electronics = response.data[0]
+    assert [child["slug"] for child in electronics["children"]] == ["phones"]
+    android = electronics["children"][0]["children"][0]
+    assert android["full_path"] == "Electronics > Phones > Android"
+    assert android["children"] == []
+
+
+@pytest.mark.django_db
+def test_subtree_keeps_full_path(tree):
+    response = APIClient().get("/api/categories/tree/", {"root": "phones"})
+
+    assert response.status_code == 200
+    assert len(response.data) == 1
+    phones = response.data[0]
+    assert phones["full_path"] == "Electronics > Phones"
+    assert [child["slug"] for child in phones["children"]] == ["android"]
@@ -0,0 +1,47 @@
+import environ
+import pytest
+
+from backend.database import database_from_env
+
+POSTGRES_URL = "postgres://orders:secret@db:5432/orders"
+
+
+@pytest.fixture
+def env(monkeypatch):
+    for name in ("DATABASE_URL", "DB_POOL", "DB_CONN_MAX_AGE", "DB_POOL_MAX_SIZE"):
+        monkeypatch.delenv(name, raising=False)
+    return environ.Env()
+
+
+def test_sqlite_default_is_untouched(env):
+    """Development keeps per-request SQLite connections"""
+    config = database_from_env(env, default="sqlite:////tmp/dev.sqlite3")
+
+    assert config["ENGINE"] == "django.db.backends.sqlite3"
+    assert "CONN_MAX_AGE" not in config
+
+
+def test_postgres_gets_persistent_health_checked_connections(env, monkeypatch):
+    """DATABASE_URL switches to PostgreSQL with reused connections"""
+    monkeypatch.setenv("DATABASE_URL", POSTGRES_URL)
+    monkeypatch.setenv("DB_CONN_MAX_AGE", "300")
+
+    config = database_from_env(env, default="sqlite:////tmp/dev.sqlite3")
+
+    assert config["ENGINE"] == "django.db.backends.postgresql"
+    assert config["HOST"] == "db"
+    assert config["CONN_MAX_AGE"] == 300
+    assert config["CONN_HEALTH_CHECKS"] is True
+    assert "pool" not in config["OPTIONS"]
+
+
+def test_pool_mode_disables_persistent_connections(env, monkeypatch):
+    """Django refuses a pool combined with CONN_MAX_AGE"""
+    monkeypatch.setenv("DATABASE_URL", POSTGRES_URL)
+    monkeypatch.setenv("DB_POOL", "true")
+    monkeypatch.setenv("DB_POOL_MAX_SIZE", "8")
+
+    config = database_from_env(env, default="sqlite:////tmp/dev.sqlite3")
+
+    assert config["CONN_MAX_AGE"] == 0
+    assert config["OPTIONS"]["pool"]["max_size"] == 8
@@ -0,0 +1,115 @@
+from decimal import Decimal
+
+import pytest
+from django.core.mail import EmailMessage
+from django.core.mail.backends import locmem
+
+from customers.models import Customer
+from notifications.mailer import EmailQueue, get_cached_template
+from notifications.models import NotificationOutbox
+from notifications.outbox import dispatch_pending, send_admin_digest
+from orders.models import Order
+from orders.services import create_order
+from products.models import Product
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """Every backend connection opened during the test"""
+    connections = []
+    original = locmem.EmailBackend.open
+
+    def open(self):
+        connections.append(self)
+        return original(self)
+
+    monkeypatch.setattr(locmem.EmailBackend, "open", open)
+    return connections
+
+
+@pytest.fixture
+def orders(fake_sms):
+    customer = Customer.objects.create_user(
+        email="mailer@example.com", username="mailer", password="psw1234", first_name="Mailer", phone="0700000000",
+    )
+    product = Product.objects.create(
+        name="Toaster", slug="toaster", description="Toaster", price=Decimal("3000.00"), sku="TST-1", stock_quantity=50,
+    )
+    return [
+        create_order([{"product_id": product.id, "quantity": 1}], customer=customer, shipping_address="Utawala")
+        for _ in range(5)
+    ]
+
+
+@pytest.mark.django_db
+def test_batch_of_admin_emails_shares_one_connection(orders, opened, mailoutbox):
+    result = dispatch_pending()
+
+    assert result["sent"] == 10
+    assert len(mailoutbox) == 5
+    assert len(opened) == 1
+    assert Order.objects.filter(email_sent_to_admin=True).count() == 5
+
+
+@pytest.mark.django_db
+def test_digest_mode_sends_one_email_for_all_new_orders(orders, opened, mailoutbox, settings):
+    settings.ADMIN_EMAIL_DIGEST = True
+
+    dispatched = dispatch_pending()
+    assert dispatched["claimed"] == 5  # SMS only; admin emails wait for the digest
+    assert mailoutbox == []
+
+    result = send_admin_digest()
+
+    assert result == {"claimed": 5, "sent": 5, "skipped": 0, "failed": 0}
+    assert len(mailoutbox) == 1
+    assert len(opened) == 1
+    assert mailoutbox[0].subject == "5 New Orders Received"
+    for order in orders:
+        assert order.order_number in mailoutbox[0].body
+    assert Order.objects.filter(email_sent_to_admin=True).count() == 5
+    assert send_admin_digest()["claimed"] == 0
+
+
+@pytest.mark.django_db
+def test_failed_digest_is_retried(orders, mailoutbox, settings, monkeypatch):
+    settings.ADMIN_EMAIL_DIGEST = True
+    settings.NOTIFICATION_RETRY_BASE_DELAY = 0
+
+    def broken(self, messages):
+        raise ConnectionError("smtp down")
+
+    monkeypatch.setattr(locmem.EmailBackend, "send_messages", broken)
+    assert send_admin_digest()["sent"] == 0
+    pending = NotificationOutbox.objects.filter(
+        channel=NotificationOutbox.CHANNEL_ADMIN_EMAIL, status=NotificationOutbox.STATUS_PENDING,
+    )
+    assert pending.count() == 5
+
+    monkeypatch.undo()
+    assert send_admin_digest()["sent"] == 5
+    assert len(mailoutbox) == 1
+
+
+def test_failing_message_does_not_stop_the_batch(opened, mailoutbox, monkeypatch):
+    original = locmem.EmailBackend.send_messages
+
+    def send_messages(self, messages):
+        if messages[0].to == ["bad@example.com"]:
+            raise ValueError("rejected")
+        return original(self, messages)
+
+    monkeypatch.setattr(locmem.EmailBackend, "send_messages", send_messages)
+    queue = EmailQueue()
+    for address in ["a@example.com", "bad@example.com", "b@example.com"]:
+        queue.add(address, EmailMessage("Hi", "Body", "shop@example.com", [address]))
+
+    results = queue.flush()
+
+    assert results == {"a@example.com": True, "bad@example.com": False, "b@example.com": True}
+    assert len(mailoutbox) == 2
+    assert len(opened) == 1
+
+
+def test_templates_are_compiled_once():
+    assert get_cached_template("emails/order_digest.html") is get_cached_template("emails/order_digest.html")
@@ -0,0 +1,144 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from products.importing import ProductImporter, run_import_job
+from products.models import Product, ProductImportJob
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+@pytest.fixture
+def client(staff):
+    client = APIClient()
+    client.force_authenticate(staff)
+    return client
+
+
+def ndjson_file(count, name="catalog.ndjson"):
+    lines = [
+        json.dumps({
+            "name": f"Towel {i}", "description": "Cotton towel", "price": "450.00",
+            "sku": f"TWL-{i}", "category_names": ["Bath"],
+        })
+        for i in range(count)
+    ]
+    lines.append(json.dumps({"name": "Broken"}))
+    return SimpleUploadedFile(name, "\n".join(lines).encode(), content_type="application/x-ndjson")
+
+
+@pytest.mark.django_db
+def test_upload_creates_job_and_polling_reports_progress(client, django_capture_on_commit_callbacks):
+    with mock.patch("products.views.process_product_import_task") as task, \
+            django_capture_on_commit_callbacks(execute=True):
+        response = client.post("/api/import-jobs/", {"file": ndjson_file(5), "chunk_size": 2}, format="multipart")
+
+    assert response.status_code == 201
+    assert response.data["format"] == "ndjson"
+    assert response.data["status"] == "pending"
+    task.delay.assert_called_once_with(response.data["id"])
+
+    run_import_job(response.data["id"])
+    job = client.get(f"/api/import-jobs/{response.data['id']}/").data
+    assert job["status"] == "completed"
+    assert (job["total_rows"], job["rows_processed"], job["progress"]) == (6, 6, 100.0)
+    assert (job["created_count"], job["error_count"]) == (5, 1)
+    assert job["errors"][0]["row"] == 5
+
+
+@pytest.mark.django_db
+def test_job_resumes_after_last_committed_chunk():
+    job = ProductImportJob.objects.create(file=ndjson_file(6), format="ndjson", chunk_size=2)
+    real_import_chunk = ProductImporter.import_chunk
+    calls = []
+
+    def crash_on_second_chunk(importer, chunk, start_row=0):
+        calls.append(start_row)
+        if len(calls) == 2:
+            raise RuntimeError("worker lost")
+        return real_import_chunk(importer, chunk, start_row)
+
+    with mock.patch.object(ProductImporter, "import_chunk", crash_on_second_chunk):
+        with pytest.raises(RuntimeError):
+            run_import_job(job.id)
+
+    job.refresh_from_db()
+    assert (job.status, job.rows_processed, job.created_count) == ("failed", 2, 2)
+
+    job = run_import_job(job.id)
+    assert (job.status, job.rows_processed, job.created_count, job.error_count) == ("completed", 7, 6, 1)
+    assert Product.objects.count() == 6
+
+
+@pytest.mark.django_db
+def test_running_job_is_only_reclaimed_once_stalled():
+    job = ProductImportJob.objects.create(file=ndjson_file(2), format="ndjson", status="running")
+
+    assert run_import_job(job.id).status == "running"
+    assert not Product.objects.exists()
+
+    ProductImportJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+    assert run_import_job(job.id).status == "completed"
+    assert Product.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_reclaimed_job_rolls_back_the_old_workers_chunk():
+    job = ProductImportJob.objects.create(file=ndjson_file(4), format="ndjson", chunk_size=2)
+    real_import_chunk = ProductImporter.import_chunk
+    calls = []
+
+    def reclaimed_during_second_chunk(importer, chunk, start_row=0):
+        calls.append(start_row)
+        results = real_import_chunk(importer, chunk, start_row)
+        if len(calls) == 2:
+            # A second worker picked the stalled job up and moved it past this chunk
+            ProductImportJob.objects.filter(pk=job.pk).update(rows_processed=F("rows_processed") + 2)
+        return results
+
+    with mock.patch.object(ProductImporter, "import_chunk", reclaimed_during_second_chunk):
+        job = run_import_job(job.id)
+
+    assert (job.status, job.created_count) == ("running", 2)
+    assert Product.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_resume_rejects_a_job_that_is_still_running(client, django_capture_on_commit_callbacks):
+    job = ProductImportJob.objects.create(file=ndjson_file(2), format="ndjson", status="running")
+
+    with mock.patch("products.views.process_product_import_task") as task, \
+            django_capture_on_commit_callbacks(execute=True):
+        response = client.post(f"/api/import-jobs/{job.id}/resume/")
+        assert response.status_code == 409
+
+        ProductImportJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        response = client.post(f"/api/import-jobs/{job.id}/resume/")
+
+    assert response.status_code == 202
+    task.delay.assert_called_once_with(str(job.id))
+
+
+@pytest.mark.django_db
+def test_import_jobs_are_staff_only(customer):
+    job = ProductImportJob.objects.create(file=ndjson_file(2), format="ndjson", status="failed")
+    client = APIClient()
+    client.force_authenticate(customer)
+
+    with mock.patch("products.views.process_product_import_task") as task:
+        assert client.get("/api/import-jobs/").status_code == 403
+        assert client.get(f"/api/import-jobs/{job.id}/").status_code == 403
+        assert client.post("/api/import-jobs/", {"file": ndjson_file(1)}, format="multipart").status_code == 403
+        assert client.post(f"/api/import-jobs/{job.id}/resume/").status_code == 403
+
+    task.delay.assert_not_called()
+    assert ProductImportJob.objects.count() == 1
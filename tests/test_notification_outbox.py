@@ -0,0 +1,245 @@
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from notifications.models import NotificationOutbox
+from notifications.metrics import notification_stats
+from notifications.outbox import dispatch_pending, retry_delay
+from notifications import task as notification_tasks
+from notifications.task import send_order_notifications_task, send_order_sms_task
+from orders.models import Order
+from orders.serializers import OrderSerializer
+from products.models import Product
+
+
+@pytest.fixture
+def product():
+    return Product.objects.create(
+        name="Kettle", slug="kettle", description="Electric kettle",
+        price=Decimal("1500.00"), sku="KTL-1", stock_quantity=10,
+    )
+
+
+def create_order(customer, product, quantity=2):
+    serializer = OrderSerializer(data={
+        "shipping_address": "Utawala",
+        "items": [{"product_id": product.id, "quantity": quantity}],
+    })
+    serializer.is_valid(raise_exception=True)
+    return serializer.save(customer=customer)
+
+
+@pytest.mark.django_db
+def test_order_creation_writes_outbox_without_sending(customer, product, fake_sms, mailoutbox):
+    """Creating an order queues one row per channel and sends nothing inline"""
+    order = create_order(customer, product)
+
+    assert fake_sms.requests == []
+    assert mailoutbox == []
+    channels = set(order.notifications.values_list("channel", flat=True))
+    assert channels == {NotificationOutbox.CHANNEL_SMS, NotificationOutbox.CHANNEL_ADMIN_EMAIL}
+
+
+@pytest.mark.django_db
+def test_commit_kick_queues_only_the_new_orders_rows(
+    customer, product, fake_sms, monkeypatch, django_capture_on_commit_callbacks
+):
+    """The request hands its own order to a worker instead of draining the outbox inline"""
+    backlog = create_order(customer, product)
+    queued = []
+    monkeypatch.setattr(
+        notification_tasks.send_order_notifications_task, "delay", lambda *args: queued.append(args)
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        order = create_order(customer, product)
+
+    assert queued == [([str(order.id)], None)]
+    assert fake_sms.requests == []
+    assert backlog.notifications.filter(status=NotificationOutbox.STATUS_PENDING).count() == 2
+
+
+@pytest.mark.django_db
+def test_eager_kick_delivers_only_the_new_order(customer, product, fake_sms, mailoutbox, django_capture_on_commit_callbacks):
+    backlog = create_order(customer, product)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        order = create_order(customer, product)
+
+    assert order.notifications.filter(status=NotificationOutbox.STATUS_SENT).count() == 2
+    assert backlog.notifications.filter(status=NotificationOutbox.STATUS_PENDING).count() == 2
+
+
+@pytest.mark.django_db
+def test_stale_processing_rows_are_reclaimed(customer, product, settings, fake_sms, mailoutbox):
+    """Rows claimed by a dispatcher that died go out once the claim times out"""
+    settings.NOTIFICATION_CLAIM_TIMEOUT = 300
+    order = create_order(customer, product)
+    rows = order.notifications.all()
+    rows.update(status=NotificationOutbox.STATUS_PROCESSING, claimed_at=timezone.now(), attempts=1)
+
+    assert dispatch_pending()["claimed"] == 0  # still owned by a live dispatcher
+
+    rows.update(claimed_at=timezone.now() - timedelta(seconds=301))
+    assert dispatch_pending() == {"claimed": 2, "sent": 2, "skipped": 0, "failed": 0}
+    assert len(fake_sms.messages) == 1
+    assert set(rows.values_list("attempts", flat=True)) == {2}
+
+
+@pytest.mark.django_db
+def test_dispatch_delivers_once_and_sets_order_flags(customer, product, fake_sms, mailoutbox):
+    """A second dispatch finds nothing left to deliver"""
+    order = create_order(customer, product)
+
+    first = dispatch_pending()
+    second = dispatch_pending()
+
+    assert first == {"claimed": 2, "sent": 2, "skipped": 0, "failed": 0}
+    assert second["claimed"] == 0
+    assert fake_sms.messages[0][1] == "+254700000000"
+    assert len(fake_sms.messages) == 1
+    assert len(mailoutbox) == 1
+    assert mailoutbox[0].subject == f"New Order Received - #{order.order_number}"
+
+    order = Order.objects.get(id=order.id)
+    assert order.sms_sent is True
+    assert order.email_sent_to_admin is True
+
+
+@pytest.mark.django_db
+def test_dispatch_gives_up_after_max_attempts(customer, product, settings, fake_sms):
+    """Failing rows are retried until the attempt budget is spent"""
+    settings.NOTIFICATION_OUTBOX_MAX_ATTEMPTS = 2
+    settings.NOTIFICATION_RETRY_BASE_DELAY = 0
+    fake_sms.fail_numbers.add("+254700000000")
+    order = create_order(customer, product)
+
+    dispatch_pending()
+    dispatch_pending()
+
+    sms = order.notifications.get(channel=NotificationOutbox.CHANNEL_SMS)
+    assert sms.status == NotificationOutbox.STATUS_FAILED
+    assert sms.attempts == 2
+    assert Order.objects.get(id=order.id).sms_sent is False
+
+
+@pytest.mark.django_db
+def test_status_event_sends_status_sms(customer, product, fake_sms):
+    """Status events use the status message and leave the creation flags alone"""
+    order = create_order(customer, product)
+    NotificationOutbox.objects.all().delete()
+    NotificationOutbox.objects.create(
+        order=order, event=NotificationOutbox.STATUS_EVENTS["shipped"], channel=NotificationOutbox.CHANNEL_SMS,
+    )
+
+    result = dispatch_pending()
+
+    assert result["sent"] == 1
+    assert "is now shipped" in fake_sms.messages[0][0]
+    order.refresh_from_db()
+    assert order.sms_sent is False
+
+
+def _dispatch_queries(order_ids):
+    with CaptureQueriesContext(connection) as ctx:
+        result = send_order_notifications_task(order_ids)
+    return result, len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_order_batch_costs_constant_queries(customer, product, fake_sms, mailoutbox):
+    """One order or ten, the batch loads its orders and customers once"""
+    product.stock_quantity = 100
+    product.save()
+    single = create_order(customer, product, quantity=1)
+    batch = [create_order(customer, product, quantity=1) for _ in range(10)]
+
+    one, one_queries = _dispatch_queries([single.id])
+    many, many_queries = _dispatch_queries([order.id for order in batch])
+
+    assert one["sent"] == 2 and many["sent"] == 20
+    assert one_queries == many_queries
+    assert len(fake_sms.messages) == 11
+    assert len(mailoutbox) == 11
+
+
+@pytest.mark.django_db
+def test_order_tasks_do_not_send_twice(customer, product, fake_sms, mailoutbox):
+    order = create_order(customer, product)
+
+    assert send_order_sms_task(order.id) is True
+    assert send_order_sms_task(order.id) is False
+    assert send_order_notifications_task([order.id])["sent"] == 1
+
+    assert len(fake_sms.messages) == 1
+    assert len(mailoutbox) == 1
+
+
+@pytest.mark.django_db
+def test_already_delivered_order_is_skipped(customer, product, fake_sms, mailoutbox):
+    """The order flag is the idempotency key; a set flag means someone else sent it"""
+    order = create_order(customer, product)
+    Order.objects.filter(id=order.id).update(sms_sent=True)
+
+    result = dispatch_pending()
+
+    assert result["skipped"] == 1 and result["sent"] == 1
+    assert fake_sms.requests == []
+    sms = order.notifications.get(channel=NotificationOutbox.CHANNEL_SMS)
+    assert sms.status == NotificationOutbox.STATUS_SKIPPED
+    stats = notification_stats()
+    assert stats["sms"]["dedup_skipped"] == 1
+    assert stats["admin_email"]["sent"] == 1
+
+
+@pytest.mark.django_db
+def test_failed_send_backs_off_and_releases_the_flag(customer, product, settings, fake_sms, mailoutbox):
+    settings.NOTIFICATION_RETRY_BASE_DELAY = 60
+    fake_sms.fail_numbers.add("+254700000000")
+    order = create_order(customer, product)
+
+    before = timezone.now()
+    dispatch_pending()
+
+    sms = order.notifications.get(channel=NotificationOutbox.CHANNEL_SMS)
+    assert sms.status == NotificationOutbox.STATUS_PENDING
+    assert before + timedelta(seconds=30) <= sms.next_attempt_at <= timezone.now() + timedelta(seconds=60)
+    assert Order.objects.get(id=order.id).sms_sent is False
+    assert dispatch_pending()["claimed"] == 0  # not due yet
+    assert notification_stats()["sms"]["retried"] == 1
+
+    NotificationOutbox.objects.filter(id=sms.id).update(next_attempt_at=timezone.now())
+    fake_sms.fail_numbers.clear()
+    assert dispatch_pending()["sent"] == 1
+    assert Order.objects.get(id=order.id).sms_sent is True
+
+
+def test_retry_delay_grows_exponentially_with_jitter(settings):
+    settings.NOTIFICATION_RETRY_BASE_DELAY = 10
+    settings.NOTIFICATION_RETRY_MAX_DELAY = 100
+
+    for attempts, ceiling in [(1, 10), (2, 20), (3, 40), (4, 80), (5, 100), (9, 100)]:
+        delays = {retry_delay(attempts) for _ in range(20)}
+        assert all(ceiling / 2 <= delay <= ceiling for delay in delays)
+        assert len(delays) > 1
+
+
+@pytest.mark.django_db
+def test_crash_after_flag_claim_still_delivers_once(customer, product, fake_sms, mailoutbox):
+    """A dispatcher that set the order flags and died does not swallow the notifications"""
+    order = create_order(customer, product)
+    Order.objects.filter(id=order.id).update(sms_sent=True, email_sent_to_admin=True)
+    order.notifications.update(
+        status=NotificationOutbox.STATUS_PROCESSING, claimed_at=timezone.now() - timedelta(hours=1), attempts=1,
+    )
+
+    assert dispatch_pending() == {"claimed": 2, "sent": 2, "skipped": 0, "failed": 0}
+    assert dispatch_pending()["claimed"] == 0
+    assert len(fake_sms.messages) == 1
+    assert len(mailoutbox) == 1
+    order.refresh_from_db()
+    assert order.sms_sent and order.email_sent_to_admin
@@ -0,0 +1,83 @@
+import time
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ValidationError
+
+from orders.models import OrderItem
+from orders.serializers import OrderSerializer
+from products.models import Product
+
+
+@pytest.fixture
+def make_products():
+    def make(count):
+        return Product.objects.bulk_create([
+            Product(
+                name=f"Item {i}", slug=f"item-{i}", description="Item",
+                price=Decimal("99.50"), sku=f"ITM-{i}", stock_quantity=100,
+            )
+            for i in range(count)
+        ])
+    return make
+
+
+def place_order(customer, products):
+    serializer = OrderSerializer(data={
+        "shipping_address": "Utawala",
+        "items": [{"product_id": p.id, "quantity": 2} for p in products],
+    })
+    serializer.is_valid(raise_exception=True)
+    return serializer.save(customer=customer)
+
+
+@pytest.mark.django_db
+def test_order_totals_are_computed_once(customer, make_products):
+    """Subtotal, VAT and total come from the priced lines"""
+    products = make_products(3)
+    order = place_order(customer, products)
+
+    assert order.subtotal == Decimal("597")
+    assert order.tax_amount == Decimal("96")
+    assert order.total_amount == Decimal("693")
+    assert OrderItem.objects.filter(order=order).count() == 3
+
+
+@pytest.mark.django_db
+def test_order_rejects_unknown_products(customer, make_products):
+    products = make_products(1)
+    serializer = OrderSerializer(data={
+        "shipping_address": "Utawala",
+        "items": [{"product_id": products[0].id, "quantity": 1}, {"product_id": 999999, "quantity": 1}],
+    })
+    serializer.is_valid(raise_exception=True)
+    with pytest.raises(ValidationError):
+        serializer.save(customer=customer)
+
+
+@pytest.mark.django_db
+def test_order_creation_query_count_is_constant(customer, make_products):
+    """A 60-line cart costs the same number of queries as a 1-line cart"""
+    products = make_products(60)
+    counts = []
+    for size in (1, 10, 60):
+        with CaptureQueriesContext(connection) as ctx:
+            place_order(customer, products[:size])
+        counts.append(len(ctx.captured_queries))
+
+    assert counts[0] == counts[1] == counts[2]
+
+
+@pytest.mark.slow
+@pytest.mark.django_db
+def test_benchmark_order_creation(customer, make_products):
+    """Report wall time and query count per cart size"""
+    products = make_products(200)
+    for size in (1, 10, 50, 200):
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            place_order(customer, products[:size])
+            elapsed = time.perf_counter() - started
+        print(f"\n{size:>4} lines: {elapsed * 1000:7.2f} ms, {len(ctx.captured_queries)} queries")
@@ -0,0 +1,64 @@
+import random
+import time
+from decimal import Decimal
+
+import pytest
+from django.db import IntegrityError, transaction
+
+from orders.models import Order, OrderNumberCounter
+
+
+@pytest.mark.django_db
+def test_order_numbers_are_unique_and_increasing(customer):
+    numbers = [
+        Order.objects.create(customer=customer, shipping_address="Utawala").order_number
+        for _ in range(25)
+    ]
+
+    assert len(set(numbers)) == 25
+    assert numbers == sorted(numbers)
+    assert all(n.startswith("ORD") and len(n) <= 20 for n in numbers)
+
+
+@pytest.mark.django_db
+def test_explicit_order_number_is_kept(customer):
+    order = Order.objects.create(customer=customer, shipping_address="Utawala", order_number="ORD12345678")
+    assert order.order_number == "ORD12345678"
+
+
+@pytest.mark.slow
+@pytest.mark.django_db
+def test_benchmark_order_number_schemes(customer):
+    """Compare insert throughput of random numbers against the sequence"""
+    count = 2000
+
+    def insert(make_number):
+        collisions = 0
+        started = time.perf_counter()
+        for _ in range(count):
+            try:
+                with transaction.atomic():
+                    Order.objects.create(
+                        customer=customer, shipping_address="Utawala",
+                        subtotal=Decimal("100"), order_number=make_number(),
+                    )
+            except IntegrityError:
+                collisions += 1
+        return count / (time.perf_counter() - started), collisions
+
+    random_rate, random_collisions = insert(lambda: f"ORD{random.randint(10000000, 99999999)}")
+    sequence_rate, sequence_collisions = insert(lambda: "")
+    print(f"\nrandom: {random_rate:.0f} inserts/s, {random_collisions} collisions | "
+          f"sequence: {sequence_rate:.0f} inserts/s, {sequence_collisions} collisions")
+    assert sequence_collisions == 0
+
+
+@pytest.mark.django_db
+def test_missing_counter_row_is_recreated(customer):
+    first = Order.objects.create(customer=customer, shipping_address="Utawala").order_number
+    OrderNumberCounter.objects.all().delete()
+
+    second = Order.objects.create(customer=customer, shipping_address="Utawala").order_number
+
+    assert second > first
+    assert OrderNumberCounter.objects.count() == 1
@@ -0,0 +1,57 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from orders.models import Order, OrderItem
+from products.models import Category, Product
+
+
+@pytest.fixture
+def client(customer):
+    client = APIClient()
+    client.force_authenticate(customer)
+    return client
+
+
+def make_orders(customer, orders, items_per_order):
+    category = Category.objects.create(name=f"Cat {orders}", slug=f"cat-{orders}")
+    products = Product.objects.bulk_create([
+        Product(name=f"P{orders}-{i}", slug=f"p{orders}-{i}", description="P", price=Decimal("10.00"), sku=f"P{orders}-{i}")
+        for i in range(items_per_order)
+    ])
+    for product in products:
+        product.categories.add(category)
+    for _ in range(orders):
+        order = Order.objects.create(customer=customer, shipping_address="Utawala")
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=1, unit_price=product.price, total_price=product.price)
+            for product in products
+        ])
+
+
+@pytest.mark.django_db
+def test_order_list_page_has_fixed_query_count(customer, client):
+    make_orders(customer, orders=2, items_per_order=2)
+    with CaptureQueriesContext(connection) as small:
+        client.get("/api/orders/")
+
+    make_orders(customer, orders=20, items_per_order=10)
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get("/api/orders/")
+
+    assert response.status_code == 200
+    assert len(response.data["results"]) == 20
+    assert all(len(order["items"]) in (2, 10) for order in response.data["results"])
+    # COUNT, the page of orders, and one prefetch for items with their products
+    assert len(ctx.captured_queries) == len(small.captured_queries) == 3
+
+
+@pytest.mark.django_db
+def test_order_list_items_are_summaries(customer, client):
+    make_orders(customer, orders=1, items_per_order=1)
+    item = client.get("/api/orders/").data["results"][0]["items"][0]
+
+    assert set(item) == {"id", "product_id", "product_name", "product_sku", "quantity", "unit_price", "total_price"}
@@ -0,0 +1,147 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from notifications.models import NotificationOutbox
+from orders.models import Order, OrderStatusHistory
+from orders.services import create_order, transition_orders
+from products.models import Product
+
+
+@pytest.fixture
+def product():
+    return Product.objects.create(
+        name="Mug", slug="mug", description="Mug", price=Decimal("250.00"), sku="MUG", stock_quantity=100,
+    )
+
+
+def make_orders(customer, product, count, status="processing"):
+    orders = [
+        create_order([{"product_id": product.id, "quantity": 1}], customer=customer, shipping_address="Utawala")
+        for _ in range(count)
+    ]
+    Order.objects.filter(id__in=[o.id for o in orders]).update(status=status)
+    return orders
+
+
+@pytest.mark.django_db
+def test_bulk_transition_query_count_is_constant(customer, product):
+    """Shipping 5 or 40 orders costs the same number of queries"""
+    small = make_orders(customer, product, 5)
+    large = make_orders(customer, product, 40)
+
+    with CaptureQueriesContext(connection) as few:
+        transition_orders([o.id for o in small], "shipped")
+    with CaptureQueriesContext(connection) as many:
+        result = transition_orders([o.id for o in large], "shipped")
+
+    assert len(result["updated"]) == 40
+    assert len(many.captured_queries) == len(few.captured_queries)
+    assert Order.objects.filter(status="shipped").count() == 45
+
+
+@pytest.mark.django_db
+def test_bulk_transition_groups_by_source_status(customer, product):
+    """Each allowed source status gets its own conditional UPDATE, the rest are rejected"""
+    pending = make_orders(customer, product, 2, status="pending")
+    confirmed = make_orders(customer, product, 2, status="confirmed")
+    shipped = make_orders(customer, product, 1, status="shipped")
+
+    with CaptureQueriesContext(connection) as ctx:
+        result = transition_orders([o.id for o in pending + confirmed + shipped], "cancelled")
+
+    updates = [q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "orders" SET "status"')]
+    assert len(updates) == 2
+    assert len(result["updated"]) == 4
+    assert list(result["rejected"]) == [str(shipped[0].id)]
+    assert Order.objects.get(id=shipped[0].id).status == "shipped"
+
+
+@pytest.mark.django_db
+def test_bulk_transition_writes_history_and_notifications(staff, customer, product):
+    orders = make_orders(customer, product, 3)
+
+    transition_orders([o.id for o in orders], "shipped", changed_by=staff, note="Truck 7")
+
+    history = OrderStatusHistory.objects.filter(to_status="shipped")
+    assert history.count() == 3
+    assert {h.from_status for h in history} == {"processing"}
+    assert {h.changed_by_id for h in history} == {staff.id}
+    outbox = NotificationOutbox.objects.filter(event="order_shipped")
+    assert outbox.count() == 3
+    assert {e.channel for e in outbox} == {NotificationOutbox.CHANNEL_SMS}
+
+
+@pytest.mark.django_db
+def test_bulk_cancel_releases_stock(customer, product):
+    """UPDATE bypasses post_save, so the service releases stock itself"""
+    orders = make_orders(customer, product, 4, status="pending")
+    product.refresh_from_db()
+    assert product.stock_quantity == 96
+
+    transition_orders([o.id for o in orders], "cancelled")
+
+    product.refresh_from_db()
+    assert product.stock_quantity == 100
+    assert not Order.objects.filter(stock_reserved=True).exists()
+
+
+@pytest.mark.django_db
+def test_unknown_orders_are_rejected(customer, product):
+    orders = make_orders(customer, product, 1)
+    missing = "00000000-0000-0000-0000-000000000000"
+
+    result = transition_orders([orders[0].id, missing], "shipped")
+
+    assert result["rejected"] == {missing: "Not found"}
+
+
+@pytest.mark.django_db
+def test_transition_endpoint_is_staff_only(staff, customer, product):
+    orders = make_orders(customer, product, 3)
+    payload = {"order_ids": [str(o.id) for o in orders], "status": "shipped"}
+
+    client = APIClient()
+    client.force_authenticate(customer)
+    assert client.post("/api/orders/transition/", payload, format="json").status_code == 403
+
+    client.force_authenticate(staff)
+    response = client.post("/api/orders/transition/", payload, format="json")
+    assert response.status_code == 200
+    assert len(response.data["updated"]) == 3
+
+
+@pytest.mark.django_db
+def test_single_update_respects_transition_table(staff, customer, product):
+    order = make_orders(customer, product, 1, status="delivered")[0]
+    client = APIClient()
+    client.force_authenticate(staff)
+
+    bad = client.patch(f"/api/orders/{order.id}/", {"status": "pending"}, format="json")
+    assert bad.status_code == 400
+
+    good = client.patch(f"/api/orders/{order.id}/", {"status": "refunded"}, format="json")
+    assert good.status_code == 200
+    assert good.data["status"] == "refunded"
+    assert OrderStatusHistory.objects.filter(order=order, to_status="refunded").exists()
+
+
+@pytest.mark.django_db
+def test_customers_can_only_cancel_their_pending_orders(customer, product):
+    [processing] = make_orders(customer, product, 1, status="processing")
+    [pending] = make_orders(customer, product, 1, status="pending")
+    client = APIClient()
+    client.force_authenticate(customer)
+
+    response = client.patch(f"/api/orders/{processing.id}/", {"status": "shipped"}, format="json")
+    assert response.status_code == 400
+    assert client.patch(f"/api/orders/{pending.id}/", {"status": "confirmed"}, format="json").status_code == 400
+    processing.refresh_from_db()
+    assert processing.status == "processing"
+
+    response = client.patch(f"/api/orders/{pending.id}/", {"status": "cancelled"}, format="json")
+    assert response.status_code == 200
+    assert response.data["status"] == "cancelled"
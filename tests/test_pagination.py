@@ -0,0 +1,186 @@
+import os
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from backend.pagination import CreatedAtKeysetPagination
+from orders.models import Order
+from products.models import Product
+
+
+@pytest.fixture
+def client(staff):
+    client = APIClient()
+    client.force_authenticate(staff)
+    return client
+
+
+def make_orders(customer, count, tied=False):
+    Order.objects.bulk_create([
+        Order(customer=customer, order_number=f"PG{i:010d}", shipping_address="Utawala")
+        for i in range(count)
+    ], batch_size=5000)
+    if tied:
+        # Identical timestamps force the id tie-breaker to do the work
+        Order.objects.update(created_at=timezone.now())
+
+
+def walk(client, url):
+    seen = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        seen.extend(row["id"] for row in response.data["results"])
+        url = response.data["next"]
+    return seen
+
+
+@pytest.mark.django_db
+def test_cursor_walk_visits_every_order_once(staff, client):
+    """Walking next links covers all rows without repeats, even with tied timestamps"""
+    make_orders(staff, 45, tied=True)
+
+    seen = walk(client, "/api/orders/?paginate=cursor&page_size=10")
+
+    assert len(seen) == 45
+    assert len(set(seen)) == 45
+
+
+@pytest.mark.django_db
+def test_cursor_pages_skip_count(staff, client):
+    """Keyset pages run a single query and carry no count"""
+    make_orders(staff, 30)
+
+    first = client.get("/api/orders/?paginate=cursor&page_size=10")
+    with CaptureQueriesContext(connection) as ctx:
+        second = client.get(first.data["next"])
+
+    assert "count" not in second.data
+    assert not any("COUNT(" in q["sql"].upper() for q in ctx.captured_queries)
+    assert second.data["previous"] is not None
+
+
+@pytest.mark.django_db
+def test_cursor_previous_link_returns_prior_page(staff, client):
+    """Following previous from page two gives back page one in the same order"""
+    make_orders(staff, 25, tied=True)
+
+    first = client.get("/api/orders/?paginate=cursor&page_size=10")
+    second = client.get(first.data["next"])
+    back = client.get(second.data["previous"])
+
+    assert [r["id"] for r in back.data["results"]] == [r["id"] for r in first.data["results"]]
+    assert back.data["previous"] is None
+
+
+@pytest.mark.django_db
+def test_invalid_cursor_is_404(client):
+    """A mangled cursor is rejected instead of raising"""
+    response = client.get("/api/orders/?cursor=not-a-cursor")
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", ["/api/orders/", "/api/products/", "/api/async/products/"])
+def test_cursor_with_malformed_pk_is_404(client, url):
+    """A well-formed cursor whose id does not fit the primary key is rejected too"""
+    cursor = CreatedAtKeysetPagination.encode_cursor(timezone.now(), "abc")
+    response = client.get(url, {"cursor": cursor})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Invalid cursor."
+
+
+@pytest.mark.django_db
+def test_page_number_count_opt_out(staff, client):
+    """?count=false keeps page numbers but drops the COUNT query"""
+    make_orders(staff, 25)
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get("/api/orders/?count=false&page=2&page_size=10")
+
+    assert response.data["count"] is None
+    assert len(response.data["results"]) == 10
+    assert response.data["next"] is not None
+    assert not any("COUNT(" in q["sql"].upper() for q in ctx.captured_queries)
+
+    last = client.get("/api/orders/?count=false&page=3&page_size=10")
+    assert len(last.data["results"]) == 5
+    assert last.data["next"] is None
+
+
+@pytest.mark.django_db
+def test_product_cursor_walk():
+    """Products page by (created_at, id) as well"""
+    Product.objects.bulk_create([
+        Product(name=f"K{i}", slug=f"k{i}", description="K", price=Decimal("1.00"), sku=f"K{i}")
+        for i in range(23)
+    ])
+    Product.objects.update(created_at=timezone.now() - timedelta(days=1))
+
+    seen = walk(APIClient(), "/api/products/?paginate=cursor&page_size=5")
+
+    assert len(seen) == len(set(seen)) == 23
+
+
+@pytest.mark.django_db
+def test_deep_keyset_page_seeks_instead_of_offsetting(staff, client):
+    """A deep cursor page is a bounded range read on the (created_at, id) index, with no OFFSET"""
+    make_orders(staff, 60)
+    boundary = Order.objects.order_by("-created_at", "-id")[39]
+    cursor = CreatedAtKeysetPagination.encode_cursor(boundary.created_at, boundary.pk)
+
+    with CaptureQueriesContext(connection) as offset_ctx:
+        client.get("/api/orders/?page=3&page_size=10&count=false")
+    with CaptureQueriesContext(connection) as keyset_ctx:
+        response = client.get(f"/api/orders/?cursor={cursor}&page_size=10")
+
+    assert len(response.data["results"]) == 10
+    assert any("OFFSET" in q["sql"].upper() for q in offset_ctx.captured_queries)
+    [page_sql] = [q["sql"] for q in keyset_ctx.captured_queries if '"orders"' in q["sql"]]
+    assert "OFFSET" not in page_sql.upper() and "LIMIT 11" in page_sql.upper()
+
+    if connection.vendor == "sqlite":
+        qs = Order.objects.filter(created_at__lte=boundary.created_at).order_by("-created_at", "-id")[:11]
+        assert "orders_created_id_idx" in qs.explain()
+
+
+@pytest.mark.slow
+@pytest.mark.django_db
+def test_benchmark_page_1_vs_page_5000(staff, client):
+    """
+    Offset pages slow down with depth, keyset pages do not. Prints timings
+    only; run with ``pytest -m slow -s``.
+    """
+    page_size = 20
+    total = int(os.environ.get("PAGINATION_BENCH_ORDERS", 5000 * page_size))
+    make_orders(staff, total)
+    deep_page = total // page_size
+
+    def timed(url, repeat=5):
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = client.get(url)
+            best = min(best, time.perf_counter() - started)
+            assert response.status_code == 200
+        return best
+
+    offset_first = timed(f"/api/orders/?page=1&page_size={page_size}")
+    offset_deep = timed(f"/api/orders/?page={deep_page}&page_size={page_size}")
+
+    boundary = Order.objects.order_by("-created_at", "-id")[(deep_page - 1) * page_size - 1]
+    cursor = CreatedAtKeysetPagination.encode_cursor(boundary.created_at, boundary.pk)
+    keyset_first = timed(f"/api/orders/?paginate=cursor&page_size={page_size}")
+    keyset_deep = timed(f"/api/orders/?cursor={cursor}&page_size={page_size}")
+
+    print(
+        f"\n{total} orders, page {deep_page}: "
+        f"offset p1 {offset_first * 1000:.1f}ms, p{deep_page} {offset_deep * 1000:.1f}ms | "
+        f"keyset p1 {keyset_first * 1000:.1f}ms, p{deep_page} {keyset_deep * 1000:.1f}ms"
+    )
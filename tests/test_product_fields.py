@@ -0,0 +1,102 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from customers.models import Customer
+from orders.services import create_order
+from products.models import Category, Product
+
+SUMMARY = {"id", "sku", "name", "price", "slug"}
+
+
+@pytest.fixture
+def catalog():
+    root = Category.objects.create(name="Garden", slug="garden")
+    child = Category.objects.create(name="Hoses", slug="hoses", parent=root)
+    products = []
+    for i in range(6):
+        product = Product.objects.create(
+            name=f"Hose {i}", slug=f"hose-{i}", description="A long hose " * 50, price=Decimal("900.00"),
+            sku=f"HOSE-{i}", stock_quantity=10,
+        )
+        product.categories.add(child)
+        products.append(product)
+    return products
+
+
+@pytest.mark.django_db
+def test_primary_category_comes_from_prefetched_categories(catalog):
+    product = Product.objects.prefetch_related("categories").get(id=catalog[0].id)
+    with CaptureQueriesContext(connection) as ctx:
+        category = product.primary_category
+    assert category.slug == "hoses"
+    assert len(ctx.captured_queries) == 0
+
+
+@pytest.mark.django_db
+def test_product_list_summary_reads_only_its_columns(catalog):
+    with CaptureQueriesContext(connection) as ctx:
+        data = APIClient().get("/api/products/", {"fields": "id,sku,name,price,slug", "count": "false"}).json()
+
+    assert len(data["results"]) == 6
+    assert all(set(product) == SUMMARY for product in data["results"])
+    assert len(ctx.captured_queries) == 1
+    assert "description" not in ctx.captured_queries[0]["sql"]
+
+
+@pytest.mark.django_db
+def test_product_fields_prune_the_full_representation(catalog):
+    data = APIClient().get("/api/products/hose-1/", {"fields": "sku,primary_category"}).json()
+    assert set(data) == {"sku", "primary_category"}
+    assert data["primary_category"]["slug"] == "hoses"
+
+
+@pytest.mark.django_db
+def test_full_product_list_prefetches_categories(catalog):
+    """One category query for the whole page, however many products it holds"""
+    with CaptureQueriesContext(connection) as ctx:
+        data = APIClient().get("/api/products/", {"count": "false"}).json()
+
+    assert data["results"][0]["primary_category"]["slug"] == "hoses"
+    membership = [q["sql"] for q in ctx.captured_queries if "products_categories" in q["sql"]]
+    assert len(membership) == 1
+
+
+@pytest.mark.django_db
+def test_category_products_can_be_summaries(catalog):
+    data = APIClient().get("/api/categories/garden/products/", {"fields": "id,sku,name,price,slug"}).json()
+    assert len(data["results"]) == 6
+    assert all(set(product) == SUMMARY for product in data["results"])
+
+
+@pytest.mark.django_db
+def test_order_items_embed_product_summary_unless_expanded(catalog):
+    customer = Customer.objects.create_user(email="garden@example.com", username="garden", password="psw1234")
+    order = create_order([{"product_id": catalog[0].id, "quantity": 1}], customer=customer, shipping_address="Utawala")
+    client = APIClient()
+    client.force_authenticate(customer)
+
+    slim = client.get(f"/api/orders/{order.id}/").json()
+    full = client.get(f"/api/orders/{order.id}/", {"expand": "product"}).json()
+
+    assert set(slim["items"][0]["product"]) == SUMMARY
+    assert full["items"][0]["product"]["primary_category"]["slug"] == "hoses"
+    assert len(full["items"][0]["product"]["categories"]) == 1
+
+
+@pytest.mark.django_db
+def test_product_list_queries_stay_flat_as_the_page_grows(catalog):
+    """Embedded categories are flat references, so no per-category children or ancestor queries"""
+    Category.objects.create(name="Nozzles", slug="nozzles", parent=Category.objects.get(slug="hoses"))
+
+    def queries(size):
+        with CaptureQueriesContext(connection) as ctx:
+            data = APIClient().get("/api/products/", {"page_size": size}).json()
+        assert len(data["results"]) == size
+        return len(ctx.captured_queries)
+
+    assert queries(2) == queries(6)
+    assert set(APIClient().get("/api/products/hose-1/").json()["categories"][0]) == {"id", "name", "slug"}
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from products.importing import ProductImporter
+from products.models import Category, Product
+
+
+def rows(count, start=0):
+    return [
+        {
+            "name": f"Mug {i}", "description": "Ceramic mug", "price": "350.00",
+            "sku": f"MUG-{i}", "stock_quantity": 5,
+            "category_names": ["Kitchen", f"Series {i % 3}"],
+        }
+        for i in range(start, start + count)
+    ]
+
+
+@pytest.mark.django_db
+def test_json_list_upload_reports_per_row_results():
+    Product.objects.create(name="Old", slug="old", description="Old", price="1.00", sku="MUG-1")
+    payload = rows(3) + [{"name": "Broken", "sku": "MUG-0"}]
+
+    response = APIClient().post("/api/products/bulk_upload/", payload, format="json")
+
+    assert response.status_code == 201
+    assert response.data["created_count"] == 2
+    assert response.data["error_count"] == 2
+    assert [r["row"] for r in response.data["results"] if "errors" in r] == [1, 3]
+    assert set(Category.objects.values_list("name", flat=True)) == {"Kitchen", "Series 0", "Series 2"}
+    assert Category.objects.get(name="Kitchen").product_count == 2
+    assert Product.objects.get(sku="MUG-2").categories.count() == 2
+
+
+@pytest.mark.django_db
+def test_ndjson_and_csv_bodies_are_streamed():
+    client = APIClient()
+    body = "\n".join(json.dumps(row) for row in rows(2)) + "\nnot json\n"
+    response = client.post("/api/products/bulk_upload/", body, content_type="application/x-ndjson")
+    assert response.data["created_count"] == 2
+    assert response.data["error_count"] == 1
+
+    csv_body = (
+        "name,description,price,sku,stock_quantity,category_names\n"
+        "Pan,Frying pan,900.00,PAN-1,3,Kitchen|Cookware\n"
+    )
+    response = client.post("/api/products/bulk_upload/", csv_body, content_type="text/csv")
+    assert response.data["created_count"] == 1
+    assert set(Product.objects.get(sku="PAN-1").categories.values_list("name", flat=True)) == {"Kitchen", "Cookware"}
+
+
+@pytest.mark.django_db
+def test_query_count_per_chunk_is_constant():
+    importer = ProductImporter(chunk_size=500)
+    importer.run(rows(10))
+
+    counts = []
+    for start, size in ((100, 10), (200, 50)):
+        with CaptureQueriesContext(connection) as ctx:
+            importer.run(rows(size, start=start))
+        counts.append(len(ctx.captured_queries))
+
+    assert counts[0] == counts[1]
+
+
+@pytest.mark.django_db
+def test_new_categories_join_the_tree_through_mptt():
+    Category.objects.create(name="Kitchen", slug="kitchen")
+    payload = rows(1)
+    payload[0]["category_names"] = ["Kitchen", "Bath & Body", "Arts Crafts"]
+
+    ProductImporter().run(payload)
+
+    roots = list(Category.objects.root_nodes())
+    assert [c.name for c in roots] == ["Arts Crafts", "Bath & Body", "Kitchen"]
+    assert [c.tree_id for c in roots] == [1, 2, 3]
+    assert Category.objects.get(name="Bath & Body").slug == "bath-body"
+    Category.objects.rebuild()
+    assert [(c.name, c.tree_id, c.lft, c.rght) for c in Category.objects.order_by("tree_id")] == [
+        (c.name, c.tree_id, c.lft, c.rght) for c in roots
+    ]
@@ -0,0 +1,118 @@
+import os
+import time
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.db.models import Q
+
+from products.models import Product
+from products.search import search_products
+
+
+def make_product(sku, name, description):
+    return Product.objects.create(
+        name=name, slug=sku.lower(), description=description, price=Decimal("10.00"), sku=sku,
+    )
+
+
+@pytest.mark.django_db
+def test_name_matches_rank_above_description_matches():
+    make_product("STV-1", "Camping stove", "Heats a kettle in minutes")
+    make_product("KTL-1", "Kettle", "Boils water")
+    make_product("PAN-1", "Frying pan", "Non-stick")
+
+    results = list(search_products(Product.objects.all(), "kett"))
+    assert [p.sku for p in results] == ["KTL-1", "STV-1"]
+
+
+@pytest.mark.django_db
+def test_sku_matches_rank_first_exact_before_prefix():
+    make_product("KTL-10", "Kettle large", "Kettle")
+    make_product("KTL-1", "Kettle", "Kettle")
+
+    assert [p.sku for p in search_products(Product.objects.all(), "KTL-1")] == ["KTL-1", "KTL-10"]
+    assert [p.sku for p in search_products(Product.objects.all(), "ktl-1")] == ["KTL-1", "KTL-10"]
+
+
+@pytest.mark.django_db
+def test_sku_matches_do_not_hide_name_matches():
+    make_product("BOOK-1", "Notebook", "Lined paper")
+    make_product("X-2", "Book stand", "Holds a book open")
+    make_product("PEN-1", "Pen", "Blue ink")
+
+    for term in ("BOOK", "book"):
+        assert [p.sku for p in search_products(Product.objects.all(), term)] == ["BOOK-1", "X-2"]
+
+
+@pytest.mark.django_db
+def test_index_follows_product_updates():
+    product = make_product("LMP-1", "Desk lamp", "LED")
+    product.name = "Floor lamp"
+    product.save()
+
+    assert [p.sku for p in search_products(Product.objects.all(), "floor")] == ["LMP-1"]
+    assert not search_products(Product.objects.all(), "desk").exists()
+
+    product.delete()
+    assert not search_products(Product.objects.all(), "floor").exists()
+
+
+@pytest.mark.django_db
+def test_search_endpoint_uses_index(client):
+    make_product("KTL-1", "Kettle", "Boils water")
+    response = client.get("/api/products/", {"search": "boil"})
+    assert [p["sku"] for p in response.json()["results"]] == ["KTL-1"]
+
+
+@pytest.mark.django_db
+def test_search_queries_avoid_scanning_products():
+    """Every search, SKU-like or not, is driven by the full-text index rather than a table scan"""
+    make_product("KTL-1", "Kettle", "Boils water")
+    make_product("MUG-1", "Mug", "Holds tea")
+
+    for term in ("kettle", "KTL-1"):
+        qs = search_products(Product.objects.all(), term)
+        # The SKU ranking may use LIKE, but only on rows the index already matched
+        assert "LIKE" not in str(qs.query).upper().split("WHERE", 1)[1].split("ORDER BY")[0]
+
+        if connection.vendor == "sqlite":
+            plan = qs.explain()
+            assert "VIRTUAL TABLE" in plan
+            assert not any(line.split()[-2:] == ["SCAN", "products"] for line in plan.splitlines())
+
+
+@pytest.mark.slow
+@pytest.mark.django_db
+def test_benchmark_search_against_icontains():
+    """
+    Compare the FTS path with the old triple icontains scan. Prints timings
+    only; run with ``pytest -m slow -s``.
+    """
+    count = int(os.environ.get("SEARCH_BENCH_PRODUCTS", 100_000))
+    words = ["kettle", "mug", "lamp", "chair", "table", "phone", "cable", "charger", "pan", "towel"]
+    Product.objects.bulk_create(
+        [
+            Product(
+                name=f"{words[i % 10]} model {i}", slug=f"bench-{i}", sku=f"BN-{i:06d}",
+                description=f"{words[(i * 7) % 10]} accessory number {i}", price=Decimal("10.00"),
+            )
+            for i in range(count)
+        ],
+        batch_size=5000,
+    )
+
+    def timed(qs):
+        # What a paginated API page costs: COUNT(*) plus the first 20 rows
+        started = time.perf_counter()
+        qs.count()
+        list(qs[:20])
+        return (time.perf_counter() - started) * 1000
+
+    print(f"\n{count} products")
+    for term in ("charger", "54321", "BN-0999"):
+        icontains = Product.objects.filter(
+            Q(name__icontains=term) | Q(description__icontains=term) | Q(sku__icontains=term)
+        ).distinct()
+        print(f"{term:>8} | icontains: {timed(icontains):7.1f} ms | "
+              f"search_products: {timed(search_products(Product.objects.all(), term)):7.1f} ms")
@@ -0,0 +1,106 @@
+import datetime
+import json
+import time
+import uuid
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from backend.renderers import ORJSONRenderer
+from customers.models import Customer
+from orders.models import Order, OrderItem
+from orders.serializers import OrderSerializer
+from products.models import Category, Product
+
+
+def make_orders(count, items_per_order=3):
+    customer = Customer.objects.create_user(email="render@example.com", username="render", password="psw1234")
+    category = Category.objects.create(name="Tools", slug="tools")
+    products = Product.objects.bulk_create([
+        Product(name=f"Tool {i}", slug=f"tool-{i}", description="Tool", price=Decimal("1999.99"), sku=f"TL-{i}")
+        for i in range(items_per_order)
+    ])
+    for product in products:
+        product.categories.add(category)
+    for _ in range(count):
+        order = Order.objects.create(customer=customer, shipping_address="Utawala")
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=3, unit_price=product.price, total_price=product.price * 3)
+            for product in products
+        ])
+    return customer
+
+
+def order_page(count):
+    orders = Order.objects.prefetch_related("items__product")[:count]
+    return OrderSerializer(orders, many=True).data
+
+
+def test_raw_values_render_like_drf():
+    data = {
+        "when": datetime.datetime(2025, 1, 2, 3, 4, 5, 678000, tzinfo=datetime.timezone.utc),
+        "day": datetime.date(2025, 1, 2),
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "label": gettext_lazy("Pending"),
+        1: "int key",
+    }
+    assert json.loads(ORJSONRenderer().render(data)) == json.loads(JSONRenderer().render(data))
+
+
+def test_raw_decimals_render_like_drf():
+    """DRF's encoder turns raw Decimals into floats; DecimalField output stays a string"""
+    data = {"raw": Decimal("12.50"), "field": "12345678.10"}
+    rendered = ORJSONRenderer().render(data)
+    assert rendered == JSONRenderer().render(data)
+    assert json.loads(rendered) == {"raw": 12.5, "field": "12345678.10"}
+
+
+def test_indent_and_line_separators():
+    rendered = ORJSONRenderer().render({"text": "a b"}, "application/json; indent=4")
+    assert b"\n  " in rendered
+    assert b"\\u2028" in rendered
+
+
+@pytest.mark.django_db
+def test_order_page_matches_stdlib_renderer():
+    make_orders(3)
+    data = order_page(3)
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+@pytest.mark.django_db
+def test_api_responses_use_orjson():
+    make_orders(1)
+    response = APIClient().get("/api/products/", HTTP_ACCEPT="application/json")
+    assert response["Content-Type"] == "application/json"
+    assert isinstance(response.accepted_renderer, ORJSONRenderer)
+    assert response.json()["results"][0]["price"] == "1999.99"
+
+
+@pytest.mark.slow
+@pytest.mark.django_db
+def test_benchmark_100_order_page():
+    """Serializer vs renderer time for one page of 100 orders"""
+    make_orders(100)
+    data = order_page(100)
+
+    def timed(fn, repeat=20):
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - started)
+        return best
+
+    serialize = timed(lambda: order_page(100), repeat=5)
+    stdlib = timed(lambda: JSONRenderer().render(data))
+    fast = timed(lambda: ORJSONRenderer().render(data))
+
+    print(
+        f"\n100 orders ({len(JSONRenderer().render(data)) // 1024} KB): serialize {serialize * 1000:.1f}ms | "
+        f"render json {stdlib * 1000:.2f}ms, orjson {fast * 1000:.2f}ms ({stdlib / fast:.1f}x)"
+    )
+    assert fast < stdlib
@@ -0,0 +1,146 @@
+import threading
+import time
+
+import responses
+
+from notifications.sms import (
+    AfricasTalkingTransport,
+    FakeTransport,
+    SmsQueue,
+    get_transport,
+    normalize_phone,
+    parse_recipients,
+    set_transport,
+)
+from notifications.utils import NotificationService
+
+
+def test_parse_reads_every_recipient():
+    """Statuses come from the whole Recipients array, not just the first entry"""
+    response = {"SMSMessageData": {"Message": "Sent to 1/3", "Recipients": [
+        {"number": "+254700000001", "status": "Success", "statusCode": 101, "messageId": "a", "cost": "KES 0.8"},
+        {"number": "+254700000002", "status": "InvalidPhoneNumber", "statusCode": 403},
+    ]}}
+
+    results = parse_recipients(response, ["+254700000001", "+254700000002", "+254700000003"])
+
+    assert results["+254700000001"].ok and results["+254700000001"].message_id == "a"
+    assert not results["+254700000002"].ok
+    assert results["+254700000002"].status == "InvalidPhoneNumber"
+    assert not results["+254700000003"].ok
+
+
+def test_normalize_phone():
+    assert normalize_phone("0700 000-001") == "+254700000001"
+    assert normalize_phone("254700000001") == "+254700000001"
+    assert normalize_phone("+254700000001") == "+254700000001"
+    assert normalize_phone("712345678") == "+254712345678"
+
+
+def test_identical_messages_share_one_request():
+    transport = FakeTransport()
+    queue = SmsQueue(transport)
+    for i in range(5):
+        queue.add(i, "Flash sale today", f"07000000{i:02d}")
+    queue.add("odd", "Something else", "0700000099")
+
+    results = queue.flush()
+
+    assert len(transport.requests) == 2
+    assert sorted(len(numbers) for _, numbers in transport.requests) == [1, 5]
+    assert all(result.ok for result in results.values())
+    assert set(results) == {0, 1, 2, 3, 4, "odd"}
+
+
+def test_recipient_batches_are_capped(settings):
+    settings.SMS_MAX_RECIPIENTS = 2
+    transport = FakeTransport()
+    queue = SmsQueue(transport)
+    for i in range(5):
+        queue.add(i, "Same", f"07000000{i:02d}")
+
+    queue.flush()
+
+    assert [len(numbers) for _, numbers in transport.requests] == [2, 2, 1]
+
+
+def test_distinct_messages_are_sent_concurrently():
+    """Different texts cannot be merged, so they go out in parallel on the pool"""
+    active, peak = 0, 0
+    lock = threading.Lock()
+
+    class SlowTransport(FakeTransport):
+        def send(self, message, recipients):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+            return super().send(message, recipients)
+
+    queue = SmsQueue(SlowTransport())
+    for i in range(4):
+        queue.add(i, f"Order {i} confirmed", f"07000000{i:02d}")
+    results = queue.flush()
+
+    assert len(results) == 4
+    assert peak > 1
+
+
+def test_failed_recipients_and_transport_errors():
+    class BrokenTransport:
+        def send(self, message, recipients):
+            raise ConnectionError("gateway down")
+
+    queue = SmsQueue(BrokenTransport())
+    queue.add("a", "Hi", "0700000001")
+    outcome = queue.flush()
+    assert not outcome["a"].ok
+    assert "gateway down" in outcome["a"].status
+
+    transport = FakeTransport(fail_numbers={"+254700000002"})
+    queue = SmsQueue(transport)
+    queue.add("ok", "Hi", "0700000001")
+    queue.add("bad", "Hi", "0700000002")
+    outcome = queue.flush()
+    assert outcome["ok"].ok and not outcome["bad"].ok
+
+
+def test_transport_is_built_once_per_process(settings):
+    settings.SMS_TRANSPORT = "notifications.sms.FakeTransport"
+    set_transport(None)
+    try:
+        assert get_transport() is get_transport()
+        assert isinstance(get_transport(), FakeTransport)
+    finally:
+        set_transport(None)
+
+
+def test_send_sms_reports_success_only_when_all_accepted(fake_sms):
+    assert NotificationService._send_sms("Hi", ["0700000001", "0700000002"]) is True
+    fake_sms.fail_numbers.add("+254700000002")
+    assert NotificationService._send_sms("Hi", ["0700000001", "0700000002"]) is False
+    assert len(fake_sms.requests) == 2
+
+
+@responses.activate
+def test_africastalking_transport_posts_all_recipients_in_one_request():
+    responses.add(
+        responses.POST,
+        AfricasTalkingTransport.SANDBOX_URL,
+        json={"SMSMessageData": {"Message": "Sent", "Recipients": [
+            {"number": "+254700000001", "status": "Success", "statusCode": 101},
+            {"number": "+254700000002", "status": "Success", "statusCode": 101},
+        ]}},
+    )
+    transport = AfricasTalkingTransport("sandbox", "key")
+
+    results = transport.send("Hi", ["+254700000001", "+254700000002"])
+
+    assert all(result.ok for result in results.values())
+    assert len(responses.calls) == 1
+    request = responses.calls[0].request
+    assert request.headers["apiKey"] == "key"
+    assert "to=%2B254700000001%2C%2B254700000002" in request.body
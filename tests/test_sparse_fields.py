@@ -0,0 +1,92 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from orders.services import create_order
+from products.models import Category, Product
+
+
+@pytest.fixture
+def client(staff):
+    client = APIClient()
+    client.force_authenticate(staff)
+    return client
+
+
+@pytest.fixture
+def orders(staff):
+    product = Product.objects.create(
+        name="Lamp", slug="lamp", description="Lamp", price=Decimal("800.00"), sku="LMP-1", stock_quantity=100,
+    )
+    return [
+        create_order([{"product_id": product.id, "quantity": 2}], customer=staff, shipping_address="Utawala")
+        for _ in range(5)
+    ]
+
+
+def get(client, url, params):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, params)
+    assert response.status_code == 200
+    return response.json(), [query["sql"] for query in ctx.captured_queries]
+
+
+@pytest.mark.django_db
+def test_order_list_fields_skip_items_and_unused_columns(client, orders):
+    data, queries = get(client, "/api/orders/", {"fields": "id,status,total_amount", "count": "false"})
+
+    assert all(set(order) == {"id", "status", "total_amount"} for order in data["results"])
+    assert len(queries) == 1  # no items prefetch
+    assert "shipping_address" not in queries[0]
+    assert "subtotal" not in queries[0]
+
+
+@pytest.mark.django_db
+def test_order_detail_fields_keep_requested_relations(client, orders):
+    data, queries = get(client, f"/api/orders/{orders[0].id}/", {"fields": "order_number,items"})
+
+    assert set(data) == {"order_number", "items"}
+    assert data["items"][0]["product"]["sku"] == "LMP-1"
+    assert "billing_address" not in queries[0]
+
+
+@pytest.mark.django_db
+def test_customer_fields_do_not_load_password(client, staff):
+    data, queries = get(client, "/api/customers/", {"fields": "id,email"})
+    assert data["results"] == [{"id": staff.id, "email": staff.email}]
+    assert not any("password" in sql for sql in queries)
+
+    me, _ = get(client, "/api/customers/me/", {"fields": "phone"})
+    assert me == {"phone": staff.phone}
+
+
+@pytest.mark.django_db
+def test_category_full_path_without_deferred_reloads(client):
+    root = Category.objects.create(name="Home", slug="home")
+    for i in range(3):
+        Category.objects.create(name=f"Room {i}", slug=f"room-{i}", parent=root)
+
+    data, queries = get(client, "/api/categories/", {"fields": "slug,full_path"})
+
+    assert {c["slug"]: c["full_path"] for c in data["results"]}["room-1"] == "Home > Room 1"
+    # COUNT, the page, and one ancestors query per category; no per-row column reloads
+    assert len(queries) == 2 + 4
+
+
+@pytest.mark.django_db
+def test_writes_ignore_fields(client, orders):
+    response = client.patch(
+        f"/api/orders/{orders[0].id}/?fields=id", {"billing_address": "Ruaka"}, format="json",
+    )
+    assert response.status_code == 200
+    assert response.json()["billing_address"] == "Ruaka"
+    assert "items" in response.json()
+
+
+@pytest.mark.django_db
+def test_unknown_fields_are_ignored(client, orders):
+    data, _ = get(client, "/api/orders/", {"fields": "id,nope"})
+    assert all(set(order) == {"id"} for order in data["results"])
@@ -0,0 +1,111 @@
+import threading
+import time
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+from django.db import OperationalError, close_old_connections, connection
+from rest_framework.exceptions import ValidationError
+
+from orders.models import Order
+from orders.services import create_order
+from products.models import Product
+
+
+def make_product(sku, stock, is_digital=False):
+    return Product.objects.create(
+        name=sku, slug=sku.lower(), description=sku, price=Decimal("250.00"),
+        sku=sku, stock_quantity=stock, is_digital=is_digital,
+    )
+
+
+def order_lines(*pairs):
+    return [{"product_id": product.id, "quantity": quantity} for product, quantity in pairs]
+
+
+@pytest.mark.django_db
+def test_order_reserves_stock(customer):
+    mug = make_product("MUG", 5)
+    ebook = make_product("EBOOK", 0, is_digital=True)
+
+    order = create_order(order_lines((mug, 2), (ebook, 1)), customer=customer, shipping_address="Utawala")
+
+    mug.refresh_from_db()
+    assert mug.stock_quantity == 3
+    assert order.stock_reserved is True
+
+
+@pytest.mark.django_db
+def test_short_order_reserves_nothing(customer):
+    """One short line rolls back the whole reservation"""
+    mug = make_product("MUG", 5)
+    pan = make_product("PAN", 1)
+
+    with pytest.raises(ValidationError):
+        create_order(order_lines((mug, 2), (pan, 2)), customer=customer, shipping_address="Utawala")
+
+    mug.refresh_from_db()
+    pan.refresh_from_db()
+    assert (mug.stock_quantity, pan.stock_quantity) == (5, 1)
+    assert Order.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_cancel_releases_stock_once(customer):
+    mug = make_product("MUG", 5)
+    order = create_order(order_lines((mug, 4)), customer=customer, shipping_address="Utawala")
+
+    order.status = "cancelled"
+    order.save()
+    order.status = "refunded"
+    order.save()
+
+    mug.refresh_from_db()
+    assert mug.stock_quantity == 5
+    assert Order.objects.get(id=order.id).stock_reserved is False
+
+
+@pytest.mark.slow
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_checkouts_never_oversell(customer):
+    """Many threads race for the same SKU; stock never goes below zero"""
+    initial_stock, threads, attempts_per_thread = 50, 8, 20
+    sku = make_product("HOT", initial_stock)
+    placed, rejected = [], []
+
+    def checkout():
+        try:
+            for _ in range(attempts_per_thread):
+                while True:
+                    try:
+                        create_order(order_lines((sku, 1)), customer=customer, shipping_address="Utawala")
+                        placed.append(1)
+                    except ValidationError:
+                        rejected.append(1)
+                    except OperationalError:
+                        # SQLite reports writer contention instead of blocking; back off and retry
+                        time.sleep(0.005)
+                        continue
+                    break
+        finally:
+            close_old_connections()
+            connection.close()
+
+    workers = [threading.Thread(target=checkout) for _ in range(threads)]
+    # Keep the eager notification and sales tasks out of the race; they would
+    # contend for the same SQLite write lock from inside each checkout
+    with mock.patch("orders.signals.schedule_dispatch"), \
+            mock.patch("aggregates.signals.schedule_order_sales"):
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+    sku.refresh_from_db()
+    assert len(placed) == initial_stock
+    assert sku.stock_quantity == 0
+    assert len(placed) + len(rejected) == threads * attempts_per_thread
+    print(f"\n{len(placed) + len(rejected)} checkouts in {elapsed:.2f}s "
+          f"({(len(placed) + len(rejected)) / elapsed:.0f} orders/s, {len(rejected)} rejected)")